@@ -1,5 +1,6 @@
 """Configuration management for the Content Creator system."""
 
+from functools import cache
 from typing import Optional
 
 from pydantic_settings import BaseSettings
@@ -75,5 +76,14 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Global settings instance
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Return the application settings, loading them on first use."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    """Resolve the global ``settings`` instance lazily on first access."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
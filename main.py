@@ -1,18 +1,21 @@
 import asyncio
+import signal
 import sys
+import threading
 
 from loguru import logger
 
-from src.api import app as api_app  # Import the Flask app
-from src.utils.logger import setup_logger
-from src.orchestrator import AgentOrchestrator
-from src.scheduler import ContentCreatorScheduler
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional faster event loop
+    uvloop = None
+
 from src.utils.logger import setup_logger
 
+_SEP60 = "=" * 60
+_SEP_N = "\n" + _SEP60
 
-def print_banner():
-    """Print the system banner."""
-    banner = """
+_BANNER = """
 ╔══════════════════════════════════════════════════════════╗
 ║                                                          ║
 ║     Content Creator - Autonomous AI Agent System        ║
@@ -21,12 +24,8 @@ def print_banner():
 ║                                                          ║
 ╚══════════════════════════════════════════════════════════╝
 """
-    print(banner)
-
 
-def print_menu():
-    """Print the main menu."""
-    menu = """
+_MENU_PROMPT = """
 Choose an option:
 
 PHASE 1 - Core Pipeline:
@@ -60,11 +59,135 @@ MANAGEMENT:
 20. Exit
 
 Enter choice (1-20): """
-    return input(menu)
+
+_KPI_TEMPLATE = """
+============================================================
+KPI DASHBOARD
+============================================================
+
+Last 24 Hours:
+  Insights Generated:  {insights_generated_24h}
+  Content Published:   {content_published_24h}
+
+Last 7 Days:
+  Insights Generated:  {insights_generated_7d}
+  Content Published:   {content_published_7d}
+  Total Engagement:    {total_engagement_7d}
+  Avg Engagement Rate: {avg_engagement_rate_7d:.2%}
+
+Pipeline:
+  Content in Queue:    {content_in_pipeline}
+
+Last Updated: {last_updated}
+============================================================
+
+"""
+
+_CONVERSION_TEMPLATE = """
+============================================================
+CONVERSION METRICS (Last 30 Days)
+============================================================
+
+Total DM Attempts:   {total_dm_attempts}
+Conversions:         {conversions}
+Conversion Rate:     {conversion_rate:.2%}
+Open Rate:           {open_rate:.2%}
+Click Rate:          {click_rate:.2%}
+============================================================
+
+"""
+
+_SUBSCRIPTION_TEMPLATE = """
+============================================================
+SUBSCRIPTION STATS
+============================================================
+
+Total Users:         {total_users}
+Paying Members:      {paying_users}
+Conversion Rate:     {conversion_rate}
+
+Active Subscriptions: {active_subs}
+
+By Tier:
+  Basic:   {basic}
+  Premium: {premium}
+  VIP:     {vip}
+============================================================
+
+"""
+
+_HEALTH_TEMPLATE = """
+============================================================
+SYSTEM HEALTH SCORE
+============================================================
+
+Overall Health: {health_score}/100 ({status})
+
+Component Scores:
+{components}
+
+Timestamp: {timestamp}
+============================================================
+
+"""
+
+
+def print_banner():
+    """Print the system banner."""
+    print(_BANNER)
+
+
+async def ainput(prompt: str = "") -> str:
+    """
+    Read a line from stdin without blocking the event loop.
+
+    The read runs on a daemon thread so scheduler jobs and other asyncio
+    tasks keep running while the prompt waits, and Ctrl+C can still exit
+    without joining a thread stuck in input().
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read_line():
+        try:
+            line = input(prompt)
+        except Exception as e:
+            loop.call_soon_threadsafe(deliver, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(deliver, future.set_result, line)
+
+    threading.Thread(target=read_line, daemon=True).start()
+    return await future
+
+
+async def print_menu():
+    """Print the main menu."""
+    return await ainput(_MENU_PROMPT)
+
+
+async def wait_for_shutdown(*signals: signal.Signals):
+    """Block until one of the given signals arrives, without periodic wakeups."""
+    loop = asyncio.get_running_loop()
+    shutdown = asyncio.Event()
+    for sig in signals:
+        loop.add_signal_handler(sig, shutdown.set)
+    try:
+        await shutdown.wait()
+    finally:
+        for sig in signals:
+            loop.remove_signal_handler(sig)
 
 
 async def run_interactive_mode():
     """Run the system in interactive mode."""
+    # Imported lazily: these pull in every agent and its SDK dependencies
+    from src.orchestrator import AgentOrchestrator
+    from src.scheduler import ContentCreatorScheduler
+
     setup_logger()
     print_banner()
 
@@ -72,7 +195,7 @@ async def run_interactive_mode():
     scheduler = None
 
     while True:
-        choice = print_menu()
+        choice = await print_menu()
 
         try:
             if choice == "1":
@@ -114,21 +237,7 @@ async def run_interactive_mode():
                 logger.info("Loading KPI dashboard...")
                 kpis = await orchestrator.get_kpi_dashboard()
 
-                print("\n" + "=" * 60)
-                print("KPI DASHBOARD")
-                print("=" * 60)
-                print("\nLast 24 Hours:")
-                print(f"  Insights Generated:  {kpis['insights_generated_24h']}")
-                print(f"  Content Published:   {kpis['content_published_24h']}")
-                print("\nLast 7 Days:")
-                print(f"  Insights Generated:  {kpis['insights_generated_7d']}")
-                print(f"  Content Published:   {kpis['content_published_7d']}")
-                print(f"  Total Engagement:    {kpis['total_engagement_7d']}")
-                print(f"  Avg Engagement Rate: {kpis['avg_engagement_rate_7d']:.2%}")
-                print("\nPipeline:")
-                print(f"  Content in Queue:    {kpis['content_in_pipeline']}")
-                print(f"\nLast Updated: {kpis['last_updated']}")
-                print("=" * 60 + "\n")
+                sys.stdout.write(_KPI_TEMPLATE.format(**kpis))
 
             elif choice == "9":
                 logger.info("Running full Phase 3 pipeline...")
@@ -144,59 +253,51 @@ async def run_interactive_mode():
                 logger.info("Loading conversion metrics...")
                 metrics = await orchestrator.conversion_agent.get_conversion_metrics(days=30)
 
-                print("\n" + "=" * 60)
-                print("CONVERSION METRICS (Last 30 Days)")
-                print("=" * 60)
-                print(f"\nTotal DM Attempts:   {metrics['total_dm_attempts']}")
-                print(f"Conversions:         {metrics['conversions']}")
-                print(f"Conversion Rate:     {metrics['conversion_rate']:.2%}")
-                print(f"Open Rate:           {metrics['open_rate']:.2%}")
-                print(f"Click Rate:          {metrics['click_rate']:.2%}")
-                print("=" * 60 + "\n")
+                sys.stdout.write(_CONVERSION_TEMPLATE.format(**metrics))
 
             elif choice == "12":
                 logger.info("Loading subscription stats...")
 
+                from sqlalchemy import func, select
+
                 from src.database.connection import get_db
-                from src.database.models import CommunityUser, Subscription, UserTier
+                from src.database.models import PAID_TIERS, CommunityUser, Subscription, UserTier
 
                 with get_db() as db:
-                    total_users = db.query(CommunityUser).count()
-                    paying_users = (
-                        db.query(CommunityUser).filter(CommunityUser.tier != UserTier.FREE).count()
+                    # Count users per tier in a single GROUP BY query
+                    tier_counts = dict(
+                        db.query(CommunityUser.tier, func.count(CommunityUser.id))
+                        .group_by(CommunityUser.tier)
+                        .all()
                     )
 
-                    active_subs = (
-                        db.query(Subscription).filter(Subscription.status == "active").count()
-                    )
+                    active_subs = db.execute(
+                        select(func.count())
+                        .select_from(Subscription)
+                        .where(Subscription.status == "active")
+                    ).scalar_one()
 
-                    # Count by tier
-                    basic = (
-                        db.query(CommunityUser).filter(CommunityUser.tier == UserTier.BASIC).count()
-                    )
-                    premium = (
-                        db.query(CommunityUser)
-                        .filter(CommunityUser.tier == UserTier.PREMIUM)
-                        .count()
+                total_users = sum(tier_counts.values())
+                paying_users = sum(
+                    count for tier, count in tier_counts.items() if tier in PAID_TIERS
+                )
+                basic = tier_counts.get(UserTier.BASIC, 0)
+                premium = tier_counts.get(UserTier.PREMIUM, 0)
+                vip = tier_counts.get(UserTier.VIP, 0)
+
+                sys.stdout.write(
+                    _SUBSCRIPTION_TEMPLATE.format(
+                        total_users=total_users,
+                        paying_users=paying_users,
+                        conversion_rate=(
+                            f"{(paying_users/total_users*100):.1f}%" if total_users > 0 else "N/A"
+                        ),
+                        active_subs=active_subs,
+                        basic=basic,
+                        premium=premium,
+                        vip=vip,
                     )
-                    vip = db.query(CommunityUser).filter(CommunityUser.tier == UserTier.VIP).count()
-
-                print("\n" + "=" * 60)
-                print("SUBSCRIPTION STATS")
-                print("=" * 60)
-                print(f"\nTotal Users:         {total_users}")
-                print(f"Paying Members:      {paying_users}")
-                print(
-                    f"Conversion Rate:     {(paying_users/total_users*100):.1f}%"
-                    if total_users > 0
-                    else "N/A"
                 )
-                print(f"\nActive Subscriptions: {active_subs}")
-                print("\nBy Tier:")
-                print(f"  Basic:   {basic}")
-                print(f"  Premium: {premium}")
-                print(f"  VIP:     {vip}")
-                print("=" * 60 + "\n")
 
             elif choice == "13":
                 logger.info("Running full Phase 4 pipeline...")
@@ -211,79 +312,86 @@ async def run_interactive_mode():
             elif choice == "15":
                 logger.info("Loading A/B test results...")
 
-                # Get active tests
+                # Get recently completed tests
+                from sqlalchemy import select
+
                 from src.database.connection import get_db
                 from src.database.models import ABTest, TestStatus
 
-                with get_db() as db:
-                    tests = (
-                        db.query(ABTest)
-                        .filter(ABTest.status == TestStatus.COMPLETED)
-                        .order_by(ABTest.completed_at.desc())
-                        .limit(10)
-                        .all()
+                stmt = (
+                    select(
+                        ABTest.test_name,
+                        ABTest.variable_being_tested,
+                        ABTest.status,
+                        ABTest.improvement_percentage,
+                        ABTest.confidence_level,
+                        ABTest.completed_at,
                     )
+                    .where(ABTest.status == TestStatus.COMPLETED)
+                    .order_by(ABTest.completed_at.desc())
+                    .limit(10)
+                    .execution_options(stream_results=True, yield_per=10)
+                )
 
-                    print("\n" + "=" * 60)
+                with get_db() as db:
+                    print(_SEP_N)
                     print("A/B TEST RESULTS (Last 10 Completed)")
-                    print("=" * 60)
-
-                    if not tests:
+                    print(_SEP60)
+
+                    # Rows are printed as they arrive from the server-side cursor
+                    found = False
+                    for name, variable, status, improvement, confidence, completed_at in db.execute(
+                        stmt
+                    ):
+                        found = True
+                        print(f"\nTest: {name}")
+                        print(f"Variable: {variable}")
+                        print(f"Status: {status.value}")
+                        print(f"Improvement: {improvement:.1f}%" if improvement else "N/A")
+                        print(f"Confidence: {confidence:.0%}" if confidence else "N/A")
+                        print(f"Completed: {completed_at}")
+
+                    if not found:
                         print("\nNo completed tests yet")
-                    else:
-                        for test in tests:
-                            print(f"\nTest: {test.test_name}")
-                            print(f"Variable: {test.variable_being_tested}")
-                            print(f"Status: {test.status.value}")
-                            print(
-                                f"Improvement: {test.improvement_percentage:.1f}%"
-                                if test.improvement_percentage
-                                else "N/A"
-                            )
-                            print(
-                                f"Confidence: {test.confidence_level:.0%}"
-                                if test.confidence_level
-                                else "N/A"
-                            )
-                            print(f"Completed: {test.completed_at}")
-
-                    print("=" * 60 + "\n")
+
+                    print(_SEP60 + "\n")
 
             elif choice == "16":
                 logger.info("Calculating system health score...")
                 health = await orchestrator.get_system_health()
 
-                print("\n" + "=" * 60)
-                print("SYSTEM HEALTH SCORE")
-                print("=" * 60)
-                print(
-                    f"\nOverall Health: {health['health_score']}/100 ({health['status'].upper()})"
+                components = "\n".join(
+                    f"  {component.replace('_', ' ').title()}: {score}/100"
+                    for component, score in health["components"].items()
+                )
+                sys.stdout.write(
+                    _HEALTH_TEMPLATE.format(
+                        health_score=health["health_score"],
+                        status=health["status"].upper(),
+                        components=components,
+                        timestamp=health["timestamp"],
+                    )
                 )
-                print("\nComponent Scores:")
-                for component, score in health["components"].items():
-                    print(f"  {component.replace('_', ' ').title()}: {score}/100")
-                print(f"\nTimestamp: {health['timestamp']}")
-                print("=" * 60 + "\n")
 
             elif choice == "17":
                 logger.info("Generating learning report...")
-                days = input("Number of days to analyze (default 7): ").strip()
+                days = (await ainput("Number of days to analyze (default 7): ")).strip()
                 days = int(days) if days.isdigit() else 7
 
                 report = await orchestrator.generate_learning_report(days=days)
-                print("\n" + "=" * 60)
+                print(_SEP_N)
                 print(f"LEARNING REPORT (Last {days} Days)")
-                print("=" * 60)
+                print(_SEP60)
                 print(report)
-                print("=" * 60 + "\n")
+                print(_SEP60 + "\n")
 
             elif choice == "18":
                 logger.info("Starting scheduler...")
 
-                phase = input("Which phase to run? (1, 2, 3, or 4, default: 4): ").strip()
+                phase = (await ainput("Which phase to run? (1, 2, 3, or 4, default: 4): ")).strip()
                 phase = int(phase) if phase.isdigit() else 4
 
-                scheduler = ContentCreatorScheduler(phase=phase)
+                scheduler = ContentCreatorScheduler(phase=phase, orchestrator=orchestrator)
                 scheduler.start()
 
                 # Run initial pipeline
@@ -302,13 +410,10 @@ async def run_interactive_mode():
 
                 # Keep running
                 logger.info("\nScheduler running. Press Ctrl+C to stop and return to menu.")
-                try:
-                    while True:
-                        await asyncio.sleep(60)
-                except KeyboardInterrupt:
-                    logger.info("\nStopping scheduler...")
-                    scheduler.stop()
-                    logger.info("Scheduler stopped. Returning to menu.")
+                await wait_for_shutdown(signal.SIGINT)
+                logger.info("\nStopping scheduler...")
+                scheduler.stop()
+                logger.info("Scheduler stopped. Returning to menu.")
 
             elif choice == "19":
                 logger.info("Fetching pending approvals...")
@@ -329,7 +434,7 @@ async def run_interactive_mode():
                         logger.info(f"   Preview: {approval['content_preview']}...")
 
                     # Ask if user wants to approve any
-                    approve = input("\nEnter plan ID to approve (or 'skip'): ")
+                    approve = await ainput("\nEnter plan ID to approve (or 'skip'): ")
 
                     if approve.isdigit():
                         plan_id = int(approve)
@@ -352,50 +457,61 @@ async def run_interactive_mode():
             logger.error(f"Error: {e}")
             logger.exception("Full traceback:")
 
-        input("\nPress Enter to continue...")
+        await ainput("\nPress Enter to continue...")
 
 
 async def run_scheduled_mode():
     """Run the system in scheduled mode (daemon)."""
+    from src.orchestrator import AgentOrchestrator
+    from src.scheduler import ContentCreatorScheduler
+
     setup_logger()
     print_banner()
 
     logger.info("Starting in scheduled mode...")
-    scheduler = ContentCreatorScheduler()
+    orchestrator = AgentOrchestrator()
+    scheduler = ContentCreatorScheduler(orchestrator=orchestrator)
     scheduler.start()
 
     # Run initial pipeline
     logger.info("Running initial full pipeline...")
-    await scheduler.orchestrator.run_full_pipeline()
+    await orchestrator.run_full_pipeline()
 
     # Keep running
-    try:
-        logger.info("\nScheduler is running. Press Ctrl+C to exit.")
-        while True:
-            await asyncio.sleep(60)
-    except (KeyboardInterrupt, SystemExit):
-        logger.info("\nShutting down...")
-        scheduler.stop()
+    logger.info("\nScheduler is running. Press Ctrl+C to exit.")
+    await wait_for_shutdown(signal.SIGINT, signal.SIGTERM)
+    logger.info("\nShutting down...")
+    scheduler.stop()
 
 def run_api_mode():
     """Run the system in API mode using Flask."""
+    # Importing the Flask app builds its orchestrator and scheduler
+    from src.api import app as api_app
+
     setup_logger()
     print_banner()
     logger.info("Starting Content Creator API server...")
     api_app.run(host='0.0.0.0', port=5001)
 
+def run_event_loop(coro):
+    """Run a coroutine on uvloop when it is installed, else on the stock asyncio loop."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
 def main():
     """Main entry point."""
     if len(sys.argv) > 1:
         if sys.argv[1] == "--scheduled":
-            asyncio.run(run_scheduled_mode())
+            run_event_loop(run_scheduled_mode())
         elif sys.argv[1] == "--api":
             run_api_mode()
         else:
             print("Invalid argument. Use --scheduled or --api.")
             sys.exit(1)
     else:
-        asyncio.run(run_interactive_mode())
+        run_event_loop(run_interactive_mode())
 
 
 if __name__ == "__main__":
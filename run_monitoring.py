@@ -10,17 +10,45 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from loguru import logger
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional faster event loop
+    uvloop = None
 
-async def main():
-    """Run monitoring cycle and display results."""
-    
-    print("""
+_BANNER = """
 ╔══════════════════════════════════════════════════════════╗
 ║                                                          ║
 ║     Layer 1: Monitoring Agents - Running Cycle          ║
 ║                                                          ║
 ╚══════════════════════════════════════════════════════════╝
-""")
+"""
+
+_REPORT_TEMPLATE = """
+============================================================
+MONITORING RESULTS
+============================================================
+
+📊 Individual Scores:
+   Code Health:    {code:.1f}/100
+   Performance:    {perf:.1f}/100
+   Security:       {security:.1f}/100
+   Dependencies:   {deps:.1f}/100
+
+🎯 Overall Score:  {overall:.1f}/100
+   Status:         {status}
+
+⏱️  Duration:       {duration:.2f} seconds
+
+📁 Results saved to: logs/autonomous_agents/orchestrator/
+
+============================================================
+"""
+
+
+async def main():
+    """Run monitoring cycle and display results."""
+    
+    print(_BANNER)
     
     try:
         from src.autonomous_agents.monitoring import MonitoringOrchestrator
@@ -29,28 +57,18 @@ async def main():
         results = await orchestrator.run_all_agents()
         
         # Display results
-        print("\n" + "=" * 60)
-        print("MONITORING RESULTS")
-        print("=" * 60)
-        
         aggregate = results.get('aggregate', {})
         scores = aggregate.get('scores', {})
-        
-        print(f"\n📊 Individual Scores:")
-        print(f"   Code Health:    {scores.get('code_health', 0):.1f}/100")
-        print(f"   Performance:    {scores.get('performance', 0):.1f}/100")
-        print(f"   Security:       {scores.get('security', 0):.1f}/100")
-        print(f"   Dependencies:   {scores.get('dependencies', 0):.1f}/100")
-        
-        print(f"\n🎯 Overall Score:  {aggregate.get('overall_score', 0):.1f}/100")
-        print(f"   Status:         {aggregate.get('status', 'unknown').upper()}")
-        
-        print(f"\n⏱️  Duration:       {results.get('duration_seconds', 0):.2f} seconds")
-        
-        # Show improvements logged
-        print(f"\n📁 Results saved to: logs/autonomous_agents/orchestrator/")
-        
-        print("\n" + "=" * 60)
+
+        sys.stdout.write(_REPORT_TEMPLATE.format(
+            code=scores.get('code_health', 0),
+            perf=scores.get('performance', 0),
+            security=scores.get('security', 0),
+            deps=scores.get('dependencies', 0),
+            overall=aggregate.get('overall_score', 0),
+            status=aggregate.get('status', 'unknown').upper(),
+            duration=results.get('duration_seconds', 0),
+        ))
         
         return results
         
@@ -65,8 +83,15 @@ async def main():
         return None
 
 
+def run_event_loop(coro):
+    """Run a coroutine on uvloop when it is installed, else on the stock asyncio loop."""
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
 if __name__ == "__main__":
-    results = asyncio.run(main())
+    results = run_event_loop(main())
     
     if results:
         status = results.get('aggregate', {}).get('status', 'unknown')
@@ -5,24 +5,26 @@ Utility script to create API keys for the Content Creator system.
 import sys
 import os
 import secrets
-import hashlib
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from src.database.connection import get_db, init_db
-from src.database.models import APIKey, Base
+from sqlalchemy import inspect
+
+from src.database.connection import engine, get_db, init_db
+from src.database.models import APIKey
+from src.utils.api_keys import hash_api_key
 
 def create_key(owner_name: str, owner_email: str = None):
     """Generate and store a new API key."""
     
     # Generate a secure random key
-    # Format: pk_ (public key) + 32 random hex chars
-    raw_key = f"pk_{secrets.token_hex(16)}"
+    # Format: pk_ (public key) + 22 URL-safe base64 chars (128 bits)
+    raw_key = "pk_" + secrets.token_urlsafe(16)
     
-    # Hash the key for storage (SHA-256)
-    key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+    # Hash the key for storage (BLAKE2b)
+    key_hash = hash_api_key(raw_key)
     
     with get_db() as db:
         # Create DB record
@@ -48,7 +50,9 @@ if __name__ == "__main__":
     name = sys.argv[1]
     email = sys.argv[2] if len(sys.argv) > 2 else None
     
-    # Ensure tables exist (specifically api_keys)
-    init_db()
+    # Ensure tables exist (specifically api_keys); skip the full
+    # create_all round-trips when the schema is already in place
+    if not inspect(engine).has_table(APIKey.__tablename__):
+        init_db()
     
     create_key(name, email)
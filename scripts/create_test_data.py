@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import asyncio
 from datetime import datetime
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from loguru import logger
@@ -27,7 +28,6 @@ async def create_test_insights():
 
     async with async_session() as session:
         # Get recent market data to link insights to
-        from sqlalchemy import select
         result = await session.execute(
             select(MarketData).order_by(MarketData.created_at.desc()).limit(1)
         )
@@ -116,22 +116,16 @@ async def create_test_insights():
             }
         ]
 
-        insights_created = 0
-
-        for insight_data in test_insights:
-            insight = Insight(
-                type=insight_data["type"],
-                asset=insight_data["asset"],
-                details=insight_data["details"],
-                confidence=insight_data["confidence"],
-                supporting_data_ids=insight_data["supporting_data_ids"],
-                timestamp=datetime.utcnow(),
-                is_published=False,
-                is_exclusive=False
-            )
-            session.add(insight)
-            insights_created += 1
-            print(f"\n✓ Created {insight_data['type'].value} insight for {insight_data['asset']}: {insight_data['details']['summary'][:60]}...")
+        now = datetime.utcnow()
+        rows = [
+            {**insight_data, "timestamp": now, "is_published": False, "is_exclusive": False}
+            for insight_data in test_insights
+        ]
+
+        # Single multi-row INSERT instead of one ORM object per insight
+        await session.execute(insert(Insight), rows)
+        insights_created = len(rows)
+        print(f"\n✓ Created {insights_created} insights")
 
         await session.commit()
 
@@ -20,17 +20,17 @@ async def show_content():
     print("="*70 + "\n")
 
     with get_db() as db:
+        # Stream plans in batches of 50 so generation starts with the first batch
         plans = db.query(ContentPlan).options(
             joinedload(ContentPlan.insight)
         ).filter(
             ContentPlan.status == "ready"
-        ).all()
+        ).execution_options(stream_results=True).yield_per(50)
 
-        if not plans:
-            print("⚠️  Geen content plans gevonden.")
-            return
+        printed = 0
 
         for i, plan in enumerate(plans, 1):
+            printed = i
             # Expunge to use outside session
             db.expunge(plan)
             db.expunge(plan.insight)
@@ -72,6 +72,10 @@ async def show_content():
             except Exception as e:
                 print(f"\n❌ Error: {e}")
 
+        if not printed:
+            print("⚠️  Geen content plans gevonden.")
+            return
+
     print("\n" + "="*70)
     print("✅ Content weergave compleet!")
     print("="*70 + "\n")
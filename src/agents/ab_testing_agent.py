@@ -1,11 +1,15 @@
 """ABTestingAgent - Automatically tests content variations for optimization."""
 
+import asyncio
 import json
 import math
+import random
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import selectinload
 
 from config.config import settings
 from src.agents.base_agent import BaseAgent
@@ -17,6 +21,40 @@ from src.database.models import (
     PublishedContent,
     TestStatus,
 )
+from src.utils import json_utils
+from src.utils.llm_cache import LLMCache
+
+INV_SQRT2 = 1.0 / math.sqrt(2.0)
+
+LLM_MODEL = "claude-3-5-sonnet-20241022"
+
+# Static instructions go in the system block so Anthropic can cache the prefix;
+# the per-call user message only carries the test or insight data.
+SYSTEM_INSIGHT_EXPERT = """You are an A/B testing expert. You will be given the results of a \
+content A/B test: the test name, the variable being tested, and the configuration and \
+engagement rate of the control and of the winning variant.
+
+Provide a single-sentence insight explaining why the winning variant likely performed better."""
+
+SYSTEM_VARIANT_EXPERT = """You are a content optimization expert. You will be given a market \
+insight and the variable to A/B test. Generate 2 variations: a control variant and one test \
+variant. For each variant, specify the configuration of the variable being tested.
+
+Respond with JSON:
+[
+  {
+    "name": "control",
+    "is_control": true,
+    "config": {"the config for control variant"}
+  },
+  {
+    "name": "variant_a",
+    "is_control": false,
+    "config": {"the config for test variant"}
+  }
+]
+
+Be creative and data-driven in your variations."""
 
 
 class ABTestingAgent(BaseAgent):
@@ -37,7 +75,11 @@ class ABTestingAgent(BaseAgent):
         super().__init__("ABTestingAgent")
 
         # Initialize LLM for variant generation
-        self.llm_client = Anthropic(api_key=settings.anthropic_api_key)
+        self.llm_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        self.llm_cache = LLMCache()
+
+        # Bound concurrent LLM requests when tests are analyzed/created in parallel
+        self._llm_sem = asyncio.Semaphore(32)
 
         # Testing parameters from config
         self.min_sample_size = settings.ab_testing_min_sample_size
@@ -105,35 +147,66 @@ class ABTestingAgent(BaseAgent):
         self.log_info("Analyzing active A/B tests...")
 
         with get_db() as db:
-            active_tests = db.query(ABTest).filter(ABTest.status == TestStatus.ACTIVE).all()
+            active_test_ids = [
+                test_id
+                for (test_id,) in db.query(ABTest.id).filter(ABTest.status == TestStatus.ACTIVE)
+            ]
+
+            # Update metrics for every variant of every active test in one aggregate query
+            self._update_variant_metrics_bulk(active_test_ids, db)
+
+            # Load the tests plus, in one extra IN query, only the variants worth
+            # analyzing: the control and those with enough samples
+            active_tests = (
+                db.query(ABTest)
+                .options(
+                    selectinload(
+                        ABTest.variants.and_(
+                            or_(
+                                ABTestVariant.is_control.is_(True),
+                                ABTestVariant.sample_size >= self.min_sample_size,
+                            )
+                        )
+                    )
+                )
+                .filter(ABTest.id.in_(active_test_ids))
+                .all()
+            )
 
             analyzed_count = 0
             completed_count = 0
             winners_count = 0
             learnings = []
 
-            for test in active_tests:
-                analyzed_count += 1
+            # Analyze all tests concurrently (LLM-bound); DB writes stay serial below
+            winners = await asyncio.gather(
+                *(self._analyze_test_results(test, test.variants) for test in active_tests)
+            )
 
-                # Check if test has enough data
-                variants = db.query(ABTestVariant).filter(ABTestVariant.test_id == test.id).all()
+            # One timestamp for the whole batch; a test is stale once it has run
+            # more than test_duration_days full days
+            now = datetime.now(tz=timezone.utc)
+            stale_threshold = timedelta(days=self.test_duration_days + 1)
 
-                # Update variant metrics from published content
-                for variant in variants:
-                    await self._update_variant_metrics(variant, db)
+            # Completed tests are collected and written in one transaction after the loop
+            winner_mappings = []
+            stale_ids = []
 
-                # Check if we can determine a winner
-                winner = await self._analyze_test_results(test, variants)
+            for test, winner in zip(active_tests, winners):
+                analyzed_count += 1
 
                 if winner:
                     # Complete the test
-                    test.status = TestStatus.COMPLETED
-                    test.completed_at = datetime.now(tz=timezone.utc)
-                    test.winning_variant_id = winner["variant_id"]
-                    test.confidence_level = winner["confidence"]
-                    test.improvement_percentage = winner["improvement"]
-
-                    db.commit()
+                    winner_mappings.append(
+                        {
+                            "id": test.id,
+                            "status": TestStatus.COMPLETED,
+                            "completed_at": now,
+                            "winning_variant_id": winner["variant_id"],
+                            "confidence_level": winner["confidence"],
+                            "improvement_percentage": winner["improvement"],
+                        }
+                    )
 
                     completed_count += 1
                     winners_count += 1
@@ -156,12 +229,11 @@ class ABTestingAgent(BaseAgent):
                     )
 
                 # Check for stale tests (running too long)
-                test_age = datetime.now(tz=timezone.utc) - test.started_at
-                if test_age.days > self.test_duration_days and not winner:
+                # started_at is stored as naive UTC
+                started_at = test.started_at.replace(tzinfo=timezone.utc)
+                if not winner and now - started_at >= stale_threshold:
                     # No clear winner after max duration
-                    test.status = TestStatus.COMPLETED
-                    test.completed_at = datetime.now(tz=timezone.utc)
-                    db.commit()
+                    stale_ids.append(test.id)
 
                     completed_count += 1
 
@@ -170,6 +242,18 @@ class ABTestingAgent(BaseAgent):
                         f"(duration exceeded {self.test_duration_days} days)"
                     )
 
+            if winner_mappings:
+                db.bulk_update_mappings(ABTest, winner_mappings)
+            if stale_ids:
+                db.query(ABTest).filter(ABTest.id.in_(stale_ids)).update(
+                    {
+                        ABTest.status: TestStatus.COMPLETED,
+                        ABTest.completed_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            db.commit()
+
             return {
                 "analyzed_count": analyzed_count,
                 "completed_count": completed_count,
@@ -177,40 +261,55 @@ class ABTestingAgent(BaseAgent):
                 "learnings": learnings,
             }
 
-    async def _update_variant_metrics(self, variant: ABTestVariant, db) -> None:
+    def _update_variant_metrics_bulk(self, test_ids: list[int], db) -> None:
         """
-        Update variant metrics from published content.
+        Update metrics for all variants of the given tests from published content.
+
+        Engagement is aggregated in a single query and written back with a bulk
+        UPDATE, so no variant objects need to be loaded.
 
         Args:
-            variant: The variant to update
+            test_ids: IDs of the tests whose variants to update
             db: Database session
         """
-        # Get all published content for this variant
-        content_items = (
-            db.query(PublishedContent)
-            .filter(PublishedContent.ab_test_variant_id == variant.id)
+        if not test_ids:
+            return
+
+        # Aggregate engagement per variant in the database
+        rows = (
+            db.query(
+                PublishedContent.ab_test_variant_id,
+                func.sum(func.coalesce(PublishedContent.views, 0)),
+                func.sum(func.coalesce(PublishedContent.likes, 0)),
+                func.sum(func.coalesce(PublishedContent.comments, 0)),
+                func.sum(func.coalesce(PublishedContent.shares, 0)),
+                func.count(PublishedContent.id),
+            )
+            .join(ABTestVariant, ABTestVariant.id == PublishedContent.ab_test_variant_id)
+            .filter(ABTestVariant.test_id.in_(test_ids))
+            .group_by(PublishedContent.ab_test_variant_id)
             .all()
         )
 
-        if not content_items:
-            return
-
-        # Aggregate metrics
-        total_views = sum(c.views or 0 for c in content_items)
-        total_likes = sum(c.likes or 0 for c in content_items)
-        total_comments = sum(c.comments or 0 for c in content_items)
-        total_shares = sum(c.shares or 0 for c in content_items)
+        mappings = []
+        for variant_id, total_views, likes, comments, shares, content_count in rows:
+            mapping = {
+                "id": variant_id,
+                "impressions": total_views,
+                "engagement_count": likes + comments + shares,
+                "sample_size": content_count,
+            }
 
-        variant.impressions = total_views
-        variant.engagement_count = total_likes + total_comments + total_shares
-        variant.sample_size = len(content_items)
+            # Calculate rates
+            if total_views > 0:
+                mapping["engagement_rate"] = mapping["engagement_count"] / total_views
+                mapping["click_through_rate"] = (likes + shares) / total_views
 
-        # Calculate rates
-        if total_views > 0:
-            variant.engagement_rate = variant.engagement_count / total_views
-            variant.click_through_rate = (total_likes + total_shares) / total_views
+            mappings.append(mapping)
 
-        db.commit()
+        if mappings:
+            db.bulk_update_mappings(ABTestVariant, mappings)
+            db.commit()
 
     async def _analyze_test_results(
         self, test: ABTest, variants: list[ABTestVariant]
@@ -228,25 +327,37 @@ class ABTestingAgent(BaseAgent):
         if len(variants) < 2:
             return None
 
-        # Find control variant
-        control = next((v for v in variants if v.is_control), variants[0])
+        # Split control from candidates in one pass (first variant if none is marked)
+        control = None
+        candidates = []
+        for variant in variants:
+            if variant.is_control and control is None:
+                control = variant
+            else:
+                candidates.append(variant)
+        if control is None:
+            control = candidates.pop(0)
 
         # Check if control has enough data
         if control.sample_size < self.min_sample_size:
             return None
 
+        # Skip every significance calculation when no variant has enough data;
+        # otherwise evaluate the best-powered variants first
+        candidates = sorted(
+            (v for v in candidates if v.sample_size >= self.min_sample_size),
+            key=lambda v: v.sample_size,
+            reverse=True,
+        )
+        if not candidates:
+            return None
+
         # Compare each variant to control
         best_variant = None
         best_improvement = 0
         best_confidence = 0
 
-        for variant in variants:
-            if variant.id == control.id:
-                continue
-
-            if variant.sample_size < self.min_sample_size:
-                continue
-
+        for variant in candidates:
             # Calculate improvement
             if control.engagement_rate > 0:
                 improvement = (
@@ -319,15 +430,9 @@ class ABTestingAgent(BaseAgent):
         # Z-score
         z = abs(p2 - p1) / se
 
-        # Convert z-score to confidence level (simplified)
-        # z=1.96 ≈ 95% confidence, z=2.58 ≈ 99% confidence
-        if z >= 2.58:
-            return 0.99
-        if z >= 1.96:
-            return 0.95
-        if z >= 1.645:
-            return 0.90
-        return min(0.85, z / 1.96 * 0.95)
+        # Two-sided confidence from the normal CDF: 1 - p = erf(z / sqrt(2))
+        # z=1.96 -> 0.95, z=2.58 -> 0.99
+        return math.erf(z * INV_SQRT2)
 
     async def _generate_test_insight(
         self, test: ABTest, control: ABTestVariant, winner: ABTestVariant, improvement: float
@@ -345,32 +450,64 @@ class ABTestingAgent(BaseAgent):
             Insight text
         """
         try:
-            prompt = f"""You are an A/B testing expert. Analyze these test results and provide a concise insight.
-
-Test: {test.test_name}
+            # Compact, key-sorted JSON keeps prompts short and deterministic for the LLM cache
+            control_config = json.dumps(
+                control.variant_config, separators=(",", ":"), sort_keys=True
+            )
+            winner_config = json.dumps(winner.variant_config, separators=(",", ":"), sort_keys=True)
+            prompt = f"""Test: {test.test_name}
 Variable Tested: {test.variable_being_tested}
 
-Control variant: {json.dumps(control.variant_config, indent=2)}
+Control variant: {control_config}
 - Engagement rate: {control.engagement_rate:.2%}
 
-Winning variant: {json.dumps(winner.variant_config, indent=2)}
+Winning variant: {winner_config}
 - Engagement rate: {winner.engagement_rate:.2%}
-- Improvement: {improvement:.1f}%
+- Improvement: {improvement:.1f}%"""
 
-Provide a single-sentence insight explaining why the winning variant likely performed better."""
-
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=200,
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            return message.content[0].text.strip()
+            return await self._complete("insight", SYSTEM_INSIGHT_EXPERT, prompt, max_tokens=200)
 
         except Exception as e:
             self.log_error(f"Error generating test insight: {e}")
             return f"Variant {winner.variant_name} performed {improvement:.1f}% better than control"
 
+    async def _complete(
+        self, fn: str, system: str, prompt: str, max_tokens: int, use_cache: bool = True
+    ) -> str:
+        """
+        Run a completion, serving repeated prompts from the LLM cache.
+
+        Args:
+            fn: Name of the calling function, part of the cache key
+            system: Static system prompt, marked for Anthropic prompt caching
+            prompt: Per-call user message
+            max_tokens: Maximum tokens to generate
+            use_cache: Whether to read and write the cache
+
+        Returns:
+            Stripped response text
+        """
+        key = LLMCache.make_key(fn, LLM_MODEL, system + prompt) if use_cache else None
+        if key:
+            cached = self.llm_cache.get(key)
+            if cached is not None:
+                self.log_info(f"LLM cache hit for {fn} (hits={self.llm_cache.hits})")
+                return cached
+            self.log_info(f"LLM cache miss for {fn} (misses={self.llm_cache.misses})")
+
+        async with self._llm_sem:
+            message = await self.llm_client.messages.create(
+                model=LLM_MODEL,
+                max_tokens=max_tokens,
+                system=[{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": prompt}],
+            )
+        text = message.content[0].text.strip()
+
+        if key:
+            self.llm_cache.set(key, text)
+        return text
+
     async def _create_new_tests(self) -> dict:
         """
         Create new A/B tests based on opportunities.
@@ -383,12 +520,14 @@ Provide a single-sentence insight explaining why the winning variant likely perf
         with get_db() as db:
             # Check how many active tests we have
             active_count = db.query(ABTest).filter(ABTest.status == TestStatus.ACTIVE).count()
+            slots = self.max_active_tests - active_count
 
-            if active_count >= self.max_active_tests:
+            if slots <= 0:
                 self.log_info(f"Already at max active tests ({self.max_active_tests})")
                 return {"created_count": 0}
 
-            # Find high-confidence insights that could benefit from testing
+            # Find the most confident fresh insights, at most 3 per run and never more
+            # than there are free test slots
             cutoff = datetime.now(tz=timezone.utc) - timedelta(days=1)
 
             insights = (
@@ -398,18 +537,26 @@ Provide a single-sentence insight explaining why the winning variant likely perf
                     Insight.confidence >= 0.85,
                     Insight.is_published.is_(False),
                 )
-                .limit(3)
+                .order_by(Insight.confidence.desc(), Insight.timestamp.desc())
+                .limit(min(slots, 3))
                 .all()
             )
 
             created_count = 0
 
-            for insight in insights:
-                if active_count + created_count >= self.max_active_tests:
-                    break
+            # Generate variants for every insight concurrently, then insert serially
+            history = self._variable_history(db)
+            variables = [self._pick_variable(history) for _ in insights]
+            variant_sets = await asyncio.gather(
+                *(
+                    self._generate_test_variants(insight, variable)
+                    for insight, variable in zip(insights, variables)
+                )
+            )
 
+            for insight, variable, variants in zip(insights, variables, variant_sets):
                 # Create a test for this insight
-                test = await self._create_test_for_insight(insight, db)
+                test = self._create_test_for_insight(insight, variable, variants, db)
 
                 if test:
                     created_count += 1
@@ -417,23 +564,67 @@ Provide a single-sentence insight explaining why the winning variant likely perf
 
             return {"created_count": created_count}
 
-    async def _create_test_for_insight(self, insight: Insight, db) -> Optional[ABTest]:
+    def _variable_history(self, db) -> dict[str, tuple[int, int]]:
+        """
+        Count past wins and losses per tested variable.
+
+        A win is a completed test whose winner improved engagement by more than 5%.
+
+        Args:
+            db: Database session
+
+        Returns:
+            (wins, losses) per variable that has completed tests
+        """
+        rows = (
+            db.query(
+                ABTest.variable_being_tested,
+                func.sum(case((ABTest.improvement_percentage > 5, 1), else_=0)),
+                func.count(ABTest.id),
+            )
+            .filter(ABTest.winning_variant_id.isnot(None))
+            .group_by(ABTest.variable_being_tested)
+            .all()
+        )
+        return {variable: (wins, total - wins) for variable, wins, total in rows}
+
+    def _pick_variable(self, history: dict[str, tuple[int, int]]) -> str:
+        """
+        Pick the variable to test with Thompson sampling over past results.
+
+        Each variable gets a Beta(1 + wins, 1 + losses) posterior.
+
+        Args:
+            history: (wins, losses) per variable, from _variable_history
+
+        Returns:
+            Name of the variable to test
+        """
+        if not history:
+            return random.choice(self.testable_variables)
+
+        def sample(variable: str) -> float:
+            wins, losses = history.get(variable, (0, 0))
+            return random.betavariate(1 + wins, 1 + losses)
+
+        return max(self.testable_variables, key=sample)
+
+    def _create_test_for_insight(
+        self, insight: Insight, variable: str, variants: list[dict], db
+    ) -> Optional[ABTest]:
         """
         Create an A/B test for a specific insight.
 
         Args:
             insight: The insight to test
+            variable: Variable being tested
+            variants: Variant configurations from _generate_test_variants
             db: Database session
 
         Returns:
             Created ABTest or None
         """
         try:
-            # Choose what to test (randomly pick a variable for now)
-            import random
-
-            variable = random.choice(self.testable_variables)
-
             # Create test
             test = ABTest(
                 test_name=f"{insight.asset}_{insight.type.value}_{variable}_test",
@@ -448,9 +639,6 @@ Provide a single-sentence insight explaining why the winning variant likely perf
             db.add(test)
             db.flush()
 
-            # Generate variants using AI
-            variants = await self._generate_test_variants(insight, variable, test.id)
-
             for variant_data in variants:
                 variant = ABTestVariant(
                     test_id=test.id,
@@ -469,60 +657,38 @@ Provide a single-sentence insight explaining why the winning variant likely perf
             db.rollback()
             return None
 
-    async def _generate_test_variants(
-        self, insight: Insight, variable: str, test_id: int
-    ) -> list[dict]:
+    async def _generate_test_variants(self, insight: Insight, variable: str) -> list[dict]:
         """
         Generate test variants using AI.
 
         Args:
             insight: The insight
             variable: Variable being tested
-            test_id: Test ID
 
         Returns:
             List of variant configurations
         """
         try:
-            prompt = f"""You are a content optimization expert. Generate 2 variations to A/B test.
-
-Insight: {json.dumps(insight.details, indent=2)}
+            details = json.dumps(insight.details, separators=(",", ":"), sort_keys=True)
+            prompt = f"""Insight: {details}
 Asset: {insight.asset}
 Type: {insight.type.value}
 
-Variable to test: {variable}
+Variable to test: {variable}"""
 
-Generate a control variant and one test variant. For each variant, specify the {variable} configuration.
-
-Respond with JSON:
-[
-  {{
-    "name": "control",
-    "is_control": true,
-    "config": {{"the config for control variant"}}
-  }},
-  {{
-    "name": "variant_a",
-    "is_control": false,
-    "config": {{"the config for test variant"}}
-  }}
-]
-
-Be creative and data-driven in your variations."""
-
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+            # Posting-time variants benefit from fresh randomness on every test
+            response_text = await self._complete(
+                "variants",
+                SYSTEM_VARIANT_EXPERT,
+                prompt,
                 max_tokens=500,
-                messages=[{"role": "user", "content": prompt}],
+                use_cache=variable != "posting_time",
             )
 
-            response_text = message.content[0].text.strip()
-
-            # Parse JSON
-            start_idx = response_text.find("[")
-            end_idx = response_text.rfind("]") + 1
-            json_str = response_text[start_idx:end_idx]
-            return json.loads(json_str)
+            # Parse the JSON array; index/rindex raise (-> defaults) if it is missing
+            start_idx = response_text.index("[")
+            end_idx = response_text.rindex("]") + 1
+            return json_utils.loads(response_text[start_idx:end_idx])
 
         except Exception as e:
             self.log_error(f"Error generating variants: {e}")
@@ -544,13 +710,17 @@ Be creative and data-driven in your variations."""
             Dictionary with test results
         """
         with get_db() as db:
-            test = db.query(ABTest).filter(ABTest.id == test_id).first()
+            # selectinload avoids the duplicated parent rows (and .unique()) of a JOIN
+            test = (
+                db.query(ABTest)
+                .options(selectinload(ABTest.variants))
+                .filter(ABTest.id == test_id)
+                .first()
+            )
 
             if not test:
                 return {"error": "Test not found"}
 
-            variants = db.query(ABTestVariant).filter(ABTestVariant.test_id == test_id).all()
-
             return {
                 "test_name": test.test_name,
                 "status": test.status.value,
@@ -571,7 +741,7 @@ Be creative and data-driven in your variations."""
                         "engagement_rate": v.engagement_rate,
                         "sample_size": v.sample_size,
                     }
-                    for v in variants
+                    for v in test.variants
                 ],
             }
 
@@ -594,17 +764,20 @@ Be creative and data-driven in your variations."""
                 .all()
             )
 
+            # Fetch every winning variant in a single IN query
+            winner_ids = [t.winning_variant_id for t in completed_tests if t.winning_variant_id]
+            winners = {
+                v.id: v
+                for v in db.query(ABTestVariant).filter(ABTestVariant.id.in_(winner_ids)).all()
+            }
+
             learnings = []
 
             for test in completed_tests:
                 if not test.winning_variant_id:
                     continue
 
-                winner = (
-                    db.query(ABTestVariant)
-                    .filter(ABTestVariant.id == test.winning_variant_id)
-                    .first()
-                )
+                winner = winners.get(test.winning_variant_id)
 
                 learnings.append(
                     {
@@ -2,19 +2,104 @@
 
 import asyncio
 import json
+import math
+import time
+from collections import defaultdict
+from collections.abc import Callable, Mapping
 from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import ClassVar, Optional
 
-import pandas as pd
-from anthropic import Anthropic
+import numpy as np
+from sqlalchemy import and_, func
+from sqlalchemy.engine import Row
 
-from config.config import settings
 from src.agents.base_agent import BaseAgent
 from src.api_integrations.exchange_api import ExchangeAPI
+from src.database.asyncpg_pool import async_pool
 from src.database.connection import get_db
-from src.database.models import Insight, InsightType, MarketData, NewsArticle, SentimentData
-from config.config import settings
+from src.database.models import (
+    Insight,
+    InsightType,
+    MarketData,
+    NewsArticle,
+    NewsAssetMention,
+    SentimentData,
+)
+from src.utils import json_utils
+from src.utils._njit import njit
+from src.utils.llm_batcher import LLMBatcher
+from src.utils.llm_cache import LLMCache
 from src.utils.llm_client import llm_client
 
+# Width of the buckets numeric features are rounded into for the semantic cache
+SEMANTIC_BUCKET_WIDTH = 0.25
+
+# Record layout of the per-asset market data arrays used by technical analysis
+MARKET_DTYPE = np.dtype(
+    [("timestamp", "datetime64[us]"), ("price", "f8"), ("volume", "f8"), ("change", "f8")]
+)
+
+# Prompt skeleton for _get_llm_analysis; {insight_type} is filled in per type up front
+_PROMPT_TEMPLATE = """You are a crypto market analyst. Analyze the following {insight_type} for {asset}.
+
+Data:
+{data_json}
+
+Provide a concise, professional analysis (2-3 sentences) explaining:
+1. What this means for the asset
+2. Why this is significant
+3. Potential implications
+
+Be factual and avoid speculation. Focus on what the data shows."""
+
+# Signal codes returned by _compute_tech_signals
+SIGNAL_NONE = 0
+SIGNAL_BREAKOUT = 1
+SIGNAL_VOLUME_SPIKE = 2
+
+
+@njit(cache=True)
+def _compute_tech_signals(
+    prices: np.ndarray, volumes: np.ndarray, changes: np.ndarray
+) -> tuple[int, float, float, float, float]:
+    """
+    Compute the technical indicators for one asset's market data.
+
+    Compiled with Numba when it is installed; plain Python otherwise.
+
+    Args:
+        prices: Prices, oldest first
+        volumes: 24h volumes (NaN for missing values)
+        changes: 24h price changes in percent
+
+    Returns:
+        Tuple of (signal code, price, change, volume ratio, confidence)
+    """
+    price = prices[-1]
+    change = changes[-1]
+    volume = volumes[-1]
+
+    # Average volume, skipping missing values
+    total = 0.0
+    count = 0
+    for v in volumes:
+        if not np.isnan(v):
+            total += v
+            count += 1
+    avg_volume = total / count if count > 0 else 0.0
+    volume_ratio = volume / avg_volume if avg_volume > 0 else 1.0
+
+    # Breakout: significant price change + high volume
+    if abs(change) > 5 and volume_ratio > 1.5:
+        confidence = min(0.95, 0.6 + (abs(change) / 100) + (volume_ratio / 10))
+        return SIGNAL_BREAKOUT, price, change, volume_ratio, confidence
+
+    if volume_ratio > 2:
+        return SIGNAL_VOLUME_SPIKE, price, change, volume_ratio, 0.65 + min(0.3, volume_ratio / 20)
+
+    return SIGNAL_NONE, price, change, volume_ratio, 0.0
+
 
 class AnalysisAgent(BaseAgent):
     """
@@ -27,6 +112,14 @@ class AnalysisAgent(BaseAgent):
     - Assign confidence scores to insights
     """
 
+    # Prompt formatters specialized per insight type, built once instead of on every call
+    _PROMPT_FORMATTERS: ClassVar[Mapping[str, Callable[..., str]]] = MappingProxyType(
+        {
+            t.value: _PROMPT_TEMPLATE.replace("{insight_type}", t.value).format
+            for t in InsightType
+        }
+    )
+
     def __init__(self):
         """Initialize the AnalysisAgent."""
         super().__init__("AnalysisAgent")
@@ -35,9 +128,22 @@ class AnalysisAgent(BaseAgent):
         self.llm_client = llm_client
         self.exchange_api = ExchangeAPI()
 
+        # Prompts from all assets are micro-batched instead of sent one by one
+        self.llm_batcher = LLMBatcher(self._generate_llm, max_batch=8, max_inflight=4)
+
+        # Analyses are informational, so cached responses are safe to reuse:
+        # exact prompt matches, then near-identical signals within an hour
+        self.llm_cache = LLMCache(max_entries=2048)
+        self.semantic_cache = LLMCache(default_ttl=3600, max_entries=2048)
+
         # Analysis parameters
         self.min_confidence = 0.5  # Minimum confidence to save insight
         self.lookback_hours = 24  # How far back to look for data
+        self.max_concurrent_assets = 8  # Assets analyzed at once (LLM calls are batched separately)
+        self.active_assets_ttl = 3600  # Seconds the active asset list is reused across runs
+
+        # (expires_at, assets) from the last _get_active_assets query
+        self._active_assets: Optional[tuple[float, list[str]]] = None
 
     async def execute(self) -> dict:
         """
@@ -60,17 +166,43 @@ class AnalysisAgent(BaseAgent):
             assets = await self._get_active_assets()
             results["assets_analyzed"] = len(assets)
 
-            # Analyze each asset
-            for asset in assets:
-                try:
-                    insights = await self._analyze_asset(asset)
-                    results["insights_generated"] += len(insights)
-                    results["high_confidence_insights"] += sum(
-                        1 for i in insights if i.confidence >= 0.8
+            # Load the data for every asset with three queries instead of three per asset
+            cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
+            market_data, news_data, sentiment_data = await self._prefetch_all(assets, cutoff_time)
+
+            # Analyze assets concurrently (bounded) so their LLM prompts share batches
+            semaphore = asyncio.Semaphore(self.max_concurrent_assets)
+
+            async def analyze_guarded(asset: str) -> list[Insight]:
+                async with semaphore:
+                    return await self._analyze_asset(
+                        asset,
+                        market_data.get(asset, np.empty(0, dtype=MARKET_DTYPE)),
+                        news_data.get(asset, []),
+                        sentiment_data.get(asset),
                     )
-                except Exception as e:
-                    self.log_error(f"Error analyzing {asset}: {e}")
-                    results["errors"].append(f"{asset}: {e!s}")
+
+            asset_results = await asyncio.gather(
+                *(analyze_guarded(asset) for asset in assets), return_exceptions=True
+            )
+
+            all_insights = []
+            for asset, insights in zip(assets, asset_results):
+                if isinstance(insights, Exception):
+                    self.log_error(f"Error analyzing {asset}: {insights}")
+                    results["errors"].append(f"{asset}: {insights!s}")
+                    continue
+
+                all_insights.extend(insights)
+
+            # Save the insights of all assets in one transaction
+            if all_insights:
+                await asyncio.to_thread(self._save_insights, all_insights)
+
+            results["insights_generated"] = len(all_insights)
+            results["high_confidence_insights"] = sum(
+                1 for i in all_insights if i.confidence >= 0.8
+            )
 
             self.log_info(
                 f"Analysis complete: {results['insights_generated']} insights generated, "
@@ -87,142 +219,224 @@ class AnalysisAgent(BaseAgent):
         """
         Get list of assets that have recent market data.
 
+        The monitored asset set rarely changes, so the result is reused for
+        active_assets_ttl seconds.
+
         Returns:
             List of asset symbols
         """
-        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
+        now = time.monotonic()
+        if self._active_assets is not None and self._active_assets[0] > now:
+            return self._active_assets[1]
 
-        with get_db() as db:
-            assets = (
-                db.query(MarketData.asset)
-                .filter(MarketData.timestamp >= cutoff_time)
-                .distinct()
-                .all()
-            )
-
-            return [a[0] for a in assets]
+        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
 
-    async def _analyze_asset(self, asset: str) -> list[Insight]:
+        def load() -> list[str]:
+            with get_db() as db:
+                assets = (
+                    db.query(MarketData.asset)
+                    .filter(MarketData.timestamp >= cutoff_time)
+                    .distinct()
+                    .all()
+                )
+
+                return [a[0] for a in assets]
+
+        # Sync session work runs in a worker thread so it does not block the event loop
+        assets = await asyncio.to_thread(load)
+        self._active_assets = (now + self.active_assets_ttl, assets)
+        return assets
+
+    async def _analyze_asset(
+        self,
+        asset: str,
+        market_data: np.ndarray,
+        news_data: list[NewsArticle],
+        sentiment: Optional[Row],
+    ) -> list[Insight]:
         """
         Perform comprehensive analysis on a specific asset.
 
         Args:
             asset: Asset symbol (e.g., BTC)
+            market_data: MARKET_DTYPE array with the asset's recent market data
+            news_data: Recent news articles mentioning the asset
+            sentiment: Sentiment aggregates for the asset (see _prefetch_all), or None
 
         Returns:
-            List of generated insights
+            List of generated insights (saved by the caller)
         """
         self.log_info(f"Analyzing {asset}...")
 
         insights = []
 
-        # Gather data for analysis
-        market_data = await self._get_market_data(asset)
-        news_data = await self._get_news_data(asset)
-        sentiment_data = await self._get_sentiment_data(asset)
-
         # Perform different types of analysis
         analysis_tasks = [
             self._technical_analysis(asset, market_data),
             self._news_impact_analysis(asset, news_data),
-            self._sentiment_analysis(asset, sentiment_data),
+            self._sentiment_analysis(asset, sentiment),
         ]
 
         analysis_results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
 
-        # Save insights to database
-        with get_db() as db:
-            for result in analysis_results:
-                if isinstance(result, list):
-                    for insight in result:
-                        if insight.confidence >= self.min_confidence:
-                            db.add(insight)
-                            insights.append(insight)
-
-            db.commit()
+        for result in analysis_results:
+            if isinstance(result, list):
+                insights.extend(i for i in result if i.confidence >= self.min_confidence)
 
         return insights
 
-    async def _get_market_data(self, asset: str) -> pd.DataFrame:
-        """Get recent market data for an asset as a DataFrame."""
-        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
+    def _save_insights(self, insights: list[Insight]) -> None:
+        """
+        Persist insights (runs in a worker thread).
 
+        Args:
+            insights: Insights to add
+        """
         with get_db() as db:
-            data = (
-                db.query(MarketData)
-                .filter(MarketData.asset == asset, MarketData.timestamp >= cutoff_time)
-                .order_by(MarketData.timestamp)
-                .all()
-            )
+            db.add_all(insights)
+            db.commit()
 
-            if not data:
-                return pd.DataFrame()
-
-            return pd.DataFrame(
-                [
-                    {
-                        "timestamp": d.timestamp,
-                        "price": d.price,
-                        "volume": d.volume_24h,
-                        "change": d.price_change_24h,
-                    }
-                    for d in data
-                ]
-            )
+    async def _prefetch_all(
+        self, assets: list[str], cutoff_time: datetime
+    ) -> tuple[dict[str, np.ndarray], dict[str, list[NewsArticle]], dict[str, Row]]:
+        """
+        Load recent market, news and sentiment data for all assets at once.
 
-    async def _get_news_data(self, asset: str) -> list[NewsArticle]:
-        """Get recent news mentioning the asset."""
-        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
+        Args:
+            assets: Asset symbols to load data for
+            cutoff_time: Only load data newer than this
 
-        with get_db() as db:
-            news = db.query(NewsArticle).filter(NewsArticle.published_at >= cutoff_time).all()
+        Returns:
+            Tuple of (market data, news, sentiment) dictionaries keyed by asset; the
+            sentiment rows hold avg_volume, points, and the latest volume and platform
+        """
+        market_rows = defaultdict(list)
+        news_by_asset = defaultdict(list)
+
+        if async_pool.available:
+            # Raw pooled query: skips ORM hydration and does not block the event loop
+            market_data = await async_pool.fetch(
+                "SELECT asset, timestamp, price, volume_24h, price_change_24h "
+                "FROM market_data WHERE asset = ANY($1) AND timestamp >= $2 "
+                "ORDER BY timestamp",
+                assets,
+                # Columns are naive UTC timestamps
+                cutoff_time.astimezone(timezone.utc).replace(tzinfo=None),
+            )
+        else:
+            market_data = None
+
+        def load() -> tuple[list, list, list]:
+            with get_db() as db:
+                market = market_data
+                if market is None:
+                    market = (
+                        db.query(
+                            MarketData.asset,
+                            MarketData.timestamp,
+                            MarketData.price,
+                            MarketData.volume_24h,
+                            MarketData.price_change_24h,
+                        )
+                        .filter(MarketData.asset.in_(assets), MarketData.timestamp >= cutoff_time)
+                        .order_by(MarketData.timestamp)
+                        .all()
+                    )
+                # Indexed lookup of the asset mentions resolved when the news was ingested
+                news = (
+                    db.query(NewsAssetMention.asset, NewsArticle)
+                    .join(NewsArticle, NewsAssetMention.news_id == NewsArticle.id)
+                    .filter(
+                        NewsAssetMention.asset.in_(assets),
+                        NewsAssetMention.published_at >= cutoff_time,
+                    )
+                    .all()
+                )
+                # Sentiment only needs per-asset aggregates and the latest point
+                stats = (
+                    db.query(
+                        SentimentData.asset,
+                        func.avg(SentimentData.volume).label("avg_volume"),
+                        func.count(SentimentData.id).label("points"),
+                        func.max(SentimentData.timestamp).label("latest_at"),
+                    )
+                    .filter(
+                        SentimentData.asset.in_(assets), SentimentData.timestamp >= cutoff_time
+                    )
+                    .group_by(SentimentData.asset)
+                    .subquery()
+                )
+                sentiment = (
+                    db.query(
+                        stats.c.asset,
+                        stats.c.avg_volume,
+                        stats.c.points,
+                        SentimentData.volume,
+                        SentimentData.platform,
+                    )
+                    .join(
+                        SentimentData,
+                        and_(
+                            SentimentData.asset == stats.c.asset,
+                            SentimentData.timestamp == stats.c.latest_at,
+                        ),
+                    )
+                    .order_by(SentimentData.id)
+                    .all()
+                )
+                return market, news, sentiment
+
+        # Sync session work runs in a worker thread so it does not block the event loop
+        market_data, news, sentiment_data = await asyncio.to_thread(load)
+
+        for asset, timestamp, price, volume, change in market_data:
+            market_rows[asset].append(
+                (
+                    timestamp,
+                    np.nan if price is None else price,
+                    np.nan if volume is None else volume,
+                    np.nan if change is None else change,
+                )
+            )
 
-            # Filter for articles mentioning the asset
-            return [
-                n
-                for n in news
-                if asset.lower() in n.title.lower() or asset.lower() in n.summary.lower()
-            ]
+        for asset, n in news:
+            news_by_asset[asset].append(n)
 
-    async def _get_sentiment_data(self, asset: str) -> list[SentimentData]:
-        """Get recent sentiment data for the asset."""
-        cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=self.lookback_hours)
+        # Rows are ordered by id, so the newest point wins on timestamp ties
+        sentiment_by_asset = {s.asset: s for s in sentiment_data}
 
-        with get_db() as db:
-            return (
-                db.query(SentimentData)
-                .filter(SentimentData.asset == asset, SentimentData.timestamp >= cutoff_time)
-                .all()
-            )
+        market_by_asset = {
+            asset: np.fromiter(rows, dtype=MARKET_DTYPE, count=len(rows))
+            for asset, rows in market_rows.items()
+        }
+
+        return market_by_asset, dict(news_by_asset), sentiment_by_asset
 
-    async def _technical_analysis(self, asset: str, market_data: pd.DataFrame) -> list[Insight]:
+    async def _technical_analysis(self, asset: str, market_data: np.ndarray) -> list[Insight]:
         """
         Perform technical analysis and generate insights.
 
         Args:
             asset: Asset symbol
-            market_data: DataFrame with market data
+            market_data: MARKET_DTYPE array with market data, oldest first
 
         Returns:
             List of insights from technical analysis
         """
         insights = []
 
-        if market_data.empty or len(market_data) < 10:
+        if len(market_data) < 10:
             return insights
 
-        # Get latest data point
-        latest = market_data.iloc[-1]
-        price = latest["price"]
-        change = latest["change"]
-        volume = latest["volume"]
-
-        # Calculate simple indicators
-        avg_volume = market_data["volume"].mean()
-        volume_ratio = volume / avg_volume if avg_volume > 0 else 1
+        signal, price, change, volume_ratio, confidence = _compute_tech_signals(
+            np.ascontiguousarray(market_data["price"]),
+            np.ascontiguousarray(market_data["volume"]),
+            np.ascontiguousarray(market_data["change"]),
+        )
+        price, change, volume_ratio = float(price), float(change), float(volume_ratio)
 
         # Check for breakout (significant price change + high volume)
-        if abs(change) > 5 and volume_ratio > 1.5:
+        if signal == SIGNAL_BREAKOUT:
             insight_type = InsightType.BREAKOUT if change > 0 else InsightType.BREAKDOWN
 
             # Use LLM to generate detailed analysis
@@ -233,12 +447,10 @@ class AnalysisAgent(BaseAgent):
                     "price": price,
                     "change_24h": change,
                     "volume_ratio": volume_ratio,
-                    "market_data": market_data.tail(20).to_dict("records"),
+                    "market_summary": self._summarize_market(market_data[-20:]),
                 },
             )
 
-            confidence = min(0.95, 0.6 + (abs(change) / 100) + (volume_ratio / 10))
-
             insight = Insight(
                 type=insight_type,
                 asset=asset,
@@ -253,7 +465,7 @@ class AnalysisAgent(BaseAgent):
             insights.append(insight)
 
         # Check for volume spike
-        elif volume_ratio > 2:
+        elif signal == SIGNAL_VOLUME_SPIKE:
             llm_analysis = await self._get_llm_analysis(
                 asset=asset,
                 insight_type="volume_spike",
@@ -263,7 +475,7 @@ class AnalysisAgent(BaseAgent):
             insight = Insight(
                 type=InsightType.VOLUME_SPIKE,
                 asset=asset,
-                confidence=0.65 + min(0.3, volume_ratio / 20),
+                confidence=confidence,
                 details={
                     "volume_ratio": volume_ratio,
                     "price": price,
@@ -274,6 +486,38 @@ class AnalysisAgent(BaseAgent):
 
         return insights
 
+    @staticmethod
+    def _summarize_market(market_data: np.ndarray) -> dict:
+        """
+        Reduce market data to a fixed-size summary for LLM prompts.
+
+        Args:
+            market_data: MARKET_DTYPE array with market data, oldest first
+
+        Returns:
+            Dictionary with price statistics, the last 5 prices and a volume z-score
+        """
+        prices = market_data["price"]
+        volumes = market_data["volume"]
+
+        # Six significant digits keep small-cap prices readable and the prompt short
+        def sig(value: float) -> Optional[float]:
+            return None if np.isnan(value) else float(f"{value:.6g}")
+
+        volume_std = np.nanstd(volumes) if not np.isnan(volumes).all() else np.nan
+        volume_z = (
+            (volumes[-1] - np.nanmean(volumes)) / volume_std if volume_std > 0 else 0.0
+        )
+
+        return {
+            "price_range": [sig(np.nanmin(prices)), sig(np.nanmax(prices))],
+            "mean_price": sig(np.nanmean(prices)),
+            "std_price": sig(np.nanstd(prices)),
+            "recent_5": [sig(p) for p in prices[-5:]],
+            "volume_z": sig(volume_z),
+            "n": len(market_data),
+        }
+
     async def _news_impact_analysis(
         self, asset: str, news_data: list[NewsArticle]
     ) -> list[Insight]:
@@ -317,27 +561,25 @@ class AnalysisAgent(BaseAgent):
 
         return insights
 
-    async def _sentiment_analysis(
-        self, asset: str, sentiment_data: list[SentimentData]
-    ) -> list[Insight]:
+    async def _sentiment_analysis(self, asset: str, sentiment: Optional[Row]) -> list[Insight]:
         """
         Analyze sentiment shifts for the asset.
 
         Args:
             asset: Asset symbol
-            sentiment_data: List of sentiment data points
+            sentiment: Row with avg_volume, points, and the latest volume and platform
 
         Returns:
             List of insights from sentiment analysis
         """
         insights = []
 
-        if len(sentiment_data) < 2:
+        if sentiment is None or sentiment.points < 2:
             return insights
 
-        # Compare latest sentiment to previous
-        latest_volume = sentiment_data[-1].volume
-        avg_volume = sum(s.volume for s in sentiment_data) / len(sentiment_data)
+        # Compare latest sentiment to the average (computed in SQL)
+        latest_volume = sentiment.volume
+        avg_volume = float(sentiment.avg_volume)
 
         # Significant increase in social media activity
         if latest_volume > avg_volume * 1.5:
@@ -347,7 +589,7 @@ class AnalysisAgent(BaseAgent):
                 data={
                     "volume": latest_volume,
                     "avg_volume": avg_volume,
-                    "platform": sentiment_data[-1].platform,
+                    "platform": sentiment.platform,
                 },
             )
 
@@ -358,7 +600,7 @@ class AnalysisAgent(BaseAgent):
                 details={
                     "volume": latest_volume,
                     "volume_increase": (latest_volume / avg_volume - 1) * 100,
-                    "platform": sentiment_data[-1].platform,
+                    "platform": sentiment.platform,
                     "llm_analysis": llm_analysis,
                 },
             )
@@ -372,35 +614,64 @@ class AnalysisAgent(BaseAgent):
 
         Args:
             asset: Asset symbol
-            insight_type: Type of insight being analyzed
+            insight_type: InsightType value of the insight being analyzed
             data: Data to analyze
 
         Returns:
             LLM-generated analysis text
         """
         try:
-            prompt = f"""You are a crypto market analyst. Analyze the following {insight_type} for {asset}.
+            prompt = self._PROMPT_FORMATTERS[insight_type](
+                asset=asset, data_json=json_utils.dumps(data, indent=True).decode()
+            )
 
-Data:
-{json.dumps(data, indent=2, default=str)}
+            exact_key = LLMCache.make_key(insight_type, "gemini", prompt)
+            semantic_key = self._semantic_cache_key(asset, insight_type, data)
 
-Provide a concise, professional analysis (2-3 sentences) explaining:
-1. What this means for the asset
-2. Why this is significant
-3. Potential implications
+            cached = self.llm_cache.get(exact_key)
+            if cached is None and semantic_key:
+                cached = self.semantic_cache.get(semantic_key)
+            if cached is not None:
+                return cached
 
-Be factual and avoid speculation. Focus on what the data shows."""
+            analysis = await self.llm_batcher.submit(prompt)
 
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}],
-            return await self.llm_client.generate(
-                prompt=prompt,
-                model="gemini", # Default to Gemini but client handles fallback
-                max_tokens=300
-            )
+            self.llm_cache.set(exact_key, analysis)
+            if semantic_key:
+                self.semantic_cache.set(semantic_key, analysis)
+            return analysis
 
         except Exception as e:
             self.log_error(f"LLM analysis error: {e}")
             return f"Detected {insight_type} for {asset} based on market data."
+
+    def _semantic_cache_key(self, asset: str, insight_type: str, data: dict) -> Optional[str]:
+        """
+        Build a cache key from the asset, insight type and bucketed numeric signals.
+
+        Args:
+            asset: Asset symbol
+            insight_type: InsightType value of the insight being analyzed
+            data: Data to analyze
+
+        Returns:
+            Cache key, or None if the data has no signals to bucket
+        """
+        buckets = {
+            name: round(data[name] / SEMANTIC_BUCKET_WIDTH)
+            for name in ("volume_ratio", "change_24h")
+            # NaN/inf (e.g. a NULL change_24h) can't be bucketed
+            if isinstance(data.get(name), (int, float)) and math.isfinite(data[name])
+        }
+        if not buckets:
+            return None
+
+        return LLMCache.make_key(insight_type, asset, json.dumps(buckets, sort_keys=True))
+
+    async def _generate_llm(self, prompt: str) -> str:
+        """Send a single prompt; used by the LLM batcher."""
+        return await self.llm_client.generate(
+            prompt=prompt,
+            model="gemini",  # Default to Gemini but client handles fallback
+            max_tokens=300,
+        )
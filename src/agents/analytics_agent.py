@@ -1,10 +1,9 @@
 """AnalyticsAgent - Tracks and analyzes system performance."""
 
-from typing import Dict, List
-from datetime import datetime, timedelta
-from sqlalchemy import func, case
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import case, func
+
 from src.agents.base_agent import BaseAgent
 from src.database.connection import get_db
 from src.database.models import AgentLog, ContentPlan, Insight, PublishedContent
@@ -83,81 +82,44 @@ class AnalyticsAgent(BaseAgent):
         """
         self.log_info("Analyzing agent performance...")
 
-        cutoff = datetime.utcnow() - timedelta(days=7)
+        cutoff = datetime.now(tz=timezone.utc) - timedelta(days=7)
 
         with get_db() as db:
-            # Use SQL aggregation instead of loading all logs into memory
-            # This is much more efficient for large datasets
-            agent_stats_query = db.query(
-                AgentLog.agent_name,
-                func.count(AgentLog.id).label('total_runs'),
-                func.sum(case((AgentLog.status == 'success', 1), else_=0)).label('successful_runs'),
-                func.sum(case((AgentLog.status == 'error', 1), else_=0)).label('failed_runs'),
-                func.avg(AgentLog.execution_time).label('avg_execution_time'),
-                func.sum(AgentLog.execution_time).label('total_execution_time')
-            ).filter(
-                AgentLog.timestamp >= cutoff
-            ).group_by(
-                AgentLog.agent_name
-            ).all()
-        with get_db() as db:
-            # Get agent logs from last 7 days
-            cutoff = datetime.now(tz=timezone.utc) - timedelta(days=7)
-
-            logs = db.query(AgentLog).filter(AgentLog.timestamp >= cutoff).all()
-
-            if not agent_stats_query:
-                return {"message": "No agent activity logged"}
-
-            # Build stats dictionary from aggregated results
-            agent_stats = {}
-            
-            for stat in agent_stats_query:
-                agent_name = stat.agent_name
-                total_runs = stat.total_runs
-                
-                agent_stats[agent_name] = {
-                    "total_runs": total_runs,
-                    "successful_runs": stat.successful_runs,
-                    "failed_runs": stat.failed_runs,
-                    "total_execution_time": float(stat.total_execution_time or 0),
-                    "avg_execution_time": float(stat.avg_execution_time or 0),
-                    "success_rate": stat.successful_runs / total_runs if total_runs > 0 else 0
-                }
-
-            for log in logs:
-                agent_name = log.agent_name
-
-                if agent_name not in agent_stats:
-                    agent_stats[agent_name] = {
-                        "total_runs": 0,
-                        "successful_runs": 0,
-                        "failed_runs": 0,
-                        "total_execution_time": 0,
-                        "avg_execution_time": 0,
-                        "success_rate": 0,
-                    }
-
-                agent_stats[agent_name]["total_runs"] += 1
-
-                if log.status == "success":
-                    agent_stats[agent_name]["successful_runs"] += 1
-                elif log.status == "error":
-                    agent_stats[agent_name]["failed_runs"] += 1
-
-                if log.execution_time:
-                    agent_stats[agent_name]["total_execution_time"] += log.execution_time
-
-            # Calculate averages and rates
-            for agent_name in agent_stats:
-                stats = agent_stats[agent_name]
-                total_runs = stats["total_runs"]
-
-                if total_runs > 0:
-                    stats["success_rate"] = stats["successful_runs"] / total_runs
-                    stats["avg_execution_time"] = stats["total_execution_time"] / total_runs
-
-            return agent_stats
+            # Aggregate per agent in SQL instead of loading every log into memory
+            agent_stats_query = (
+                db.query(
+                    AgentLog.agent_name,
+                    func.count(AgentLog.id).label("total_runs"),
+                    func.sum(case((AgentLog.status == "success", 1), else_=0)).label(
+                        "successful_runs"
+                    ),
+                    func.sum(case((AgentLog.status == "error", 1), else_=0)).label("failed_runs"),
+                    func.sum(AgentLog.execution_time).label("total_execution_time"),
+                )
+                .filter(AgentLog.timestamp >= cutoff)
+                .group_by(AgentLog.agent_name)
+                .all()
+            )
+
+        if not agent_stats_query:
+            return {"message": "No agent activity logged"}
+
+        agent_stats = {}
+
+        for stat in agent_stats_query:
+            total_runs = stat.total_runs
+            total_execution_time = float(stat.total_execution_time or 0)
+
+            agent_stats[stat.agent_name] = {
+                "total_runs": total_runs,
+                "successful_runs": stat.successful_runs,
+                "failed_runs": stat.failed_runs,
+                "total_execution_time": total_execution_time,
+                "avg_execution_time": total_execution_time / total_runs if total_runs else 0,
+                "success_rate": stat.successful_runs / total_runs if total_runs else 0,
+            }
+
+        return agent_stats
 
     async def _generate_recommendations(self, performance: dict, trending: list[dict]) -> list[str]:
         """
@@ -241,7 +203,8 @@ class AnalyticsAgent(BaseAgent):
         analytics = await self.execute()
 
         # Format report
-        report = f"""
+        parts = [
+            f"""
 ╔══════════════════════════════════════════════════════════╗
 ║          CONTENT CREATOR - ANALYTICS REPORT              ║
 ║          Period: Last {days} days                            ║
@@ -251,11 +214,13 @@ class AnalyticsAgent(BaseAgent):
 📊 PERFORMANCE SUMMARY
 {'─' * 60}
 """
+        ]
 
         perf = analytics.get("performance_summary", {})
 
         if "total_content" in perf:
-            report += f"""
+            parts.append(
+                f"""
 Total Content Published: {perf['total_content']}
 Total Views:            {perf.get('total_views', 0):,}
 Total Likes:            {perf.get('total_likes', 0):,}
@@ -264,69 +229,85 @@ Total Shares:           {perf.get('total_shares', 0):,}
 Avg Engagement Rate:    {perf.get('avg_engagement_rate', 0):.2%}
 
 """
+            )
 
         # Best performing content
         if "best_performing" in perf:
             best = perf["best_performing"]
-            report += f"""🏆 BEST PERFORMING CONTENT
+            parts.append(
+                f"""🏆 BEST PERFORMING CONTENT
 {'─' * 60}
 Platform:       {best['platform']}
 Engagement:     {best['engagement_rate']:.2%}
 Preview:        {best['preview']}...
 
 """
+            )
 
         # Trending topics
         trending = analytics.get("trending_topics", [])
         if trending:
-            report += f"""🔥 TRENDING TOPICS
+            parts.append(
+                f"""🔥 TRENDING TOPICS
 {'─' * 60}
 """
+            )
             for i, topic in enumerate(trending[:5], 1):
-                report += (
+                parts.append(
                     f"{i}. {topic['asset']} - {topic['type']} ({topic['avg_engagement']:.2%})\n"
                 )
 
-            report += "\n"
+            parts.append("\n")
 
         # Platform breakdown
         if "platform_breakdown" in perf:
-            report += f"""📱 PLATFORM BREAKDOWN
+            parts.append(
+                f"""📱 PLATFORM BREAKDOWN
 {'─' * 60}
 """
+            )
             for platform, stats in perf["platform_breakdown"].items():
-                report += f"{platform:20} {stats['count']:3} posts | {stats['avg_engagement_rate']:.2%} avg engagement\n"
+                parts.append(
+                    f"{platform:20} {stats['count']:3} posts | "
+                    f"{stats['avg_engagement_rate']:.2%} avg engagement\n"
+                )
 
-            report += "\n"
+            parts.append("\n")
 
         # Recommendations
         recommendations = analytics.get("recommendations", [])
         if recommendations:
-            report += f"""💡 RECOMMENDATIONS
+            parts.append(
+                f"""💡 RECOMMENDATIONS
 {'─' * 60}
 """
+            )
             for i, rec in enumerate(recommendations, 1):
-                report += f"{i}. {rec}\n\n"
+                parts.append(f"{i}. {rec}\n\n")
 
         # Agent performance
         agent_perf = analytics.get("agent_performance", {})
         if agent_perf:
-            report += f"""🤖 AGENT PERFORMANCE
+            parts.append(
+                f"""🤖 AGENT PERFORMANCE
 {'─' * 60}
 """
+            )
             for agent, stats in agent_perf.items():
-                report += (
+                parts.append(
                     f"{agent:30} "
                     f"{stats['success_rate']:.1%} success | "
                     f"{stats['avg_execution_time']:.2f}s avg\n"
                 )
 
-        report += f"""
+        parts.append(
+            f"""
 {'═' * 60}
 End of Report
 """
+        )
 
-        return report
+        return "".join(parts)
 
     async def get_kpi_dashboard(self) -> dict:
         """
@@ -344,49 +325,46 @@ End of Report
             # Last 7 days
             last_7d = now - timedelta(days=7)
 
-            # Count insights generated
-            insights_24h = db.query(Insight).filter(Insight.timestamp >= last_24h).count()
-
-            insights_7d = db.query(Insight).filter(Insight.timestamp >= last_7d).count()
-
-            # Count content published
-            published_24h = (
-                db.query(PublishedContent).filter(PublishedContent.published_at >= last_24h).count()
-            )
-
-            published_7d = (
-                db.query(PublishedContent).filter(PublishedContent.published_at >= last_7d).count()
-            )
-
-            # Get total engagement
-            content_7d = (
-                db.query(PublishedContent).filter(PublishedContent.published_at >= last_7d).all()
-            )
-
-            total_engagement = sum(
-                (c.likes or 0) + (c.comments or 0) + (c.shares or 0) for c in content_7d
-            )
-
-            avg_engagement_rate = (
-                sum(c.engagement_rate or 0 for c in content_7d) / len(content_7d)
-                if content_7d
-                else 0
-            )
-
-            # Content in pipeline
-            pending_plans = (
-                db.query(ContentPlan)
+            # All KPIs in one round trip: published content is aggregated in a single
+            # scan of the last 7 days, the other tables through scalar subqueries
+            kpis = db.query(
+                func.count(PublishedContent.id).label("published_7d"),
+                func.coalesce(
+                    func.sum(case((PublishedContent.published_at >= last_24h, 1), else_=0)), 0
+                ).label("published_24h"),
+                func.coalesce(
+                    func.sum(
+                        func.coalesce(PublishedContent.likes, 0)
+                        + func.coalesce(PublishedContent.comments, 0)
+                        + func.coalesce(PublishedContent.shares, 0)
+                    ),
+                    0,
+                ).label("total_engagement"),
+                func.avg(func.coalesce(PublishedContent.engagement_rate, 0)).label(
+                    "avg_engagement_rate"
+                ),
+                db.query(func.count(Insight.id))
+                .filter(Insight.timestamp >= last_24h)
+                .scalar_subquery()
+                .label("insights_24h"),
+                db.query(func.count(Insight.id))
+                .filter(Insight.timestamp >= last_7d)
+                .scalar_subquery()
+                .label("insights_7d"),
+                # Content in pipeline
+                db.query(func.count(ContentPlan.id))
                 .filter(ContentPlan.status.in_(["pending", "ready", "awaiting_approval"]))
-                .count()
-            )
+                .scalar_subquery()
+                .label("pending_plans"),
+            ).filter(PublishedContent.published_at >= last_7d).one()
 
             return {
-                "insights_generated_24h": insights_24h,
-                "insights_generated_7d": insights_7d,
-                "content_published_24h": published_24h,
-                "content_published_7d": published_7d,
-                "total_engagement_7d": total_engagement,
-                "avg_engagement_rate_7d": avg_engagement_rate,
-                "content_in_pipeline": pending_plans,
+                "insights_generated_24h": kpis.insights_24h,
+                "insights_generated_7d": kpis.insights_7d,
+                "content_published_24h": kpis.published_24h,
+                "content_published_7d": kpis.published_7d,
+                "total_engagement_7d": kpis.total_engagement,
+                "avg_engagement_rate_7d": kpis.avg_engagement_rate or 0,
+                "content_in_pipeline": kpis.pending_plans,
                 "last_updated": now.isoformat(),
             }
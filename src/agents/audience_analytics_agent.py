@@ -1,5 +1,7 @@
+import hashlib
 import json
 from src.agents.base_agent import BaseAgent
+from src.utils import json_utils
 from src.utils.llm_client import llm_client
 from loguru import logger
 
@@ -36,6 +38,8 @@ class AudienceAnalyticsAgent(BaseAgent):
 
     **Prioritize Actionability:** Ensure that the generated data and accompanying summary insights are not merely descriptive but provide a solid, data-driven foundation for actionable strategic adjustments and decision-making within the broader AI system.
     '''
+    # Encoded and hashed once per class; identifies the cacheable prompt prefix
+    _system_prompt_id = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=16).hexdigest()
 
     def __init__(self):
         """
@@ -62,7 +66,7 @@ class AudienceAnalyticsAgent(BaseAgent):
             dict: A structured dictionary containing the analysis results, insights,
                   and any identified limitations or assumptions, generated by the LLM.
         """
-        logger.info(f"AudienceAnalyticsAgent received analysis request: '{analysis_request}'")
+        logger.info("{} received analysis request: {!r}", self.name, analysis_request)
         
         # Construct the full prompt for the LLM
         user_prompt = f"""
@@ -71,7 +75,7 @@ class AudienceAnalyticsAgent(BaseAgent):
 
         **Contextual Information:**
         -   **Data Sources:** {data_sources if data_sources else 'Inferred from request or default social platforms (Twitter, Telegram, Discord, etc.)'}
-        -   **Additional Parameters:** {json.dumps(kwargs, indent=2)}
+        -   **Additional Parameters:** {json_utils.dumps(kwargs).decode()}
 
         **Task:**
         Based on the SYSTEM_PROMPT persona and workflow, perform the requested analysis conceptually.
@@ -84,12 +88,14 @@ class AudienceAnalyticsAgent(BaseAgent):
         """
 
         try:
-            # Send the combined system and user prompt to the LLM
-            response_content = await self.llm.generate(self.SYSTEM_PROMPT + user_prompt)
+            # Send the static system prompt separately so the provider can reuse its cached prefix
+            response_content = await self.llm.generate(
+                user_prompt, system=self.SYSTEM_PROMPT, system_id=self._system_prompt_id
+            )
             
             # Attempt to parse the LLM's response as JSON
             try:
-                analysis_results = json.loads(response_content)
+                analysis_results = json_utils.loads(response_content)
                 logger.success("AudienceAnalyticsAgent successfully completed analysis and parsed results.")
                 return analysis_results
             except json.JSONDecodeError as e:
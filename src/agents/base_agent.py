@@ -1,14 +1,146 @@
 """Base agent class that all agents inherit from."""
 
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import json
 import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Any, Optional
 
 from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
-from src.database.connection import get_db
+from src.database.connection import get_db, get_db_session
 from src.database.models import AgentLog
 
+# Agent activity logs are queued and written in batches by a background task
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.1  # Seconds to collect a batch after its first entry
+
+# Commits run off the event loop; a single worker since batches share one session
+_log_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentlog")
+
+
+def _write_logs(batch: list[AgentLog], db: Optional[Session] = None) -> None:
+    """
+    Insert a batch of agent logs in one transaction.
+
+    Args:
+        batch: Log entries to insert
+        db: Long-lived session to reuse (a new one is opened if omitted)
+    """
+    try:
+        if db is None:
+            with get_db() as session:
+                session.bulk_save_objects(batch)
+        else:
+            try:
+                db.bulk_save_objects(batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+    except SQLAlchemyError as e:
+        # Don't let database errors while logging break the agent
+        logger.warning(f"Failed to log activity: {e}")
+
+
+async def _log_writer(queue: asyncio.Queue) -> None:
+    """Drain the log queue, committing up to LOG_BATCH_SIZE entries per window."""
+    # One session serves every batch for the writer's lifetime
+    db = get_db_session()
+    batch: list[AgentLog] = []
+    written: list[AgentLog] = []
+    write: Optional[concurrent.futures.Future] = None
+    try:
+        while True:
+            batch.append(await queue.get())
+            # Let the window fill up (plain sleep: wait_for can swallow cancellation)
+            if queue.qsize() < LOG_BATCH_SIZE:
+                await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            while len(batch) < LOG_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            written, batch = batch, []
+            write = _log_pool.submit(_write_logs, written, db)
+            try:
+                await asyncio.wrap_future(write)
+            finally:
+                # Keep flush_agent_logs() from waiting forever if the writer dies
+                for _ in written:
+                    queue.task_done()
+    finally:
+        # Redo the batch in flight if it never started, then write whatever is
+        # still queued when the event loop shuts down. The drain runs on the log
+        # pool, behind any write still in progress, so the loop isn't blocked
+        if write is not None and write.cancelled():
+            batch = written + batch
+        drained = 0
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+            drained += 1
+        try:
+            await asyncio.shield(asyncio.wrap_future(_log_pool.submit(_drain_logs, batch, db)))
+        finally:
+            for _ in range(drained):
+                queue.task_done()
+
+
+def _drain_logs(batch: list[AgentLog], db: Session) -> None:
+    """
+    Write the writer's final batch and close its session.
+
+    Args:
+        batch: Log entries still unwritten
+        db: The writer's session
+    """
+    try:
+        if batch:
+            _write_logs(batch, db)
+    finally:
+        db.close()
+
+
+class _LogWriter:
+    """Queue of pending agent logs and the background task draining it."""
+
+    def __init__(self):
+        """Initialize an idle writer; the task starts with the first entry."""
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def enqueue(self, entry: AgentLog) -> None:
+        """Queue a log entry for the background writer, starting it if needed."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller): write immediately
+            _write_logs([entry])
+            return
+
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.queue = asyncio.Queue()
+            self.task = loop.create_task(_log_writer(self.queue))
+
+        self.queue.put_nowait(entry)
+
+    async def flush(self) -> None:
+        """Wait until every queued log entry has been written."""
+        if self.task is not None and self.task.get_loop() is asyncio.get_running_loop():
+            await self.queue.join()
+
+
+_writer = _LogWriter()
+
+
+async def flush_agent_logs() -> None:
+    """Wait until every queued agent log has been written."""
+    await _writer.flush()
+
 
 class BaseAgent(ABC):
     """
@@ -17,6 +149,11 @@ class BaseAgent(ABC):
     All agents should inherit from this class and implement the execute() method.
     """
 
+    # Agents whose execute() result depends only on its arguments can opt in to
+    # reusing results of identical run() calls
+    CACHEABLE = False
+    L1_CACHE_SIZE = 4096
+
     def __init__(self, name: str):
         """
         Initialize the agent.
@@ -25,6 +162,7 @@ class BaseAgent(ABC):
             name: The name of the agent (e.g., "MarketScannerAgent")
         """
         self.name = name
+        self._l1: OrderedDict[str, Any] = OrderedDict()
         logger.info(f"{self.name} initialized")
 
     @abstractmethod
@@ -41,14 +179,26 @@ class BaseAgent(ABC):
 
         This method should be called instead of execute() directly.
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         action = kwargs.get("action", "execute")
 
+        cache_key = self._l1_key(args, kwargs) if self.CACHEABLE else None
+        if cache_key is not None and cache_key in self._l1:
+            self._l1.move_to_end(cache_key)
+            logger.debug(f"{self.name} cache hit: {action}")
+            # Hand out a copy so callers mutating the result can't poison later hits
+            return copy.deepcopy(self._l1[cache_key])
+
         logger.info(f"{self.name} starting: {action}")
 
         try:
             result = await self.execute(*args, **kwargs)
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+
+            if cache_key is not None and self._cacheable_result(result):
+                self._l1[cache_key] = copy.deepcopy(result)
+                if len(self._l1) > self.L1_CACHE_SIZE:
+                    self._l1.popitem(last=False)
 
             # Log successful execution
             self._log_activity(
@@ -63,7 +213,7 @@ class BaseAgent(ABC):
             return result
 
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
             error_message = str(e)
 
             # Log failed execution
@@ -80,6 +230,33 @@ class BaseAgent(ABC):
 
             raise
 
+    @staticmethod
+    def _l1_key(args: tuple, kwargs: dict) -> str:
+        """
+        Build the result cache key for a run() call.
+
+        Args:
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Hex digest of the canonicalized arguments
+        """
+        payload = json.dumps([args, sorted(kwargs.items())], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _cacheable_result(self, result: Any) -> bool:
+        """
+        Decide whether a result of a CACHEABLE agent may be reused.
+
+        Args:
+            result: Value returned by execute()
+
+        Returns:
+            True to cache the result
+        """
+        return True
+
     def _log_activity(
         self,
         action: str,
@@ -89,7 +266,7 @@ class BaseAgent(ABC):
         execution_time: Optional[float] = None,
     ):
         """
-        Log agent activity to the database.
+        Queue agent activity for the batched database writer.
 
         Args:
             action: The action being performed
@@ -98,21 +275,16 @@ class BaseAgent(ABC):
             error_message: Error message if status is error
             execution_time: Time taken to execute in seconds
         """
-        try:
-            with get_db() as db:
-                log_entry = AgentLog(
-                    agent_name=self.name,
-                    action=action,
-                    status=status,
-                    details=details or {},
-                    error_message=error_message,
-                    execution_time=execution_time,
-                )
-                db.add(log_entry)
-                db.commit()
-        except Exception as e:
-            # Don't let logging errors break the agent
-            logger.warning(f"Failed to log activity: {e}")
+        _writer.enqueue(
+            AgentLog(
+                agent_name=self.name,
+                action=action,
+                status=status,
+                details=details or {},
+                error_message=error_message,
+                execution_time=execution_time,
+            )
+        )
 
     def log_info(self, message: str):
         """Log an info message."""
@@ -1,10 +1,51 @@
-import json
+import hashlib
+import re
+import string
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from src.agents.base_agent import BaseAgent
+from src.utils import json_utils
+from src.utils.llm_batcher import LLMBatcher
 from src.utils.llm_client import llm_client
+from src.utils.moderation_rules import ModerationRules
+from src.utils.semantic_cache import SemanticCache
 from loguru import logger
-import asyncio # Although not explicitly used in this simplified LLM call, useful for async context
+import asyncio
+
+# JSON object inside an optional ```json fence, extracted in one pass
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```|(\{.*\})", re.DOTALL)
+# Outermost JSON array of a batched reply
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+
+class ModerationResult(BaseModel):
+    """Moderation decision returned by the LLM, parsed and validated in one pass."""
+
+    model_config = ConfigDict(extra="allow")
+
+    action: Literal["FLAG", "WARN", "REMOVE", "BAN", "IGNORE"]
+    confidence: float = Field(ge=0.0, le=1.0, strict=True)
+    reason: str
+
+
+class ModerationRequest(BaseModel):
+    """
+    Moderation input validated once at the boundary (e.g. an API endpoint).
+
+    CommunityModerationAgent.moderate() trusts these types; extra fields are passed
+    to the LLM as additional information.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    content: str = Field(min_length=1, strict=True)
+    user_id: str = "anonymous"
+    context: dict = Field(default_factory=dict)
+
 
 class CommunityModerationAgent(BaseAgent):
+    CACHEABLE = True
+
     SYSTEM_PROMPT = '''
 You are the "Community Moderation Agent," a highly specialized, autonomous AI entity operating within the GEMINI Content Creator Project. Your primary role is to serve as a vigilant guardian and enforcer of community safety and content guidelines across all designated communication channels.
 
@@ -41,12 +82,95 @@ Constraints:
 -   Adhere strictly to predefined community guidelines and escalation policies.
 -   When faced with genuine uncertainty regarding a violation, default to flagging for human review rather than executing an erroneous automated action.
 '''
+    # Encoded and hashed once per class; identifies the cacheable prompt prefix
+    _system_prompt_id = hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=16).hexdigest()
+
+    # Per-message instructions built from the agent's workflow, rendered with one substitution
+    _DECISION_FORMAT = (
+        '`{"action": "[FLAG|WARN|REMOVE|BAN|IGNORE]", "confidence": [0.0-1.0], '
+        '"reason": "[Detailed justification explaining the violation(s) and framework(s) used]"}`'
+    )
+    _INSTRUCTION_TEMPLATE = string.Template(
+        "--- MODERATION REQUEST ---\n"
+        "Analyze the following content and associated metadata for adherence to community guidelines, "
+        "applying your NLP, Rule-Based Systems, and Anomaly Detection frameworks. "
+        "Your output must be a single JSON object.\n\n"
+        "Input Payload:\n"
+        "$payload\n\n"
+        "Think step-by-step. First, identify any potential violations based on your frameworks, "
+        "considering severity and context. Second, synthesize your findings, verifying assumptions. "
+        "Third, recommend the most appropriate moderation action (FLAG, WARN, REMOVE, BAN, IGNORE). "
+        "Fourth, justify your decision with a confidence score.\n"
+        "Strictly provide your final assessment and recommended action in JSON format:\n"
+        + _DECISION_FORMAT
+    )
+    _BATCH_INSTRUCTION_TEMPLATE = string.Template(
+        "--- MODERATION REQUEST (BATCH OF $count) ---\n"
+        "Analyze each of the following inputs independently for adherence to community guidelines, "
+        "applying your NLP, Rule-Based Systems, and Anomaly Detection frameworks.\n\n"
+        "Input Payloads (JSON array):\n"
+        "[$payloads]\n\n"
+        "Think step-by-step for each input, as you would for a single request.\n"
+        "Return a JSON array, one object per input, same order. Each object must be:\n"
+        + _DECISION_FORMAT
+    )
 
     def __init__(self):
         super().__init__("CommunityModerationAgent")
         self.llm = llm_client
+        # Repeated messages (spam floods, copy-paste harassment) reuse an earlier
+        # decision instead of another LLM round-trip. Matching is on normalized text
+        # only: without a sentence-embedding model, "similar" texts can mean the opposite
+        self.cache = SemanticCache()
+        # Deterministic first line of defense: unambiguous violations never reach the LLM
+        self.rules = ModerationRules()
+        self.batcher = LLMBatcher(
+            self._moderate_one, max_batch=16, max_wait=0.015, generate_many=self._moderate_many
+        )
         logger.info(f"{self.name} initialized with LLM client.")
 
+    def _cacheable_result(self, result: dict) -> bool:
+        """Only reuse definitive decisions; flagged content (including error fallbacks) is re-evaluated."""
+        return result.get("action") != "FLAG"
+
+    async def _moderate_one(self, payload_json: str) -> str:
+        """Ask the LLM for the decision on a single serialized input payload."""
+        moderation_instruction = self._INSTRUCTION_TEMPLATE.substitute(payload=payload_json)
+        # The static system prompt is sent separately so the provider can reuse its cached prefix.
+        # The reply is streamed and cut off once the decision object is complete.
+        return await json_utils.read_first_object(
+            self.llm.stream(
+                moderation_instruction, system=self.SYSTEM_PROMPT, system_id=self._system_prompt_id
+            )
+        )
+
+    async def _moderate_many(self, payload_jsons: list[str]) -> list[str]:
+        """
+        Ask the LLM for the decisions on several input payloads in one call.
+
+        Returns one raw JSON object string per payload, in order. If the reply is not
+        an array of matching length, every payload is moderated individually instead.
+        """
+        moderation_instruction = self._BATCH_INSTRUCTION_TEMPLATE.substitute(
+            count=len(payload_jsons), payloads=",".join(payload_jsons)
+        )
+        raw_llm_response = await self.llm.generate(
+            moderation_instruction, system=self.SYSTEM_PROMPT, system_id=self._system_prompt_id
+        )
+
+        match = _JSON_ARRAY.search(raw_llm_response)
+        try:
+            decisions = json_utils.loads(match.group(0)) if match else None
+        except ValueError:
+            decisions = None
+
+        if not isinstance(decisions, list) or len(decisions) != len(payload_jsons):
+            logger.warning(f"Batched moderation reply did not match {len(payload_jsons)} inputs; moderating individually.")
+            return await asyncio.gather(*(self._moderate_one(payload) for payload in payload_jsons))
+
+        # Each awaiter parses and validates its own decision
+        return [json_utils.dumps(decision).decode() for decision in decisions]
+
     async def execute(self, content: str = None, user_id: str = None, context: dict = None, **kwargs) -> dict:
         """
         Executes the community moderation task using the LLM, analyzing provided content
@@ -69,70 +193,73 @@ Constraints:
             logger.warning("No valid content string provided for moderation. Returning default 'IGNORE' action.")
             return {"action": "IGNORE", "confidence": 1.0, "reason": "No content provided for moderation."}
 
+        # Arguments were checked above, so skip pydantic validation
+        return await self.moderate(ModerationRequest.model_construct(
+            content=content, user_id=user_id or "anonymous", context=context or {}, **kwargs
+        ))
+
+    async def moderate(self, request: ModerationRequest) -> dict:
+        """
+        Moderate an already validated request without re-checking its fields.
+
+        Args:
+            request: Validated moderation input
+
+        Returns:
+            dict: The moderation decision, in the same format as execute()
+        """
+        content = request.content
+
+        rule = self.rules.match(content)
+        if rule is not None:
+            logger.info("Moderation rule '{}' matched content '{:.50}...': Action=REMOVE", rule, content)
+            return {"action": "REMOVE", "confidence": 0.99, "reason": f"rule:{rule}"}
+
+        cached = self.cache.get(content)
+        if cached is not None:
+            logger.debug("Moderation cache hit for content (first 100 chars): '{:.100}...'", content)
+            return dict(cached)
+
         # Prepare the user message with all relevant context for the LLM's analysis
         user_message_payload = {
             "content_to_moderate": content,
-            "user_id": user_id if user_id else "anonymous",
-            "context": context if context else {},
-            "additional_info": kwargs # Include any extra kwargs for LLM to consider
+            "user_id": request.user_id,
+            "context": request.context,
+            "additional_info": request.model_extra or {}  # Include any extra fields for LLM to consider
         }
 
-        # Construct the specific instruction for the LLM based on its defined workflow
-        moderation_instruction = (
-            f"--- MODERATION REQUEST ---\n"
-            f"Analyze the following content and associated metadata for adherence to community guidelines, "
-            f"applying your NLP, Rule-Based Systems, and Anomaly Detection frameworks. "
-            f"Your output must be a single JSON object.\n\n"
-            f"Input Payload:\n"
-            f"{json.dumps(user_message_payload, indent=2)}\n\n"
-            f"Think step-by-step. First, identify any potential violations based on your frameworks, "
-            f"considering severity and context. Second, synthesize your findings, verifying assumptions. "
-            f"Third, recommend the most appropriate moderation action (FLAG, WARN, REMOVE, BAN, IGNORE). "
-            f"Fourth, justify your decision with a confidence score.\n"
-            f"Strictly provide your final assessment and recommended action in JSON format:\n"
-            f"`{{\"action\": \"[FLAG|WARN|REMOVE|BAN|IGNORE]\", \"confidence\": [0.0-1.0], \"reason\": \"[Detailed justification explaining the violation(s) and framework(s) used]\"}}`"
-        )
-
-        logger.debug(f"Sending moderation request to LLM for content (first 100 chars): '{content[:100]}...'")
+        logger.debug("Sending moderation request to LLM for content (first 100 chars): '{:.100}...'", content)
         try:
-            # The llm_client.generate method expects the full prompt concatenated
-            raw_llm_response = await self.llm.generate(self.SYSTEM_PROMPT + moderation_instruction)
-            logger.debug(f"Received raw LLM response: {raw_llm_response[:500]}...")
+            # Concurrent requests are coalesced into a single LLM call; the payload is
+            # compact JSON since indentation only adds prompt tokens
+            raw_llm_response = await self.batcher.submit(json_utils.dumps(user_message_payload).decode())
+            # Formatting is deferred until a sink accepts DEBUG records
+            logger.opt(lazy=True).debug("Received raw LLM response: {}...", lambda: raw_llm_response[:500])
 
             # Attempt to parse the JSON response, accounting for common LLM behaviors (e.g., markdown code blocks)
-            json_str = raw_llm_response.strip()
-            if json_str.startswith('json'):
-                json_str = json_str[7:].strip()
-                if json_str.endswith(''):
-                    json_str = json_str[:-3].strip()
-            
-            moderation_result = json.loads(json_str)
-
-            # Validate the structure and content of the parsed JSON response
-            required_keys = ["action", "confidence", "reason"]
-            if not all(k in moderation_result for k in required_keys):
-                raise ValueError(f"LLM response missing required keys: {', '.join(required_keys)}. Found: {moderation_result.keys()}")
-            
-            valid_actions = ["FLAG", "WARN", "REMOVE", "BAN", "IGNORE"]
-            if moderation_result["action"] not in valid_actions:
-                raise ValueError(f"Invalid action '{moderation_result['action']}' in LLM response. Must be one of: {valid_actions}")
-            
-            confidence = moderation_result["confidence"]
-            if not isinstance(confidence, (int, float)) or not (0.0 <= confidence <= 1.0):
-                raise ValueError(f"Invalid confidence score '{confidence}' in LLM response. Must be a float between 0.0 and 1.0.")
-
-            logger.info(f"Moderation decision for content '{content[:50]}...': Action={moderation_result['action']}, Confidence={moderation_result['confidence']:.2f}")
+            match = _JSON_FENCE.search(raw_llm_response)
+            json_str = (match.group(1) or match.group(2)) if match else raw_llm_response
+
+            # Parse and validate keys, action and confidence range in a single pass
+            moderation_result = ModerationResult.model_validate_json(json_str).model_dump()
+
+            logger.info(
+                "Moderation decision for content '{:.50}...': Action={}, Confidence={:.2f}",
+                content, moderation_result["action"], moderation_result["confidence"],
+            )
+            # Only validated decisions are cached; fallbacks below are retried next time
+            self.cache.put(content, dict(moderation_result))
             return moderation_result
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}. Raw response: {raw_llm_response[:500]}...", exc_info=True)
-            # Fallback for malformed JSON, flagging for human review
-            return {"action": "FLAG", "confidence": 0.3, "reason": f"LLM returned malformed JSON. Error: {e}. Raw response snippet: {raw_llm_response[:200]}..."}
-        except ValueError as e:
-            logger.error(f"LLM response JSON structure or content invalid: {e}. Raw response: {raw_llm_response[:500]}...", exc_info=True)
+        except ValidationError as e:
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                logger.opt(exception=True).error(f"Failed to parse LLM response as JSON: {e}. Raw response: {raw_llm_response[:500]}...")
+                # Fallback for malformed JSON, flagging for human review
+                return {"action": "FLAG", "confidence": 0.3, "reason": f"LLM returned malformed JSON. Error: {e}. Raw response snippet: {raw_llm_response[:200]}..."}
+            logger.opt(exception=True).error(f"LLM response JSON structure or content invalid: {e}. Raw response: {raw_llm_response[:500]}...")
             # Fallback for invalid JSON structure/content, flagging for human review
             return {"action": "FLAG", "confidence": 0.4, "reason": f"LLM response JSON validation failed: {e}. Raw response snippet: {raw_llm_response[:200]}..."}
         except Exception as e:
-            logger.error(f"An unexpected error occurred during LLM moderation execution: {e}", exc_info=True)
+            logger.opt(exception=True).error(f"An unexpected error occurred during LLM moderation execution: {e}")
             # Generic fallback for any other unexpected errors
             return {"action": "FLAG", "confidence": 0.1, "reason": f"Internal LLM client error: {e}. Review required."}
\ No newline at end of file
@@ -1,10 +1,20 @@
 """CommunityModeratorAgent - Moderates private community channels."""
 
+import asyncio
+import json
 import re
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
 
 from config.config import settings
 from src.agents.base_agent import BaseAgent
@@ -12,6 +22,19 @@ from src.api_integrations.discord_api import DiscordAPI
 from src.api_integrations.telegram_api import TelegramAPI
 from src.database.connection import get_db
 from src.database.models import ModerationAction
+from src.utils.semantic_cache import SemanticCache
+
+# Spam patterns, matched case-insensitively
+SPAM_PATTERNS = [
+    r"(buy|sell|click|check\s+out).{0,50}(link|here|now)",
+    r"t\.me/\w+",  # Telegram links
+    r"discord\.gg/\w+",  # Discord invites
+    r"(earn|make).{0,20}\$\d+",  # Money making schemes
+    r"(dm|message)\s+me",  # Soliciting DMs
+]
+
+# All spam patterns in one alternation, compiled once, so each message is scanned once
+_SPAM_RE = re.compile("|".join(f"(?:{pattern})" for pattern in SPAM_PATTERNS), re.IGNORECASE)
 
 
 class CommunityModeratorAgent(BaseAgent):
@@ -27,6 +50,37 @@ class CommunityModeratorAgent(BaseAgent):
     - Use AI to detect subtle violations
     """
 
+    # AI checks run on the fast model; verdicts close to the threshold are re-judged
+    # by the strong one
+    FAST_MODEL = "claude-3-5-haiku-20241022"
+    STRONG_MODEL = "claude-3-5-sonnet-20241022"
+
+    # Static instructions of the AI checks, sent as cached system prompts
+    _CHECKLIST = """Check for:
+1. Scams or fraudulent schemes
+2. Spam or unsolicited promotion
+3. Personal attacks or harassment
+4. Offensive language (judge context and intent, not just the words)
+5. Misleading information
+6. Soliciting private information"""
+
+    COMPREHENSIVE_CHECK_PROMPT = f"""You are an expert content moderator for a crypto trading community. Analyze the user's message for violations.
+
+{_CHECKLIST}
+
+If you detect a violation, respond with JSON:
+{{"violation": true, "type": "scam/spam/harassment/offensive/misleading", "confidence": 0.0-1.0, "reason": "brief explanation"}}
+
+If no violation:
+{{"violation": false}}"""
+
+    BATCH_CHECK_PROMPT = f"""You are an expert content moderator for a crypto trading community. The user sends a JSON array of messages, each with an "idx". Analyze every message for violations.
+
+{_CHECKLIST}
+
+Respond with only a JSON array holding one verdict per message, e.g.:
+[{{"idx": 0, "violation": false}}, {{"idx": 1, "violation": true, "type": "scam/spam/harassment/offensive/misleading", "confidence": 0.0-1.0, "reason": "brief explanation"}}]"""
+
     def __init__(self):
         """Initialize the CommunityModeratorAgent."""
         super().__init__("CommunityModeratorAgent")
@@ -50,17 +104,9 @@ class CommunityModeratorAgent(BaseAgent):
             self.telegram_api = None
 
         # Initialize LLM for content moderation
-        self.llm_client = Anthropic(api_key=settings.anthropic_api_key)
-
-        # Moderation rules
-        self.spam_patterns = [
-            r"(?i)(buy|sell|click|check\s+out).{0,50}(link|here|now)",
-            r"(?i)t\.me/[\w]+",  # Telegram links
-            r"(?i)discord\.gg/[\w]+",  # Discord invites
-            r"(?i)(earn|make).{0,20}\$\d+",  # Money making schemes
-            r"(?i)(dm|message)\s+me",  # Soliciting DMs
-        ]
+        self.llm_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
 
+        # Moderation rules (spam patterns are module-level, see SPAM_PATTERNS)
         self.scam_keywords = [
             "investment opportunity",
             "guaranteed profit",
@@ -85,9 +131,58 @@ class CommunityModeratorAgent(BaseAgent):
             # Add more as needed, would use better list in production
         ]
 
+        # Short messages only get an AI check if they link, mention or name a ticker,
+        # or contain a word that often comes with scams or abuse
+        self.ai_min_length = 40
+        self._ai_trigger_re = re.compile(r"https?://|@\w+|\$\w+")
+        self.suspicious_tokens = frozenset(
+            [
+                *self.offensive_keywords,
+                "wallet",
+                "seed",
+                "dm",
+                "invest",
+                "giveaway",
+                "guaranteed",
+                "idiot",
+                "stupid",
+                "moron",
+                "loser",
+                "kill",
+            ]
+        )
+
+        # Scam keywords in one automaton: a single pass per message. Offensive
+        # keywords need context, which the AI check judges, so they aren't matched here
+        self._keyword_ac = None
+        if ahocorasick is not None:
+            self._keyword_ac = ahocorasick.Automaton()
+            for keyword in self.scam_keywords:
+                self._keyword_ac.add_word(keyword.casefold(), keyword)
+            self._keyword_ac.make_automaton()
+
         # Confidence threshold for AI moderation
         self.ai_moderation_threshold = 0.8
 
+        # Fast-model violation confidences in this range are escalated to STRONG_MODEL
+        self.ai_escalation_band = (0.6, 0.9)
+
+        # Calls and tokens per model, plus how many verdicts were escalated
+        self.ai_usage: dict[str, Counter] = defaultdict(Counter)
+        self.ai_escalations = 0
+
+        # AI verdicts for repeated messages (spam floods), matched on normalized text;
+        # a near-duplicate tier needs a sentence-embedding model, since surface
+        # similarity can't tell "do not send your seed phrase" from "send your seed phrase"
+        self._ai_comprehensive_cache = SemanticCache()
+
+        # Messages judged per batched AI call (keeps the reply well under max_tokens)
+        self.ai_batch_size = 20
+
+        # Moderation actions are written in one transaction per run (or per flush size)
+        self._pending_mod_actions: list[ModerationAction] = []
+        self.mod_action_flush_size = 100
+
     async def execute(self) -> dict:
         """
         Execute moderation checks.
@@ -120,11 +215,16 @@ class CommunityModeratorAgent(BaseAgent):
                 f"Moderation complete: {results['violations_detected']} violations detected, "
                 f"{results['messages_deleted']} messages deleted"
             )
+            usage = {model: dict(counts) for model, counts in self.ai_usage.items()}
+            self.log_info(f"AI usage: {usage}, {self.ai_escalations} escalations")
 
         except Exception as e:
             self.log_error(f"Moderation execution error: {e}")
             raise
 
+        finally:
+            self._flush_moderation_actions()
+
         return results
 
     async def _moderate_discord_channels(self) -> dict:
@@ -142,43 +242,68 @@ class CommunityModeratorAgent(BaseAgent):
         # Get channels to moderate (would be configured)
         channels_to_moderate = ["general_chat_channel_id", "trading_signals_channel_id"]
 
-        for channel_id in channels_to_moderate:
-            try:
-                # Get recent messages
-                messages = await self.discord_api.get_channel_messages(
-                    channel_id=channel_id, limit=50
-                )
+        # Channels run concurrently, so one channel's fetch overlaps another's AI
+        # calls and actions; each returns its own counters, merged here
+        for channel_results in await asyncio.gather(
+            *(self._moderate_discord_channel(channel_id) for channel_id in channels_to_moderate)
+        ):
+            for key, value in channel_results.items():
+                results[key] += value
+
+        return results
+
+    async def _moderate_discord_channel(self, channel_id: str) -> dict:
+        """
+        Moderate the recent messages of one Discord channel.
 
-                results["messages_checked"] += len(messages)
+        Args:
+            channel_id: Discord channel ID
+
+        Returns:
+            Dictionary with moderation results for the channel
+        """
+        results = {"messages_checked": 0, "violations": 0, "deleted": 0, "warned": 0}
 
-                # Check each message
-                for message in messages:
-                    violation = await self._check_message_for_violations(
-                        message["content"], message["author_id"], message["author_name"]
+        try:
+            # Get recent messages
+            messages = await self.discord_api.get_channel_messages(channel_id=channel_id, limit=50)
+
+            results["messages_checked"] += len(messages)
+
+            # Rules first; whatever they don't settle is judged in batched AI calls
+            violations = [self._rule_violation(message["content"]) for message in messages]
+            pending = [
+                i
+                for i, (message, violation) in enumerate(zip(messages, violations))
+                if violation is None and self._needs_ai_check(message["content"])
+            ]
+            ai_violations = await self._ai_batch_check([messages[i]["content"] for i in pending])
+            for i, violation in zip(pending, ai_violations):
+                violations[i] = violation
+
+            for message, violation in zip(messages, violations):
+                if violation:
+                    results["violations"] += 1
+
+                    # Take action
+                    action_taken = await self._take_moderation_action(
+                        platform="discord",
+                        user_id=message["author_id"],
+                        user_name=message["author_name"],
+                        message_content=message["content"],
+                        violation_type=violation["type"],
+                        confidence=violation["confidence"],
+                        channel_id=channel_id,
+                        message_id=message["id"],
                     )
 
-                    if violation:
-                        results["violations"] += 1
-
-                        # Take action
-                        action_taken = await self._take_moderation_action(
-                            platform="discord",
-                            user_id=message["author_id"],
-                            user_name=message["author_name"],
-                            message_content=message["content"],
-                            violation_type=violation["type"],
-                            confidence=violation["confidence"],
-                            channel_id=channel_id,
-                            message_id=message["id"],
-                        )
-
-                        if action_taken == "deleted":
-                            results["deleted"] += 1
-                        elif action_taken == "warned":
-                            results["warned"] += 1
-
-            except Exception as e:
-                self.log_error(f"Error moderating channel {channel_id}: {e}")
+                    if action_taken == "deleted":
+                        results["deleted"] += 1
+                    elif action_taken == "warned":
+                        results["warned"] += 1
+
+        except Exception as e:
+            self.log_error(f"Error moderating channel {channel_id}: {e}")
 
         return results
 
@@ -196,128 +321,110 @@ class CommunityModeratorAgent(BaseAgent):
         Returns:
             Violation details or None
         """
-        # Check for spam patterns
-        for pattern in self.spam_patterns:
-            if re.search(pattern, content):
-                return {"type": "spam", "confidence": 0.95, "reason": "Matches spam pattern"}
-
-        # Check for scam keywords
-        content_lower = content.lower()
-
-        for keyword in self.scam_keywords:
-            if keyword in content_lower:
-                return {
-                    "type": "scam",
-                    "confidence": 0.85,
-                    "reason": f"Contains scam keyword: {keyword}",
-                }
-
-        # Check for offensive content
-        for keyword in self.offensive_keywords:
-            if keyword in content_lower:
-                # Use AI to verify context
-                is_violation = await self._ai_moderation_check(content, "offensive")
-
-                if is_violation:
-                    return {
-                        "type": "offensive",
-                        "confidence": 0.75,
-                        "reason": "Offensive language detected",
-                    }
-
-        # Use AI for advanced moderation
-        ai_violation = await self._ai_comprehensive_check(content)
-
-        if ai_violation:
-            return ai_violation
+        violation = self._rule_violation(content)
+        if violation is not None:
+            return violation
 
-        return None
+        if not self._needs_ai_check(content):
+            return None
+
+        # Use AI for advanced moderation (one call, offensive language included)
+        return await self._ai_comprehensive_check(content)
 
-    async def _ai_moderation_check(self, content: str, violation_type: str) -> bool:
+    def _rule_violation(self, content: str) -> Optional[dict]:
         """
-        Use AI to check if content is actually a violation.
+        Check a message against the spam patterns and scam keywords.
 
         Args:
             content: Message content
-            violation_type: Type of potential violation
 
         Returns:
-            True if it's a violation
+            Violation details, or None if the message needs an AI check
         """
-        try:
-            prompt = f"""You are a content moderator. Determine if this message violates community guidelines for "{violation_type}" content.
-
-Message: "{content}"
+        # Check for spam patterns
+        if _SPAM_RE.search(content):
+            return {"type": "spam", "confidence": 0.95, "reason": "Matches spam pattern"}
 
-Is this a violation? Consider context and intent.
+        # Check for scam keywords; offensive ones need context, which the AI check judges
+        scam_keyword = self._match_scam_keyword(content.casefold())
 
-Respond with just "YES" or "NO"."""
+        if scam_keyword is not None:
+            return {
+                "type": "scam",
+                "confidence": 0.85,
+                "reason": f"Contains scam keyword: {scam_keyword}",
+            }
 
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=10,
-                messages=[{"role": "user", "content": prompt}],
-            )
+        return None
 
-            response = message.content[0].text.strip().upper()
+    def _needs_ai_check(self, content: str) -> bool:
+        """
+        Decide whether a message that passed the rules is worth an AI check.
 
-            return response == "YES"
+        Args:
+            content: Message content
 
-        except Exception as e:
-            self.log_error(f"AI moderation check error: {e}")
-            return False
+        Returns:
+            False for short messages with nothing suspicious in them
+        """
+        if len(content) >= self.ai_min_length or self._ai_trigger_re.search(content):
+            return True
+        return not self.suspicious_tokens.isdisjoint(re.findall(r"\w+", content.casefold()))
 
-    async def _ai_comprehensive_check(self, content: str) -> Optional[dict]:
+    def _match_scam_keyword(self, content_folded: str) -> Optional[str]:
         """
-        Use AI for comprehensive moderation check.
+        Find a scam keyword in a message.
 
         Args:
-            content: Message content
+            content_folded: Casefolded message content
 
         Returns:
-            Violation details or None
+            First scam keyword found, or None
         """
-        try:
-            prompt = f"""You are an expert content moderator for a crypto trading community. Analyze this message for violations:
+        if self._keyword_ac is None:
+            return next((kw for kw in self.scam_keywords if kw.casefold() in content_folded), None)
 
-Message: "{content}"
+        for _, keyword in self._keyword_ac.iter(content_folded):
+            return keyword
+        return None
 
-Check for:
-1. Scams or fraudulent schemes
-2. Spam or unsolicited promotion
-3. Personal attacks or harassment
-4. Misleading information
-5. Soliciting private information
+    async def _ai_comprehensive_check(self, content: str, escalate: bool = False) -> Optional[dict]:
+        """
+        Use AI for comprehensive moderation check.
 
-If you detect a violation, respond with JSON:
-{{"violation": true, "type": "scam/spam/harassment/misleading", "confidence": 0.0-1.0, "reason": "brief explanation"}}
+        Args:
+            content: Message content
+            escalate: Ask STRONG_MODEL directly instead of starting with FAST_MODEL
 
-If no violation:
-{{"violation": false}}"""
+        Returns:
+            Violation details or None
+        """
+        if not escalate:
+            cached = self._ai_comprehensive_cache.get(content)
+            if cached is not None:
+                # "No violation" is cached as an empty dict
+                return cached or None
 
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=200,
-                messages=[{"role": "user", "content": prompt}],
+        try:
+            response_text = await self._ask_ai(
+                self.STRONG_MODEL if escalate else self.FAST_MODEL,
+                self.COMPREHENSIVE_CHECK_PROMPT,
+                f'Message: "{content}"',
+                max_tokens=150,
             )
 
-            response_text = message.content[0].text.strip()
-
             # Parse JSON response
-            import json
-
             try:
                 result = json.loads(response_text)
 
-                if (
-                    result.get("violation")
-                    and result.get("confidence", 0) >= self.ai_moderation_threshold
-                ):
-                    return {
-                        "type": result["type"],
-                        "confidence": result["confidence"],
-                        "reason": result["reason"],
-                    }
+                if not escalate and self._is_uncertain(result):
+                    self.ai_escalations += 1
+                    return await self._ai_comprehensive_check(content, escalate=True)
+
+                violation = self._parse_ai_verdict(result)
+
+                self._ai_comprehensive_cache.put(content, violation)
+                return violation or None
 
             except json.JSONDecodeError:
                 self.log_warning(f"Failed to parse AI response: {response_text}")
@@ -327,6 +434,142 @@ If no violation:
 
         return None
 
+    async def _ai_batch_check(self, contents: list[str]) -> list[Optional[dict]]:
+        """
+        Judge several messages with one AI call per ai_batch_size messages.
+
+        Cached verdicts are reused; messages whose verdict is missing from a
+        batched reply get an individual comprehensive check, and uncertain
+        verdicts are re-judged by STRONG_MODEL.
+
+        Args:
+            contents: Message contents
+
+        Returns:
+            Violation details or None per message, in order
+        """
+        results: list[Optional[dict]] = [None] * len(contents)
+        uncached = []
+        for i, content in enumerate(contents):
+            cached = self._ai_comprehensive_cache.get(content)
+            if cached is None:
+                uncached.append(i)
+            else:
+                results[i] = cached or None
+
+        for start in range(0, len(uncached), self.ai_batch_size):
+            chunk = uncached[start : start + self.ai_batch_size]
+            verdicts = await self._ai_batch_verdicts([contents[i] for i in chunk])
+
+            for idx, i in enumerate(chunk):
+                result = verdicts.get(idx)
+                if result is None:
+                    results[i] = await self._ai_comprehensive_check(contents[i])
+                elif self._is_uncertain(result):
+                    self.ai_escalations += 1
+                    results[i] = await self._ai_comprehensive_check(contents[i], escalate=True)
+                else:
+                    self._ai_comprehensive_cache.put(contents[i], result)
+                    results[i] = result or None
+
+        return results
+
+    async def _ai_batch_verdicts(self, contents: list[str]) -> dict[int, dict]:
+        """
+        Ask FAST_MODEL for verdicts on a batch of messages in one call.
+
+        Args:
+            contents: Message contents (at most ai_batch_size)
+
+        Returns:
+            Per message index that the reply covered: violation details ({} = no
+            violation), or the raw verdict if it falls in ai_escalation_band
+        """
+        if len(contents) == 1:
+            # Not worth the batch framing; the single check caches its own verdict
+            return {}
+
+        payload = [{"idx": idx, "message": content} for idx, content in enumerate(contents)]
+        try:
+            response_text = await self._ask_ai(
+                self.FAST_MODEL,
+                self.BATCH_CHECK_PROMPT,
+                json.dumps(payload),
+                max_tokens=60 * len(contents) + 200,
+            )
+
+            start_idx = response_text.find("[")
+            end_idx = response_text.rfind("]") + 1
+            results = json.loads(response_text[start_idx:end_idx])
+
+            verdicts = {}
+            for result in results:
+                idx = result.get("idx")
+                if isinstance(idx, int) and 0 <= idx < len(contents):
+                    verdicts[idx] = (
+                        result if self._is_uncertain(result) else self._parse_ai_verdict(result)
+                    )
+            return verdicts
+
+        except (json.JSONDecodeError, AttributeError, KeyError) as e:
+            self.log_warning(f"Failed to parse batched AI response: {e}")
+        except Exception as e:
+            self.log_error(f"AI batch check error: {e}")
+
+        return {}
+
+    async def _ask_ai(self, model: str, system: str, content: str, max_tokens: int) -> str:
+        """
+        Send one moderation request and record its usage.
+
+        Args:
+            model: Claude model to use
+            system: Static instructions, sent as a cached system prompt
+            content: User message
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Stripped response text
+        """
+        message = await self.llm_client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=[{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+            messages=[{"role": "user", "content": content}],
+        )
+
+        usage = self.ai_usage[model]
+        usage["calls"] += 1
+        if getattr(message, "usage", None) is not None:
+            usage["input_tokens"] += int(message.usage.input_tokens)
+            usage["output_tokens"] += int(message.usage.output_tokens)
+
+        return message.content[0].text.strip()
+
+    def _is_uncertain(self, result: dict) -> bool:
+        """Whether a fast-model verdict is a violation too close to the threshold to trust."""
+        low, high = self.ai_escalation_band
+        confidence = result.get("confidence", 0)
+        return bool(result.get("violation")) and low <= confidence <= high
+
+    def _parse_ai_verdict(self, result: dict) -> dict:
+        """
+        Turn a parsed AI verdict into violation details.
+
+        Args:
+            result: Verdict object from the AI response
+
+        Returns:
+            Violation details, or {} if no violation reaches the confidence threshold
+        """
+        if result.get("violation") and result.get("confidence", 0) >= self.ai_moderation_threshold:
+            return {
+                "type": result["type"],
+                "confidence": result["confidence"],
+                "reason": result["reason"],
+            }
+        return {}
+
     async def _take_moderation_action(
         self,
         platform: str,
@@ -406,7 +649,7 @@ If no violation:
         agent_confidence: float,
     ):
         """
-        Log moderation action to database.
+        Queue a moderation action for the database (written by _flush_moderation_actions).
 
         Args:
             user_id: CommunityUser ID (if known)
@@ -419,8 +662,8 @@ If no violation:
             automated: Whether action was automated
             agent_confidence: AI confidence score
         """
-        with get_db() as db:
-            moderation = ModerationAction(
+        self._pending_mod_actions.append(
+            ModerationAction(
                 user_id=user_id,
                 platform_user_id=platform_user_id,
                 action_type=action_type,
@@ -431,9 +674,23 @@ If no violation:
                 automated=automated,
                 agent_confidence=agent_confidence,
             )
+        )
 
-            db.add(moderation)
-            db.commit()
+        if len(self._pending_mod_actions) >= self.mod_action_flush_size:
+            self._flush_moderation_actions()
+
+    def _flush_moderation_actions(self):
+        """Write all queued moderation actions in a single transaction."""
+        if not self._pending_mod_actions:
+            return
+
+        batch, self._pending_mod_actions = self._pending_mod_actions, []
+        try:
+            with get_db() as db:
+                db.bulk_save_objects(batch)
+        except SQLAlchemyError as e:
+            # The actions were already taken on the platform; don't fail the run
+            self.log_error(f"Failed to log {len(batch)} moderation actions: {e}")
 
     async def get_moderation_stats(self, days: int = 7) -> dict:
         """
@@ -449,33 +706,36 @@ If no violation:
         cutoff = datetime.now(tz=timezone.utc) - timedelta(days=days)
 
         with get_db() as db:
-            actions = db.query(ModerationAction).filter(ModerationAction.timestamp >= cutoff).all()
-
-            stats = {
-                "period_days": days,
-                "total_actions": len(actions),
-                "automated_actions": len([a for a in actions if a.automated]),
-                "manual_actions": len([a for a in actions if not a.automated]),
-                "by_type": {},
-                "by_platform": {},
-            }
-
-            # Count by action type
-            for action in actions:
-                action_type = action.action_type
-
-                if action_type not in stats["by_type"]:
-                    stats["by_type"][action_type] = 0
-
-                stats["by_type"][action_type] += 1
-
-            # Count by platform
-            for action in actions:
-                platform = action.platform
+            # One row per (type, platform, automated) combination instead of every action
+            rows = (
+                db.query(
+                    ModerationAction.action_type,
+                    ModerationAction.platform,
+                    ModerationAction.automated,
+                    func.count(ModerationAction.id),
+                )
+                .filter(ModerationAction.timestamp >= cutoff)
+                .group_by(
+                    ModerationAction.action_type,
+                    ModerationAction.platform,
+                    ModerationAction.automated,
+                )
+                .all()
+            )
 
-                if platform not in stats["by_platform"]:
-                    stats["by_platform"][platform] = 0
+        stats = {
+            "period_days": days,
+            "total_actions": 0,
+            "automated_actions": 0,
+            "manual_actions": 0,
+            "by_type": {},
+            "by_platform": {},
+        }
 
-                stats["by_platform"][platform] += 1
+        for action_type, platform, automated, count in rows:
+            stats["total_actions"] += count
+            stats["automated_actions" if automated else "manual_actions"] += count
+            stats["by_type"][action_type] = stats["by_type"].get(action_type, 0) + count
+            stats["by_platform"][platform] = stats["by_platform"].get(platform, 0) + count
 
-            return stats
+        return stats
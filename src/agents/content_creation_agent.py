@@ -1,5 +1,6 @@
 """ContentCreationAgent - Generates content based on insights and content plans."""
 
+import asyncio
 import json
 
 from anthropic import Anthropic
@@ -10,9 +11,21 @@ from src.agents.base_agent import BaseAgent
 from src.database.connection import get_db
 from src.database.models import ContentFormat, ContentPlan
 from src.database.models import ContentPlan, ContentFormat
+from src.utils.llm_cache import LLMCache
 from src.utils.llm_client import llm_client
 from config.config import settings
 
+_JSON_DECODER = json.JSONDecoder()
+
+TWEET_MAX_LENGTH = 280
+
+
+def _clamp_tweet(text: str) -> str:
+    """Truncate a tweet to TWEET_MAX_LENGTH characters, ending it with an ellipsis."""
+    if len(text) <= TWEET_MAX_LENGTH:
+        return text
+    return f"{text[:TWEET_MAX_LENGTH - 3]}..."
+
 
 class ContentCreationAgent(BaseAgent):
     """
@@ -32,6 +45,13 @@ class ContentCreationAgent(BaseAgent):
         # Use global LLM client (supports Gemini & Claude with failover)
         self.llm_client = llm_client
 
+        # Bound concurrent LLM requests when plans are generated in parallel
+        self._llm_sem = asyncio.Semaphore(10)
+
+        # Re-runs and retries of the same insight reuse the completion; the
+        # short TTL keeps fresh wording for insights that come back later
+        self.llm_cache = LLMCache(default_ttl=3600, max_entries=2048)
+
         # Content personality from config
         self.personality = settings.content_personality
 
@@ -54,7 +74,14 @@ class ContentCreationAgent(BaseAgent):
             ),
         }
 
-    async def execute(self) -> dict:
+        # Resolve the personality once; blog posts default to the educational voice
+        self._personality_prompt = self.personality_prompts.get(
+            self.personality, self.personality_prompts["hyper-analytical"]
+        )
+        self._blog_personality_prompt = self.personality_prompts.get(
+            self.personality, self.personality_prompts["educational"]
+        )
+
     async def execute(self, *args, **kwargs) -> Dict:
         """
         Execute content creation for pending content plans.
@@ -84,6 +111,7 @@ class ContentCreationAgent(BaseAgent):
             # Handle direct execution with provided plans (bypassing DB for immediate response)
             self.log_info(f"Processing {len(direct_content_plans)} provided content plans directly")
 
+            mock_plans = []
             for item in direct_content_plans:
                 try:
                     # Map dictionary item to a mock plan/insight structure for generation
@@ -115,29 +143,36 @@ class ContentCreationAgent(BaseAgent):
                             self.insight = insight
 
                     mock_insight = MockInsight(item)
-                    mock_plan = MockPlan(item, mock_insight)
-
-                    # Generate content
-                    content = await self._generate_content(mock_plan)
-
-                    if content:
-                        results["content_created"] += 1
-                        results["generated_content"] = results.get("generated_content", [])
-                        results["generated_content"].append(content)
-
-                        # Track by type
-                        if item_format == ContentFormat.SINGLE_TWEET:
-                            results["tweets"] += 1
-                        elif item_format == ContentFormat.THREAD:
-                            results["threads"] += 1
-                        elif item_format == ContentFormat.TELEGRAM_MESSAGE:
-                            results["telegram_messages"] += 1
+                    mock_plans.append(MockPlan(item, mock_insight))
 
                 except Exception as e:
                     error_msg = f"Error creating content for item: {e}"
                     self.log_error(error_msg)
                     results["errors"].append(error_msg)
 
+            # Generate content for all items concurrently
+            contents = await self._generate_all(mock_plans)
+
+            for mock_plan, content in zip(mock_plans, contents):
+                if isinstance(content, Exception):
+                    error_msg = f"Error creating content for item: {content}"
+                    self.log_error(error_msg)
+                    results["errors"].append(error_msg)
+                    continue
+
+                if content:
+                    results["content_created"] += 1
+                    results["generated_content"] = results.get("generated_content", [])
+                    results["generated_content"].append(content)
+
+                    # Track by type
+                    if mock_plan.format == ContentFormat.SINGLE_TWEET:
+                        results["tweets"] += 1
+                    elif mock_plan.format == ContentFormat.THREAD:
+                        results["threads"] += 1
+                    elif mock_plan.format == ContentFormat.TELEGRAM_MESSAGE:
+                        results["telegram_messages"] += 1
+
             return results
 
         try:
@@ -152,10 +187,13 @@ class ContentCreationAgent(BaseAgent):
                     ContentPlan.status == "pending"
                 ).limit(10).all()
 
-                for plan in pending_plans:
+                # Generate content for all plans concurrently
+                contents = await self._generate_all(pending_plans)
+
+                for plan, content in zip(pending_plans, contents):
                     try:
-                        # Generate content based on format
-                        content = await self._generate_content(plan)
+                        if isinstance(content, Exception):
+                            raise content
 
                         if content:
                             # Store generated content in the plan
@@ -219,6 +257,23 @@ class ContentCreationAgent(BaseAgent):
 
             return plans
 
+    async def _generate_all(self, plans: list) -> list:
+        """
+        Generate content for several plans concurrently.
+
+        Args:
+            plans: ContentPlan (or compatible) objects
+
+        Returns:
+            Generated content (or the raised exception) per plan, in order
+        """
+
+        async def _bounded(plan):
+            async with self._llm_sem:
+                return await self._generate_content(plan)
+
+        return await asyncio.gather(*(_bounded(plan) for plan in plans), return_exceptions=True)
+
     async def _generate_content(self, plan: ContentPlan) -> dict:
         """
         Generate content for a content plan.
@@ -242,15 +297,39 @@ class ContentCreationAgent(BaseAgent):
             return await self._generate_blog_post(insight, plan)
         return await self._generate_tweet(insight, plan)
 
-    async def _generate_tweet(self, insight, plan: ContentPlan) -> dict:
-        """Generate a single tweet."""
-        personality = self.personality_prompts.get(
-            self.personality, self.personality_prompts["hyper-analytical"]
+    async def _complete(self, fn: str, system: str, prompt: str, max_tokens: int) -> str:
+        """
+        Generate a completion, reusing the cached one for an identical request.
+
+        Args:
+            fn: Name of the calling function, part of the cache key
+            system: Personality prompt, sent as a separately cached system prompt
+            prompt: Per-insight user message
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Stripped response text
+        """
+        key = LLMCache.make_key(fn, f"gemini:{max_tokens}", system + prompt)
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            self.log_info(f"LLM cache hit for {fn} (hits={self.llm_cache.hits})")
+            return cached
+
+        # Use Gemini by default (Anthropic has no credits)
+        text = await self.llm_client.generate(
+            prompt=prompt, model="gemini", max_tokens=max_tokens, system=system
         )
+        text = text.strip()
 
-        prompt = f"""{personality}
+        self.llm_cache.set(key, text)
+        return text
 
-Create a single tweet (max 280 characters) about this crypto insight:
+    async def _generate_tweet(self, insight, plan: ContentPlan) -> dict:
+        """Generate a single tweet."""
+        personality = self._personality_prompt
+
+        prompt = f"""Create a single tweet (max 280 characters) about this crypto insight:
 
 Asset: {insight.asset}
 Type: {insight.type.value}
@@ -262,26 +341,17 @@ Requirements:
 - Include ${insight.asset} ticker
 - Use 1-2 relevant hashtags
 - Make it engaging and informative
-- Match the personality described above
+- Match the personality in your instructions
 
 Tweet:"""
 
         try:
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=150,
-                messages=[{"role": "user", "content": prompt}],
-            # Use Gemini by default (Anthropic has no credits)
-            tweet_text = await self.llm_client.generate(
-                prompt=prompt,
-                model="gemini",
-                max_tokens=150
+            tweet_text = await self._complete(
+                "_generate_tweet", personality, prompt, max_tokens=150
             )
-            tweet_text = tweet_text.strip()
 
             # Ensure it fits in 280 characters
-            if len(tweet_text) > 280:
-                tweet_text = tweet_text[:277] + "..."
+            tweet_text = _clamp_tweet(tweet_text)
 
             return {"text": tweet_text, "format": "tweet", "content_plan_id": plan.id}
 
@@ -291,16 +361,12 @@ Tweet:"""
 
     async def _generate_thread(self, insight, plan: ContentPlan) -> dict:
         """Generate a Twitter thread."""
-        personality = self.personality_prompts.get(
-            self.personality, self.personality_prompts["hyper-analytical"]
-        )
+        personality = self._personality_prompt
 
         # Determine thread length based on confidence and detail
         thread_length = 5 if insight.confidence >= 0.85 else 3
 
-        prompt = f"""{personality}
-
-Create a Twitter thread with {thread_length} tweets about this crypto insight:
+        prompt = f"""Create a Twitter thread with {thread_length} tweets about this crypto insight:
 
 Asset: {insight.asset}
 Type: {insight.type.value}
@@ -314,7 +380,7 @@ Requirements:
 - Include data and specific numbers
 - Use ${insight.asset} ticker in first tweet
 - Add relevant hashtags at the end
-- Match the personality described above
+- Match the personality in your instructions
 - Number each tweet (1/X, 2/X, etc.)
 
 Return as a JSON array of strings, e.g.:
@@ -323,38 +389,28 @@ Return as a JSON array of strings, e.g.:
 Thread:"""
 
         try:
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=800,
-                messages=[{"role": "user", "content": prompt}],
-            # Use Gemini by default (Anthropic has no credits)
-            response_text = await self.llm_client.generate(
-                prompt=prompt,
-                model="gemini",
-                max_tokens=800
+            response_text = await self._complete(
+                "_generate_thread", personality, prompt, max_tokens=800
             )
-            response_text = response_text.strip()
 
-            # Try to parse as JSON
+            # Try to parse as JSON, fitting each tweet in 280 characters as we go
             try:
-                # Extract JSON array from the response
-                start_idx = response_text.find("[")
-                end_idx = response_text.rfind("]") + 1
-                json_str = response_text[start_idx:end_idx]
-                thread_tweets = json.loads(json_str)
-            except (json.JSONDecodeError, ValueError, IndexError):
+                # Decode the JSON array in place, starting at its first bracket;
+                # trailing text after it is ignored
+                parsed, _ = _JSON_DECODER.raw_decode(response_text, response_text.index("["))
+                thread_tweets = []
+                for tweet in parsed:
+                    if not isinstance(tweet, str):
+                        raise ValueError("thread is not a list of strings")
+                    thread_tweets.append(_clamp_tweet(tweet))
+            except ValueError:
                 # Fallback: split by newlines
                 thread_tweets = [
-                    t.strip()
-                    for t in response_text.split("\n")
-                    if t.strip() and len(t.strip()) > 10
+                    _clamp_tweet(line)
+                    for line in map(str.strip, response_text.split("\n"))
+                    if len(line) > 10
                 ][:thread_length]
 
-            # Ensure each tweet fits in 280 characters
-            thread_tweets = [
-                tweet[:277] + "..." if len(tweet) > 280 else tweet for tweet in thread_tweets
-            ]
-
             return {"tweets": thread_tweets, "format": "thread", "content_plan_id": plan.id}
 
         except Exception as e:
@@ -363,14 +419,10 @@ Thread:"""
 
     async def _generate_telegram_message(self, insight, plan: ContentPlan) -> dict:
         """Generate a Telegram message."""
-        personality = self.personality_prompts.get(
-            self.personality, self.personality_prompts["hyper-analytical"]
-        )
+        personality = self._personality_prompt
 
         # Telegram allows markdown formatting
-        prompt = f"""{personality}
-
-Create a Telegram message about this crypto insight:
+        prompt = f"""Create a Telegram message about this crypto insight:
 
 Asset: {insight.asset}
 Type: {insight.type.value}
@@ -382,22 +434,14 @@ Requirements:
 - 2-4 paragraphs
 - Include specific data and numbers
 - Add a clear conclusion or takeaway
-- Match the personality described above
+- Match the personality in your instructions
 
 Message:"""
 
         try:
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}],
-            # Use Gemini by default (Anthropic has no credits)
-            telegram_text = await self.llm_client.generate(
-                prompt=prompt,
-                model="gemini",
-                max_tokens=500
+            telegram_text = await self._complete(
+                "_generate_telegram_message", personality, prompt, max_tokens=500
             )
-            telegram_text = telegram_text.strip()
 
             return {"text": telegram_text, "format": "telegram", "content_plan_id": plan.id}
 
@@ -407,13 +451,9 @@ Message:"""
 
     async def _generate_blog_post(self, insight, plan: ContentPlan) -> dict:
         """Generate a blog post."""
-        personality = self.personality_prompts.get(
-            self.personality, self.personality_prompts["educational"]
-        )
-
-        prompt = f"""{personality}
+        personality = self._blog_personality_prompt
 
-Write a detailed blog post about this crypto insight:
+        prompt = f"""Write a detailed blog post about this crypto insight:
 
 Asset: {insight.asset}
 Type: {insight.type.value}
@@ -427,22 +467,14 @@ Requirements:
 - Include specific data and analysis
 - Add a conclusion with key takeaways
 - Write in Markdown format
-- Match the personality described above
+- Match the personality in your instructions
 
 Blog Post:"""
 
         try:
-            message = self.llm_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1500,
-                messages=[{"role": "user", "content": prompt}],
-            # Use Gemini by default (Anthropic has no credits)
-            blog_text = await self.llm_client.generate(
-                prompt=prompt,
-                model="gemini",
-                max_tokens=1500
+            blog_text = await self._complete(
+                "_generate_blog_post", personality, prompt, max_tokens=1500
             )
-            blog_text = blog_text.strip()
 
             # Extract title (first line starting with #)
             lines = blog_text.split("\n")
@@ -2,6 +2,8 @@
 
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy.orm import selectinload
+
 from src.agents.base_agent import BaseAgent
 from src.database.connection import get_db
 from src.database.models import ContentFormat, ContentPlan, Insight, InsightType, PublishedContent
@@ -190,8 +192,10 @@ class ContentStrategistAgent(BaseAgent):
             # Get insights from the last 24 hours that aren't published
             cutoff_time = datetime.now(tz=timezone.utc) - timedelta(hours=24)
 
+            # content_plans is read after the session closes, so load it up front
             return (
                 db.query(Insight)
+                .options(selectinload(Insight.content_plans))
                 .filter(Insight.is_published.is_(False), Insight.timestamp >= cutoff_time)
                 .order_by(Insight.confidence.desc())
                 .all()
@@ -3,7 +3,7 @@
 from datetime import datetime, timedelta, timezone
 
 from anthropic import Anthropic
-from sqlalchemy import func, case
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import joinedload
 
 from config.config import settings
@@ -469,12 +469,15 @@ DM:"""
         cutoff = datetime.now(tz=timezone.utc) - timedelta(days=days)
 
         with get_db() as db:
-            attempts = db.query(ConversionAttempt).filter(ConversionAttempt.sent_at >= cutoff).all()
-
-            total_attempts = len(attempts)
-            converted = len([a for a in attempts if a.status == "converted"])
-            opened = len([a for a in attempts if a.opened_at is not None])
-            clicked = len([a for a in attempts if a.clicked_at is not None])
+            # Single aggregate query instead of loading every attempt row
+            total_attempts, converted, opened, clicked = db.execute(
+                select(
+                    func.count(),
+                    func.count(case((ConversionAttempt.status == "converted", 1))),
+                    func.count(ConversionAttempt.opened_at),
+                    func.count(ConversionAttempt.clicked_at),
+                ).where(ConversionAttempt.sent_at >= cutoff)
+            ).one()
 
             conversion_rate = (converted / total_attempts * 100) if total_attempts > 0 else 0
             open_rate = (opened / total_attempts * 100) if total_attempts > 0 else 0
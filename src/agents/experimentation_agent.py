@@ -1,6 +1,7 @@
 import json
 import asyncio
 from src.agents.base_agent import BaseAgent
+from src.utils import json_utils
 from src.utils.llm_client import llm_client
 from loguru import logger
 
@@ -98,10 +99,10 @@ You are expected to provide your output in a structured, easily parsable JSON fo
 
         user_input = f"**Task Description**: {task_description}\n\n"
         if context:
-            user_input += f"**Contextual Information**: {json.dumps(context, indent=2)}\n\n"
+            user_input += f"**Contextual Information**: {json_utils.dumps(context).decode()}\n\n"
         
         if kwargs:
-            user_input += f"**Additional Parameters for Design**: {json.dumps(kwargs, indent=2)}\n\n"
+            user_input += f"**Additional Parameters for Design**: {json_utils.dumps(kwargs).decode()}\n\n"
 
         full_prompt = (
             f"{self.SYSTEM_PROMPT}\n\n"
@@ -126,7 +127,7 @@ You are expected to provide your output in a structured, easily parsable JSON fo
 
             # Attempt to parse JSON response
             try:
-                parsed_response = json.loads(response_content)
+                parsed_response = json_utils.loads(response_content)
                 logger.info(f"{self.agent_name} successfully generated and parsed experimental design.")
                 return parsed_response
             except json.JSONDecodeError as e:
@@ -1,5 +1,5 @@
-import json
 from src.agents.base_agent import BaseAgent
+from src.utils import json_utils
 from src.utils.llm_client import llm_client
 from loguru import logger
 
@@ -103,9 +103,10 @@ You are about to receive performance data, ROI reports, or a specific analytical
             Exception: If the LLM call fails for any reason.
         """
         logger.info(f"InsightGenerationAgent received task: '{task_description}'")
+        data_json = json_utils.dumps(data).decode() if data else ""
         if data:
             # Log a snippet of the data to avoid excessively long log entries
-            data_snippet = json.dumps(data, indent=2)[:500] + ("..." if len(json.dumps(data, indent=2)) > 500 else "")
+            data_snippet = data_json[:500] + ("..." if len(data_json) > 500 else "")
             logger.info(f"Data provided for analysis (snippet): {data_snippet}")
         else:
             logger.info("No explicit data dictionary provided for analysis.")
@@ -115,7 +116,7 @@ You are about to receive performance data, ROI reports, or a specific analytical
             f"**TASK DESCRIPTION:** {task_description}"
         ]
         if data:
-            user_message_parts.append(f"\n\n**DATA PROVIDED FOR ANALYSIS (JSON format):**\njson\n{json.dumps(data, indent=2)}\n")
+            user_message_parts.append(f"\n\n**DATA PROVIDED FOR ANALYSIS (JSON format):**\njson\n{data_json}\n")
         
         # Combine system prompt with user input using explicit tags for clear separation
         full_prompt = self.SYSTEM_PROMPT + "\n\n" + "[USER_INPUT]\n" + "\n".join(user_message_parts) + "\n[/USER_INPUT]"
@@ -8,7 +8,8 @@ from src.api_integrations.exchange_api import ExchangeAPI
 from src.api_integrations.news_api import NewsAPI
 from src.api_integrations.twitter_api import TwitterAPI
 from src.database.connection import get_db
-from src.database.models import MarketData, NewsArticle, SentimentData
+from src.database.models import MarketData, NewsArticle, NewsAssetMention, SentimentData
+from src.utils.asset_matcher import article_text, build_asset_matcher
 
 
 class MarketScannerAgent(BaseAgent):
@@ -161,6 +162,9 @@ class MarketScannerAgent(BaseAgent):
         try:
             # Fetch latest news
             articles = await self.news_api.fetch_latest_news(max_articles=20)
+            match_assets = build_asset_matcher(
+                [symbol.replace("USDT", "") for symbol in self.monitored_assets]
+            )
 
             with get_db() as db:
                 for article_data in articles:
@@ -179,6 +183,18 @@ class MarketScannerAgent(BaseAgent):
                             summary=article_data["summary"],
                         )
 
+                        # Resolve asset mentions once here so analysis can look them up
+                        mentioned = sorted(
+                            match_assets(
+                                article_text(article_data["title"], article_data["summary"])
+                            )
+                        )
+                        article.mentioned_assets = mentioned
+                        article.mentions = [
+                            NewsAssetMention(asset=asset, published_at=article.published_at)
+                            for asset in mentioned
+                        ]
+
                         db.add(article)
                         count += 1
 
@@ -7,7 +7,7 @@ from src.agents.base_agent import BaseAgent
 from src.api_integrations.discord_api import DiscordAPI
 from src.api_integrations.telegram_api import TelegramAPI
 from src.database.connection import get_db
-from src.database.models import CommunityUser, Subscription, UserTier
+from src.database.models import PAID_TIERS, CommunityUser, Subscription, UserTier
 
 
 class OnboardingAgent(BaseAgent):
@@ -118,7 +118,7 @@ class OnboardingAgent(BaseAgent):
                 db.query(CommunityUser)
                 .join(Subscription)
                 .filter(
-                    CommunityUser.tier != UserTier.FREE,
+                    CommunityUser.tier.in_(PAID_TIERS),
                     CommunityUser.converted_at >= cutoff,
                     CommunityUser.subscription_status == "active",
                 )
@@ -1,5 +1,6 @@
 import json
 from src.agents.base_agent import BaseAgent
+from src.utils import json_utils
 from src.utils.llm_client import llm_client
 from loguru import logger
 
@@ -124,9 +125,10 @@ class UserValueAgent(BaseAgent):
 
         # Construct the user-specific message to append to the SYSTEM_PROMPT.
         # This message provides the concrete data the LLM needs to analyze.
-        user_message_for_llm = f"Analyze the following user data to identify potential monetization leads, estimate CLV, segment users, and propose tailored automated onboarding strategies. Adhere strictly to the defined output JSON schema.\n\nUser Data for Analysis:\n{json.dumps(user_input_data, indent=2)}"
+        user_data_json = json_utils.dumps(user_input_data).decode()
+        user_message_for_llm = f"Analyze the following user data to identify potential monetization leads, estimate CLV, segment users, and propose tailored automated onboarding strategies. Adhere strictly to the defined output JSON schema.\n\nUser Data for Analysis:\n{user_data_json}"
 
-        logger.debug(f"{self.agent_name} preparing LLM request for user data: {json.dumps(user_input_data)[:200]}...") # Log first 200 chars for brevity
+        logger.debug(f"{self.agent_name} preparing LLM request for user data: {user_data_json[:200]}...") # Log first 200 chars for brevity
         
         try:
             # Combine the constant SYSTEM_PROMPT with the dynamic user data for the LLM call.
@@ -140,7 +142,7 @@ class UserValueAgent(BaseAgent):
             logger.debug(f"{self.agent_name} received raw response from LLM (first 200 chars): {response_content[:200]}...")
 
             # Attempt to parse the LLM's string response into a JSON object.
-            parsed_response = json.loads(response_content)
+            parsed_response = json_utils.loads(response_content)
             logger.info(f"{self.agent_name} successfully parsed LLM response into JSON.")
             return parsed_response
         except json.JSONDecodeError as e:
@@ -3,12 +3,12 @@ from src.orchestrator import AgentOrchestrator
 from src.scheduler import ContentCreatorScheduler
 from src.api_integrations.stripe_api import StripeAPI
 from src.database.connection import get_db
-from src.database.models import CommunityUser, Subscription, UserTier, APIKey, MarketData, ContentPlan
+from src.database.models import CommunityUser, Subscription, UserTier, MarketData, ContentPlan
 from config.config import settings
+from src.utils.api_keys import find_api_key
 import asyncio
 import threading
 import logging
-import hashlib
 import functools
 from datetime import datetime, timedelta
 import os
@@ -22,7 +22,7 @@ STATIC_DIR = os.path.join(BASE_DIR, 'web', 'static')
 app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
 
 orchestrator = AgentOrchestrator()
-scheduler = ContentCreatorScheduler(phase=4)
+scheduler = ContentCreatorScheduler(phase=4, orchestrator=orchestrator)
 stripe_api = StripeAPI()
 
 logging.basicConfig(level=logging.INFO)
@@ -43,11 +43,10 @@ def require_api_key(f):
             return jsonify({"error": "Missing API Key"}), 401
             
         # Hash provided key to match stored hash
-        # The key format is pk_...
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-        
+        # The key format is pk_...; keys still stored under the legacy
+        # SHA-256 digest are upgraded to BLAKE2b on first use
         with get_db() as db:
-            key_record = db.query(APIKey).filter(APIKey.key_hash == key_hash).first()
+            key_record = find_api_key(db, api_key)
             
             if not key_record or not key_record.is_active:
                 return jsonify({"error": "Invalid or inactive API Key"}), 403
@@ -1,7 +1,6 @@
 """Base class for all autonomous improvement agents."""
 
 import asyncio
-import json
 import os
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -10,6 +9,8 @@ from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
+from src.utils import json_utils
+
 
 class BaseAutonomousAgent(ABC):
     """
@@ -248,8 +249,8 @@ class BaseAutonomousAgent(ABC):
         log_file = self.log_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
         
         try:
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            with open(log_file, 'ab') as f:
+                f.write(json_utils.dumps(log_entry) + b'\n')
         except Exception as e:
             logger.warning(f"[{self.name}] Failed to write log: {e}")
     
@@ -258,8 +259,7 @@ class BaseAutonomousAgent(ABC):
         result_file = self.log_dir / f"cycle_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
-            with open(result_file, 'w') as f:
-                json.dump(result, f, indent=2, default=str)
+            result_file.write_bytes(json_utils.dumps(result, indent=True))
         except Exception as e:
             logger.warning(f"[{self.name}] Failed to save cycle result: {e}")
     
@@ -268,8 +268,8 @@ class BaseAutonomousAgent(ABC):
         patterns_file = self.data_dir / f"{self.name.lower()}_patterns.jsonl"
         
         try:
-            with open(patterns_file, 'a') as f:
-                f.write(json.dumps(pattern) + '\n')
+            with open(patterns_file, 'ab') as f:
+                f.write(json_utils.dumps(pattern) + b'\n')
         except Exception as e:
             logger.warning(f"[{self.name}] Failed to save pattern: {e}")
     
@@ -283,8 +283,8 @@ class BaseAutonomousAgent(ABC):
         suggestions_file = self.data_dir / "improvement_suggestions.jsonl"
         
         try:
-            with open(suggestions_file, 'a') as f:
-                f.write(json.dumps(suggestion) + '\n')
+            with open(suggestions_file, 'ab') as f:
+                f.write(json_utils.dumps(suggestion) + b'\n')
         except Exception as e:
             logger.warning(f"[{self.name}] Failed to save suggestion: {e}")
     
@@ -1,13 +1,14 @@
 """MonitoringOrchestrator - Coordinates all monitoring agents."""
 
 import asyncio
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from loguru import logger
 
+from src.utils import json_utils
+
 from .code_health_monitor import CodeHealthMonitor
 from .performance_monitor import PerformanceMonitor
 from .security_auditor import SecurityAuditor
@@ -181,8 +182,7 @@ class MonitoringOrchestrator:
         filepath = self.results_dir / filename
         
         try:
-            with open(filepath, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
+            filepath.write_bytes(json_utils.dumps(results, indent=True))
             logger.info(f"Results saved to {filepath}")
         except Exception as e:
             logger.warning(f"Failed to save results: {e}")
@@ -203,8 +203,7 @@ class MonitoringOrchestrator:
         try:
             files = sorted(self.results_dir.glob('monitoring_*.json'), reverse=True)
             if files:
-                with open(files[0]) as f:
-                    return json.load(f)
+                return json_utils.loads(files[0].read_bytes())
         except Exception as e:
             logger.warning(f"Error loading latest results: {e}")
         return None
@@ -1,6 +1,6 @@
 """Add performance indexes to the database."""
 
-from sqlalchemy import Index, create_engine
+from sqlalchemy import Index, create_engine, text
 from sqlalchemy.orm import sessionmaker
 import sys
 import os
@@ -9,7 +9,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from config.config import settings
-from src.database.models import Base, UserInteraction, PublishedContent, CommunityUser
+from src.database.models import (
+    Base, UserInteraction, PublishedContent, CommunityUser, ABTest, Insight, MarketData
+)
 
 
 def add_performance_indexes():
@@ -36,6 +38,22 @@ def add_performance_indexes():
               CommunityUser.tier, CommunityUser.engagement_score),
         Index('idx_community_user_last_interaction', 
               CommunityUser.last_interaction),
+        
+        # A/B testing indexes (active test lookup, per-variant engagement rollups)
+        Index('ix_ab_tests_status', 
+              ABTest.status),
+        Index('ix_published_content_ab_test_variant_id', 
+              PublishedContent.ab_test_variant_id),
+        
+        # MarketData index for active asset and per-asset window lookups
+        Index('idx_market_data_asset_timestamp', 
+              MarketData.asset, MarketData.timestamp),
+        
+        # Partial index for unpublished insight candidates
+        Index('idx_insight_unpublished_timestamp_confidence', 
+              Insight.timestamp, Insight.confidence,
+              postgresql_where=text("is_published = false"),
+              sqlite_where=text("is_published = 0")),
     ]
     
     print("Creating performance indexes...")
@@ -0,0 +1,91 @@
+"""Shared asyncpg connection pool for hot read paths."""
+
+import asyncio
+from typing import Any, Optional
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - optional dependency
+    asyncpg = None
+
+from config.config import settings
+
+
+class AsyncDatabasePool:
+    """
+    Lazily created asyncpg pool for raw, parameterized queries.
+
+    Only usable against PostgreSQL with asyncpg installed; callers should check
+    ``available`` and fall back to the SQLAlchemy session otherwise. asyncpg
+    caches prepared statements per connection, so repeated queries skip parsing.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, min_size: int = 10, max_size: int = 50):
+        """
+        Initialize the pool wrapper.
+
+        Args:
+            dsn: PostgreSQL connection string (defaults to settings.database_url)
+            min_size: Connections opened when the pool is created
+            max_size: Maximum number of pooled connections
+        """
+        self.dsn = dsn or settings.database_url
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def available(self) -> bool:
+        """Whether asyncpg is installed and the database is PostgreSQL."""
+        return asyncpg is not None and self.dsn.startswith(("postgresql://", "postgres://"))
+
+    async def _get_pool(self):
+        """Create the pool on first use."""
+        if self._pool is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn, min_size=self.min_size, max_size=self.max_size
+                    )
+        return self._pool
+
+    async def fetch(self, query: str, *args: Any) -> list:
+        """
+        Run a query and return all rows.
+
+        Args:
+            query: SQL with $1, $2, ... placeholders
+            *args: Query parameters
+
+        Returns:
+            List of asyncpg Records
+        """
+        pool = await self._get_pool()
+        return await pool.fetch(query, *args)
+
+    async def fetchrow(self, query: str, *args: Any):
+        """
+        Run a query and return the first row.
+
+        Args:
+            query: SQL with $1, $2, ... placeholders
+            *args: Query parameters
+
+        Returns:
+            asyncpg Record or None
+        """
+        pool = await self._get_pool()
+        return await pool.fetchrow(query, *args)
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+# Global instance
+async_pool = AsyncDatabasePool()
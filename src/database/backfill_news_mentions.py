@@ -0,0 +1,73 @@
+"""Backfill news asset mentions for articles ingested before they were tracked."""
+
+import os
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from config.config import settings
+from src.database.models import MarketData, NewsArticle, NewsAssetMention
+from src.utils.asset_matcher import article_text, build_asset_matcher
+
+
+def backfill_news_mentions(batch_size: int = 500) -> int:
+    """
+    Create NewsAssetMention rows for news articles that have none.
+
+    Articles are matched against every asset that has market data.
+
+    Args:
+        batch_size: Number of articles loaded and committed per batch
+
+    Returns:
+        Number of mentions created
+    """
+    engine = create_engine(settings.database_url)
+    NewsAssetMention.__table__.create(engine, checkfirst=True)
+    session = sessionmaker(bind=engine)()
+
+    created = 0
+    try:
+        assets = [a for (a,) in session.query(MarketData.asset).distinct()]
+        match_assets = build_asset_matcher(assets)
+        print(f"Matching news against {len(assets)} assets...")
+
+        last_id = 0
+        while True:
+            # Keyset pagination so each batch is an indexed range scan
+            articles = (
+                session.query(NewsArticle)
+                .filter(NewsArticle.id > last_id, ~NewsArticle.mentions.any())
+                .order_by(NewsArticle.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not articles:
+                break
+
+            for article in articles:
+                mentioned = sorted(match_assets(article_text(article.title, article.summary)))
+                article.mentioned_assets = mentioned
+                session.add_all(
+                    NewsAssetMention(
+                        news_id=article.id, asset=asset, published_at=article.published_at
+                    )
+                    for asset in mentioned
+                )
+                created += len(mentioned)
+
+            session.commit()
+            last_id = articles[-1].id
+    finally:
+        session.close()
+
+    print(f"✓ Created {created} news asset mentions")
+    return created
+
+
+if __name__ == "__main__":
+    backfill_news_mentions()
@@ -4,8 +4,6 @@ import enum
 from datetime import datetime
 
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Boolean,
-    Text, JSON, ForeignKey, Enum, Index
     JSON,
     Boolean,
     Column,
@@ -13,9 +11,11 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -27,6 +27,10 @@ class MarketData(Base):
     """Raw market data from exchanges."""
 
     __tablename__ = "market_data"
+    __table_args__ = (
+        # Covers the per-asset recent-data lookups (active assets, prefetch)
+        Index('idx_market_data_asset_timestamp', 'asset', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
@@ -55,6 +59,29 @@ class NewsArticle(Base):
     mentioned_assets = Column(JSON)  # List of assets mentioned
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Relationships
+    mentions = relationship(
+        "NewsAssetMention", back_populates="news_article", cascade="all, delete-orphan"
+    )
+
+
+class NewsAssetMention(Base):
+    """Asset mentioned in a news article, resolved once at ingest time."""
+
+    __tablename__ = "news_asset_mentions"
+    __table_args__ = (
+        # Per-asset lookup of recent news
+        Index('idx_news_asset_mention_asset_published', 'asset', 'published_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    news_id = Column(Integer, ForeignKey("news_articles.id"), nullable=False, index=True)
+    asset = Column(String(20), nullable=False)
+    published_at = Column(DateTime)  # Copied from the article for the composite index
+
+    # Relationships
+    news_article = relationship("NewsArticle", back_populates="mentions")
+
 
 class SentimentData(Base):
     """Social media sentiment data."""
@@ -88,6 +115,16 @@ class Insight(Base):
     """Analyzed insights from the AnalysisAgent."""
 
     __tablename__ = "insights"
+    __table_args__ = (
+        # Partial index for "fresh, confident, unpublished" candidate queries
+        Index(
+            'idx_insight_unpublished_timestamp_confidence',
+            'timestamp',
+            'confidence',
+            postgresql_where=text("is_published = false"),
+            sqlite_where=text("is_published = 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
@@ -162,7 +199,7 @@ class PublishedContent(Base):
     engagement_rate = Column(Float, index=True)
 
     # A/B Testing
-    ab_test_variant_id = Column(Integer, ForeignKey("ab_test_variants.id"))
+    ab_test_variant_id = Column(Integer, ForeignKey("ab_test_variants.id"), index=True)
 
     # Relationships
     content_plan = relationship("ContentPlan", back_populates="published_content")
@@ -201,6 +238,10 @@ class UserTier(enum.Enum):
     VIP = "vip"
 
 
+# Tiers that count as paying members
+PAID_TIERS = frozenset({UserTier.BASIC, UserTier.PREMIUM, UserTier.VIP})
+
+
 class CommunityUser(Base):
     """Track users across all platforms and their engagement."""
 
@@ -435,7 +476,7 @@ class ABTest(Base):
     platform = Column(String(50))  # twitter, telegram, etc.
 
     # Status
-    status = Column(Enum(TestStatus), default=TestStatus.ACTIVE)
+    status = Column(Enum(TestStatus), default=TestStatus.ACTIVE, index=True)
 
     # Results
     winning_variant_id = Column(Integer, ForeignKey("ab_test_variants.id"))
@@ -447,7 +488,7 @@ class ABTest(Base):
     completed_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # Relationships
+    # Relationships (one-to-many: eager-load with selectinload at query sites)
     variants = relationship(
         "ABTestVariant", back_populates="test", foreign_keys="ABTestVariant.test_id"
     )
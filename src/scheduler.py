@@ -1,6 +1,7 @@
 """Scheduler for running agents periodically."""
 
 import asyncio
+from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -18,18 +19,19 @@ class ContentCreatorScheduler:
     Manages periodic execution of the agent pipeline.
     """
 
-    def __init__(self, phase: int = 4):
+    def __init__(self, phase: int = 4, orchestrator: Optional[AgentOrchestrator] = None):
         """
         Initialize the scheduler.
 
         Args:
             phase: Which phase to run (1, 2, 3, or 4). Each phase includes all previous phases + new agents.
+            orchestrator: Existing orchestrator to share (a new one is created if omitted)
         """
         setup_logger()
         logger.info(f"Initializing Content Creator Scheduler (Phase {phase})...")
 
         self.scheduler = AsyncIOScheduler()
-        self.orchestrator = AgentOrchestrator()
+        self.orchestrator = orchestrator or AgentOrchestrator()
         self.phase = phase
 
         self._setup_jobs()
@@ -0,0 +1,14 @@
+"""Optional Numba JIT decorator with a pure-Python fallback."""
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable bare or with options."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+__all__ = ["njit"]
@@ -0,0 +1,57 @@
+"""API key hashing shared by the API server and key management scripts."""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from src.database.models import APIKey
+
+
+def hash_api_key(raw_key: str) -> str:
+    """
+    Hash an API key for storage and lookup.
+
+    API keys are random high-entropy tokens, not passwords, so a single
+    BLAKE2b pass is enough. A 32-byte digest keeps the 64-char hex width
+    used by the original SHA-256 hashes.
+
+    Args:
+        raw_key: The plaintext API key
+
+    Returns:
+        Hex digest to store in / match against APIKey.key_hash
+    """
+    return hashlib.blake2b(raw_key.encode(), digest_size=32).hexdigest()
+
+
+def legacy_hash_api_key(raw_key: str) -> str:
+    """Hash an API key the way keys issued before BLAKE2b were stored (SHA-256)."""
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+def find_api_key(db: Session, raw_key: str) -> Optional[APIKey]:
+    """
+    Look up the stored record of an API key.
+
+    Keys issued before the switch to BLAKE2b are stored as SHA-256 digests.
+    A key found by its legacy digest is rehashed in place, so every key in
+    use migrates on its next request. Once no legacy digests remain, the
+    legacy lookup and legacy_hash_api_key can be removed.
+
+    Args:
+        db: Database session (the caller commits)
+        raw_key: The plaintext API key
+
+    Returns:
+        The matching APIKey, or None if the key is unknown
+    """
+    key_hash = hash_api_key(raw_key)
+    key_record = (
+        db.query(APIKey)
+        .filter(APIKey.key_hash.in_((key_hash, legacy_hash_api_key(raw_key))))
+        .first()
+    )
+    if key_record is not None and key_record.key_hash != key_hash:
+        key_record.key_hash = key_hash
+    return key_record
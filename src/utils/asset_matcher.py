@@ -0,0 +1,56 @@
+"""Find the asset symbols mentioned in a piece of text."""
+
+from collections import defaultdict
+from collections.abc import Callable
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+
+def build_asset_matcher(assets: list[str]) -> Callable[[str], set[str]]:
+    """
+    Build a function returning the assets mentioned in a lowercased text.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, so each
+    text is scanned once regardless of the number of assets.
+
+    Args:
+        assets: Asset symbols to look for
+
+    Returns:
+        Function mapping lowercased text to the set of matching assets
+    """
+    by_symbol = defaultdict(list)
+    for asset in assets:
+        by_symbol[asset.lower()].append(asset)
+
+    if not by_symbol:
+        return lambda text: set()
+
+    if ahocorasick is None:
+        return lambda text: {
+            asset for symbol, names in by_symbol.items() if symbol in text for asset in names
+        }
+
+    automaton = ahocorasick.Automaton()
+    for symbol, names in by_symbol.items():
+        automaton.add_word(symbol, names)
+    automaton.make_automaton()
+
+    return lambda text: {asset for _, names in automaton.iter(text) for asset in names}
+
+
+def article_text(title: str, summary: str) -> str:
+    """
+    Build the lowercased text of a news article that asset matching runs on.
+
+    Args:
+        title: Article title
+        summary: Article summary
+
+    Returns:
+        Lowercased title and summary
+    """
+    return f"{title or ''} {summary or ''}".lower()
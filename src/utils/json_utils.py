@@ -0,0 +1,90 @@
+"""
+Fast JSON serialization helpers.
+
+Uses orjson when it is installed (see requirements.txt) and falls back to
+the standard library json module on minimal/Termux installs.
+"""
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Values JSON cannot represent natively are converted with str(), matching
+    the ``default=str`` convention used elsewhere in the codebase.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with a 2-space indent
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+
+    return json.dumps(obj, indent=2 if indent else None, default=str, ensure_ascii=False).encode()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Deserialize a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+async def read_first_object(chunks: AsyncIterator[str]) -> str:
+    """
+    Read streamed text until its first top-level JSON object is complete.
+
+    Braces are tracked incrementally (ignoring those inside strings), and the
+    stream is closed as soon as the object's closing brace arrives, so any
+    trailing text is never generated or downloaded.
+
+    Args:
+        chunks: Async iterator of text chunks (e.g. an LLM response stream)
+
+    Returns:
+        Text received up to and including the closing brace, or the whole
+        text if it never contains a complete object
+    """
+    parts: list[str] = []
+    depth = 0
+    in_string = escaped = False
+    try:
+        async for chunk in chunks:
+            for i, char in enumerate(chunk):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == "\\":
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"' and depth:
+                    in_string = True
+                elif char == "{":
+                    depth += 1
+                elif char == "}" and depth:
+                    depth -= 1
+                    if not depth:
+                        parts.append(chunk[: i + 1])
+                        return "".join(parts)
+            parts.append(chunk)
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return "".join(parts)
@@ -0,0 +1,109 @@
+"""Micro-batching of concurrent LLM requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+
+class LLMBatcher:
+    """
+    Collect LLM prompts submitted by concurrent coroutines and dispatch them together.
+
+    Prompts are flushed when ``max_batch`` are pending or ``max_wait`` seconds after
+    the first one arrived. Each flush runs its prompts concurrently, or as a single
+    request when ``generate_many`` is given, and at most ``max_inflight`` batches
+    are in flight at once.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[..., Awaitable[str]],
+        max_batch: int = 8,
+        max_wait: float = 0.05,
+        max_inflight: int = 4,
+        generate_many: Optional[Callable[[list[str]], Awaitable[list[Any]]]] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            generate: Coroutine function that sends a single prompt
+            max_batch: Number of pending prompts that triggers an immediate flush
+            max_wait: Seconds to wait for more prompts before flushing
+            max_inflight: Maximum number of batches dispatched concurrently
+            generate_many: Coroutine function answering several prompts with one
+                request, returning one result per prompt in order (used for batches
+                of two or more; extra keyword arguments are not passed)
+        """
+        self._generate = generate
+        self._generate_many = generate_many
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_inflight = max_inflight
+
+        self._pending: list[tuple[str, dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, prompt: str, **kwargs: Any) -> str:
+        """
+        Queue a prompt and wait for its response.
+
+        Args:
+            prompt: The prompt to send
+            **kwargs: Extra arguments passed to the generate function
+
+        Returns:
+            Generated text
+        """
+        loop = asyncio.get_running_loop()
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+
+        future = loop.create_future()
+        self._pending.append((prompt, kwargs, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch all pending prompts as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[str, dict[str, Any], asyncio.Future]]) -> None:
+        """Run one batch and resolve each caller's future with its own result."""
+        async with self._inflight:
+            if self._generate_many is not None and len(batch) > 1:
+                try:
+                    results = await self._generate_many([prompt for prompt, _, _ in batch])
+                except Exception as e:
+                    results = [e] * len(batch)
+            else:
+                results = await asyncio.gather(
+                    *(self._generate(prompt, **kwargs) for prompt, kwargs, _ in batch),
+                    return_exceptions=True,
+                )
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
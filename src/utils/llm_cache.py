@@ -0,0 +1,80 @@
+"""In-process cache for deterministic LLM completions."""
+
+import hashlib
+import json
+import time
+from typing import Optional
+
+
+class LLMCache:
+    """
+    TTL cache for LLM responses keyed by a SHA-256 of the request.
+
+    Only use it for analytical prompts whose output is fully determined by
+    the prompt; creative prompts should bypass it.
+    """
+
+    def __init__(self, default_ttl: float = 7 * 86400, max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            default_ttl: Time-to-live of an entry in seconds
+            max_entries: Maximum entries kept before the oldest are evicted
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fn: str, model: str, prompt: str) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            fn: Name of the calling function
+            model: Model identifier
+            prompt: Full prompt text
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps({"fn": fn, "model": model, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached value for a key, or None if missing or expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached text or None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Text to cache
+            ttl: Time-to-live in seconds (defaults to default_ttl)
+        """
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Dicts keep insertion order, so the first key is the oldest
+            self._entries.pop(next(iter(self._entries)))
+
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
@@ -1,6 +1,8 @@
 """LLM Client with automatic failover support."""
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Iterator
+import asyncio
+import threading
 import time
 import json
 import uuid
@@ -41,6 +43,13 @@ class LLMClientWithFailover:
         self.active_gemini_key = "primary"
         self.last_failover_time = 0
         self.failover_cooldown = 60  # Wait 60s before trying primary again
+
+        # Gemini models bound to a system instruction, keyed by (api key, system_id)
+        self._gemini_models: Dict[tuple, Any] = {}
+
+        # generate() runs SDK calls in worker threads; key rotation (global
+        # genai.configure plus active_gemini_key) and the model cache are shared
+        self._gemini_lock = threading.Lock()
         
         self._initialize_clients()
     
@@ -71,13 +80,16 @@ class LLMClientWithFailover:
             except Exception as e:
                 logger.warning(f"Failed to setup Gemini backup: {e}")
     
-    def generate_with_claude(self, prompt: str, max_tokens: int = 1000, **kwargs) -> str:
+    def generate_with_claude(
+        self, prompt: str, max_tokens: int = 1000, system: Optional[str] = None, **kwargs
+    ) -> str:
         """
         Generate content using Claude.
         
         Args:
             prompt: The prompt to send
             max_tokens: Maximum tokens to generate
+            system: Static system prompt, sent as a prompt-cached prefix
             **kwargs: Additional arguments for the API
             
         Returns:
@@ -86,6 +98,11 @@ class LLMClientWithFailover:
         if not self.anthropic_client:
             raise ValueError("Anthropic client not initialized. Check ANTHROPIC_API_KEY in .env")
         
+        if system:
+            kwargs["system"] = [
+                {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+            ]
+
         try:
             message = self.anthropic_client.messages.create(
                 model="claude-3-5-sonnet-20241022",
@@ -98,31 +115,60 @@ class LLMClientWithFailover:
             logger.error(f"Claude API error: {e}")
             raise
     
-    def generate_with_gemini(self, prompt: str, **kwargs) -> str:
+    def _gemini_model(self, api_key: str, system: Optional[str], system_id: Optional[str]):
+        """Return a Gemini model for a system instruction, reusing it across calls."""
+        key = (api_key, system_id or system)
+        with self._gemini_lock:
+            model = self._gemini_models.get(key)
+            if model is None:
+                model = genai.GenerativeModel('gemini-2.5-flash', system_instruction=system)
+                self._gemini_models[key] = model
+        return model
+
+    def generate_with_gemini(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        system_id: Optional[str] = None,
+        **kwargs
+    ) -> str:
         """
         Generate content using Gemini with automatic failover.
         
         Args:
             prompt: The prompt to send
+            system: Static system instruction shared by many calls
+            system_id: Stable identifier of ``system`` (defaults to the text itself)
             **kwargs: Additional arguments for the API
             
         Returns:
             Generated text
         """
         # Try primary key first (unless we recently failed over)
-        if self.active_gemini_key == "backup":
-            # Check if cooldown period has passed
-            if time.time() - self.last_failover_time > self.failover_cooldown:
+        with self._gemini_lock:
+            if (
+                self.active_gemini_key == "backup"
+                and time.time() - self.last_failover_time > self.failover_cooldown
+            ):
+                if settings.google_api_key:
+                    genai.configure(api_key=settings.google_api_key)
                 self.active_gemini_key = "primary"
                 logger.info("Cooldown expired, switching back to primary Gemini key")
-        
+            active_key = self.active_gemini_key
+
+        if active_key == "backup":
+            return self._use_gemini_backup(prompt, system=system, system_id=system_id, **kwargs)
+
         try:
-            if self.active_gemini_key == "primary":
-                if not self.gemini_client:
-                    raise ValueError("Gemini primary client not initialized")
-                
-                response = self.gemini_client.generate_content(prompt, **kwargs)
-                return response.text
+            if not self.gemini_client:
+                raise ValueError("Gemini primary client not initialized")
+
+            model = (
+                self._gemini_model("primary", system, system_id) if system
+                else self.gemini_client
+            )
+            response = model.generate_content(prompt, **kwargs)
+            return response.text
                 
         except Exception as e:
             error_str = str(e).lower()
@@ -134,14 +180,16 @@ class LLMClientWithFailover:
                 # Try backup key
                 if settings.google_api_key_backup:
                     logger.info("Switching to Gemini backup key...")
-                    return self._use_gemini_backup(prompt, **kwargs)
+                    return self._use_gemini_backup(
+                        prompt, system=system, system_id=system_id, **kwargs
+                    )
                 else:
                     raise ValueError("Gemini rate limit hit and no backup key available")
 
             # Check if it's an invalid key error (common in dev/test environments)
             elif "api key not valid" in error_str or "invalid argument" in error_str:
                 logger.warning(f"Gemini API key invalid. Switching to MOCK mode for demonstration.")
-                return self._generate_mock_response(prompt)
+                return self._generate_mock_response(f"{system}\n\n{prompt}" if system else prompt)
 
             else:
                 # Non-rate-limit error, re-raise
@@ -223,30 +271,36 @@ class LLMClientWithFailover:
         # Default text response
         return "This is a mock response generated by the LLMClient because the API key was invalid. The agent logic is working correctly, but the content is simulated."
     
-    def _use_gemini_backup(self, prompt: str, **kwargs) -> str:
+    def _use_gemini_backup(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        system_id: Optional[str] = None,
+        **kwargs
+    ) -> str:
         """Use the backup Gemini key."""
+        # Reconfigure with backup key; concurrent rate-limit failures switch only once
+        with self._gemini_lock:
+            if self.active_gemini_key != "backup":
+                genai.configure(api_key=settings.google_api_key_backup)
+                self.active_gemini_key = "backup"
+                self.last_failover_time = time.time()
+                logger.info("Switched to Gemini backup key")
+
         try:
-            # Reconfigure with backup key
-            genai.configure(api_key=settings.google_api_key_backup)
-            backup_model = genai.GenerativeModel('gemini-2.5-flash')
-            
+            backup_model = self._gemini_model("backup", system, system_id)
             response = backup_model.generate_content(prompt, **kwargs)
-            
-            # Mark that we're using backup
-            self.active_gemini_key = "backup"
-            self.last_failover_time = time.time()
-            
-            logger.success("Successfully switched to Gemini backup key")
             return response.text
-            
+
         except Exception as e:
             logger.error(f"Gemini backup key also failed: {e}")
-            
+
             # Try to switch back to primary configuration
-            if settings.google_api_key:
-                genai.configure(api_key=settings.google_api_key)
-                self.active_gemini_key = "primary"
-            
+            with self._gemini_lock:
+                if settings.google_api_key and self.active_gemini_key == "backup":
+                    genai.configure(api_key=settings.google_api_key)
+                    self.active_gemini_key = "primary"
+
             raise
     
     async def generate(
@@ -254,27 +308,119 @@ class LLMClientWithFailover:
         prompt: str, 
         model: str = "gemini", 
         max_tokens: int = 1000,
+        system: Optional[str] = None,
+        system_id: Optional[str] = None,
         **kwargs
     ) -> str:
         """
         Generate content using specified model with fallback.
         
+        Passing a static ``system`` prompt separately from the per-call
+        ``prompt`` lets providers reuse their cached prefix (Anthropic
+        ``cache_control``, Gemini implicit caching) instead of re-processing
+        the same text on every request.
+        
         Args:
             prompt: The prompt to send
             model: Model to use ("claude", "gemini")
             max_tokens: Maximum tokens to generate
+            system: Static system prompt shared across calls
+            system_id: Stable identifier of ``system`` (e.g. its hash)
             **kwargs: Additional arguments
             
         Returns:
             Generated text
         """
+        # The SDK calls block, so run them in a worker thread to keep the event loop free
         if model == "claude" or model == "anthropic":
-            return self.generate_with_claude(prompt, max_tokens, **kwargs)
+            return await asyncio.to_thread(
+                self.generate_with_claude, prompt, max_tokens, system=system, **kwargs
+            )
         elif model == "gemini" or model == "google":
-            return self.generate_with_gemini(prompt, **kwargs)
+            return await asyncio.to_thread(
+                self.generate_with_gemini, prompt, system=system, system_id=system_id, **kwargs
+            )
         else:
             raise ValueError(f"Unknown model: {model}")
     
+    async def _iterate_in_thread(self, chunks: Iterator[str]) -> AsyncIterator[str]:
+        """Yield items of a blocking iterator without blocking the event loop."""
+        sentinel = object()
+        while (chunk := await asyncio.to_thread(next, chunks, sentinel)) is not sentinel:
+            yield chunk
+
+    async def stream(
+        self,
+        prompt: str,
+        model: str = "gemini",
+        max_tokens: int = 1000,
+        system: Optional[str] = None,
+        system_id: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Generate content as a stream of text chunks.
+        
+        Closing the iterator early (e.g. once the needed part of the answer has
+        arrived) ends the request instead of waiting for the full generation.
+        Gemini errors before the first chunk fall back to ``generate``, which
+        handles key failover and mock responses.
+        
+        Args:
+            prompt: The prompt to send
+            model: Model to use ("claude", "gemini")
+            max_tokens: Maximum tokens to generate
+            system: Static system prompt shared across calls
+            system_id: Stable identifier of ``system`` (e.g. its hash)
+            **kwargs: Additional arguments
+            
+        Yields:
+            Generated text chunks
+        """
+        if model == "claude" or model == "anthropic":
+            if not self.anthropic_client:
+                raise ValueError("Anthropic client not initialized. Check ANTHROPIC_API_KEY in .env")
+            if system:
+                kwargs["system"] = [
+                    {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+                ]
+            manager = self.anthropic_client.messages.stream(
+                model="claude-3-5-sonnet-20241022",
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
+                **kwargs
+            )
+            # Entering the stream sends the request and waits for the response
+            # headers, so do it (and the close) in a worker thread as well
+            response = await asyncio.to_thread(manager.__enter__)
+            try:
+                async for chunk in self._iterate_in_thread(iter(response.text_stream)):
+                    yield chunk
+            finally:
+                await asyncio.to_thread(manager.__exit__, None, None, None)
+        elif model == "gemini" or model == "google":
+            try:
+                if self.active_gemini_key != "primary" or not self.gemini_client:
+                    raise ValueError("Gemini primary client not active")
+                gemini = self._gemini_model("primary", system, system_id) if system else self.gemini_client
+                response = await asyncio.to_thread(
+                    gemini.generate_content, prompt, stream=True, **kwargs
+                )
+                chunks = iter(response)
+                first = await asyncio.to_thread(next, chunks, None)
+            except Exception as e:
+                logger.warning(f"Gemini streaming unavailable ({e}), generating without streaming")
+                yield await self.generate(
+                    prompt, model=model, max_tokens=max_tokens, system=system, system_id=system_id, **kwargs
+                )
+                return
+            if first is not None:
+                yield first.text
+            async for chunk in self._iterate_in_thread(chunks):
+                yield chunk.text
+        else:
+            raise ValueError(f"Unknown model: {model}")
+
     def get_active_gemini_key(self) -> str:
         """Get which Gemini key is currently active."""
         return self.active_gemini_key
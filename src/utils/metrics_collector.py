@@ -3,6 +3,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+import numpy as np
 from loguru import logger
 
 from config.config import settings
@@ -176,61 +177,58 @@ class MetricsCollector:
         cutoff = datetime.now(tz=timezone.utc) - timedelta(days=days)
 
         with get_db() as db:
-            content_list = (
-                db.query(PublishedContent).filter(PublishedContent.published_at >= cutoff).all()
+            # Load only the metric columns instead of full PublishedContent objects
+            rows = (
+                db.query(
+                    PublishedContent.id,
+                    PublishedContent.platform,
+                    PublishedContent.views,
+                    PublishedContent.likes,
+                    PublishedContent.comments,
+                    PublishedContent.shares,
+                    PublishedContent.engagement_rate,
+                )
+                .filter(PublishedContent.published_at >= cutoff)
+                .order_by(PublishedContent.id)
+                .all()
             )
 
-            if not content_list:
+            if not rows:
                 return {"message": "No content found for this period"}
 
-            # Calculate aggregated metrics
-            total_content = len(content_list)
-            total_views = sum(c.views or 0 for c in content_list)
-            total_likes = sum(c.likes or 0 for c in content_list)
-            total_comments = sum(c.comments or 0 for c in content_list)
-            total_shares = sum(c.shares or 0 for c in content_list)
-
-            avg_engagement_rate = (
-                sum(c.engagement_rate or 0 for c in content_list) / total_content
-                if total_content > 0
-                else 0
+            ids, platforms, *columns = zip(*rows)
+            # Missing counters and rates count as zero
+            views, likes, comments, shares, rates = (
+                np.nan_to_num(np.array(col, dtype=np.float64)) for col in columns
             )
+            platforms = np.array(platforms, dtype=object)
+            engagement = likes + comments + shares
+
+            # Calculate aggregated metrics
+            total_content = len(rows)
+            avg_engagement_rate = float(rates.mean())
 
             # Find best performing content
-            best_content = max(content_list, key=lambda c: c.engagement_rate or 0)
+            best_idx = int(np.argmax(rates))
+            best_content = db.get(PublishedContent, ids[best_idx])
 
             # Performance by platform
             platform_stats = {}
-            for content in content_list:
-                platform = content.platform
-                if platform not in platform_stats:
-                    platform_stats[platform] = {
-                        "count": 0,
-                        "total_engagement": 0,
-                        "avg_engagement_rate": 0,
-                    }
-
-                platform_stats[platform]["count"] += 1
-                platform_stats[platform]["total_engagement"] += (
-                    (content.likes or 0) + (content.comments or 0) + (content.shares or 0)
-                )
-
-            # Calculate platform averages
-            for platform in platform_stats:
-                count = platform_stats[platform]["count"]
-                if count > 0:
-                    platform_content = [c for c in content_list if c.platform == platform]
-                    platform_stats[platform]["avg_engagement_rate"] = (
-                        sum(c.engagement_rate or 0 for c in platform_content) / count
-                    )
+            for platform in dict.fromkeys(platforms):
+                mask = platforms == platform
+                platform_stats[platform] = {
+                    "count": int(mask.sum()),
+                    "total_engagement": int(engagement[mask].sum()),
+                    "avg_engagement_rate": float(rates[mask].mean()),
+                }
 
             return {
                 "period_days": days,
                 "total_content": total_content,
-                "total_views": total_views,
-                "total_likes": total_likes,
-                "total_comments": total_comments,
-                "total_shares": total_shares,
+                "total_views": int(views.sum()),
+                "total_likes": int(likes.sum()),
+                "total_comments": int(comments.sum()),
+                "total_shares": int(shares.sum()),
                 "avg_engagement_rate": avg_engagement_rate,
                 "best_performing": {
                     "id": best_content.id,
@@ -0,0 +1,124 @@
+"""Deterministic moderation rules that settle clear-cut violations without an LLM."""
+
+import re
+from pathlib import Path
+from typing import Optional
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - optional dependency
+    re2 = None
+
+DEFAULT_BLACKLIST_PATH = Path(__file__).resolve().parents[2] / "config" / "moderation_blacklist.txt"
+
+# (tag, pattern) signatures of phishing links and scams; inline flags only, so
+# the patterns compile identically with re2 and re
+SIGNATURES = [
+    ("ip_url", r"(?i)\bhttps?://\d{1,3}(?:\.\d{1,3}){3}\b"),
+    ("punycode_url", r"(?i)\bhttps?://[^\s/]*xn--"),
+    ("wallet_drainer", r"(?i)\b(?:validate|verify|sync|rectify)\s+your\s+wallet\b"),
+    (
+        "giveaway_scam",
+        r"(?i)\bsend\s+\d+(?:\.\d+)?\s*(?:btc|eth|sol|bnb|usdt)\b[^\n]{0,60}"
+        r"\b(?:get|receive)\b[^\n]{0,30}\b(?:back|double|2x)\b",
+    ),
+]
+
+
+def load_blacklist(path: Path = DEFAULT_BLACKLIST_PATH) -> list[str]:
+    """
+    Read blacklisted terms, one per line; blank lines and ``#`` comments are ignored.
+
+    Args:
+        path: Blacklist file
+
+    Returns:
+        Lowercased terms (empty if the file does not exist)
+    """
+    if not path.exists():
+        return []
+
+    terms = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        term = line.split("#", 1)[0].strip().lower()
+        if term:
+            terms.append(term)
+    return terms
+
+
+class ModerationRules:
+    """
+    Match messages against a term blacklist and regex signatures.
+
+    Blacklisted terms are found in one pass over the message with an
+    Aho-Corasick automaton when pyahocorasick is installed, and only count
+    when they are not part of a longer word. Signatures use re2 (linear time,
+    no backtracking) when installed.
+    """
+
+    def __init__(self, terms: Optional[list[str]] = None):
+        """
+        Initialize the rules.
+
+        Args:
+            terms: Blacklisted terms (defaults to the configured blacklist file)
+        """
+        terms = load_blacklist() if terms is None else [t.lower() for t in terms]
+        self._terms = sorted(set(terms))
+
+        engine = re2 or re
+        self._signatures = [(tag, engine.compile(pattern)) for tag, pattern in SIGNATURES]
+
+        self._automaton = None
+        self._term_pattern = None
+        if self._terms and ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for term in self._terms:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        elif self._terms:
+            self._term_pattern = re.compile(
+                r"(?<!\w)(?:" + "|".join(map(re.escape, self._terms)) + r")(?!\w)"
+            )
+
+    def _blacklisted_term(self, text: str) -> Optional[str]:
+        """Return the first blacklisted term standing as a whole word in a lowercased text."""
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(text):
+                start = end - len(term) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if not (before.isalnum() or before == "_" or after.isalnum() or after == "_"):
+                    return term
+            return None
+
+        if self._term_pattern is not None:
+            match = self._term_pattern.search(text)
+            return match.group(0) if match else None
+
+        return None
+
+    def match(self, content: str) -> Optional[str]:
+        """
+        Find the first rule a message violates.
+
+        Args:
+            content: Message text
+
+        Returns:
+            Rule tag (``blacklist:<term>`` or a signature tag), or None
+        """
+        term = self._blacklisted_term(content.lower())
+        if term is not None:
+            return f"blacklist:{term}"
+
+        for tag, pattern in self._signatures:
+            if pattern.search(content):
+                return tag
+
+        return None
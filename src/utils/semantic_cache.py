@@ -0,0 +1,163 @@
+"""Similarity-based cache for LLM results on short texts."""
+
+import hashlib
+import re
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Cache LLM results for texts and serve them for exact or near-duplicate texts.
+
+    Lookups always try an exact match on the normalized text (case, whitespace
+    and repeated punctuation ignored). When a sentence-embedding function is
+    passed as ``embed``, misses then compare the text's embedding against all
+    cached embeddings with a single matrix-vector product and return the best
+    match above ``threshold`` (cosine similarity).
+
+    Without ``embed`` there is no near-duplicate tier: surface-similarity
+    vectors such as character n-grams score "do not send your seed phrase"
+    and "send your seed phrase" as near-identical, so they must not decide
+    which verdict a message gets.
+
+    Embeddings of recently seen texts are memoized by a digest of the
+    normalized text, so floods of identical messages are embedded once.
+    """
+
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+        threshold: float = 0.92,
+        max_entries: int = 4096,
+        dim: int = 512,
+        embedding_memo_size: int = 4096,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embed: Sentence-embedding function mapping a text to a 1-D vector of
+                length ``dim``; enables near-duplicate hits (exact matches only if omitted)
+            threshold: Minimum cosine similarity for a near-duplicate hit
+            max_entries: Maximum entries kept before the oldest are evicted
+            dim: Embedding dimension
+            embedding_memo_size: Number of recent text embeddings kept for reuse
+        """
+        self._embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+
+        self._embeddings = (
+            np.zeros((max_entries, dim), dtype=np.float32) if embed is not None else None
+        )
+        self._values: list[Any] = [None] * max_entries
+        self._slot_keys: list[Optional[str]] = [None] * max_entries
+        self._slots: dict[str, int] = {}
+        self._next_slot = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.embedding_memo_size = embedding_memo_size
+        self._embedding_memo: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase, collapse whitespace and squeeze repeated punctuation ("!!!" -> "!")."""
+        text = re.sub(r"\s+", " ", text.strip().lower())
+        return re.sub(r"([^\w\s])\1+", r"\1", text)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        """Exact-match key of a normalized text."""
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Compute the L2-normalized embedding of a text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 vector of length ``dim``
+
+        Raises:
+            ValueError: If the cache was created without an ``embed`` function
+        """
+        if self._embed is None:
+            raise ValueError("SemanticCache has no embedding function")
+
+        normalized = self._normalize(text)
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+        vector = self._embedding_memo.get(digest)
+        if vector is not None:
+            self._embedding_memo.move_to_end(digest)
+            return vector
+
+        vector = np.asarray(self._embed(normalized), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        # Shared between callers, so make sure nobody modifies it in place
+        vector.setflags(write=False)
+
+        self._embedding_memo[digest] = vector
+        if len(self._embedding_memo) > self.embedding_memo_size:
+            self._embedding_memo.popitem(last=False)
+        return vector
+
+    def get(self, text: str, embedding: Optional[np.ndarray] = None) -> Optional[Any]:
+        """
+        Return the cached value for a text or a near-duplicate of it.
+
+        Args:
+            text: Text to look up
+            embedding: Precomputed embedding of the text (see embed)
+
+        Returns:
+            Cached value or None
+        """
+        slot = self._slots.get(self._key(self._normalize(text)))
+        if slot is None and self._slots and self._embeddings is not None:
+            query = self.embed(text) if embedding is None else embedding
+            similarities = self._embeddings @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold and self._slot_keys[best] is not None:
+                slot = best
+
+        if slot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._values[slot]
+
+    def put(self, text: str, value: Any, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Store a value for a text.
+
+        Args:
+            text: Text the value was computed for
+            value: Value to cache
+            embedding: Precomputed embedding of the text (see embed)
+        """
+        key = self._key(self._normalize(text))
+        slot = self._slots.get(key)
+        if slot is None:
+            # Slots are reused in insertion order, evicting the oldest entry
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.max_entries
+            evicted = self._slot_keys[slot]
+            if evicted is not None:
+                del self._slots[evicted]
+            self._slots[key] = slot
+            self._slot_keys[slot] = key
+
+        if self._embeddings is not None:
+            self._embeddings[slot] = self.embed(text) if embedding is None else embedding
+        self._values[slot] = value
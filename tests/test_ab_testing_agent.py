@@ -0,0 +1,150 @@
+"""Unit tests for the ABTestingAgent."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.agents.ab_testing_agent import ABTestingAgent
+
+
+class TestABTestingAgent:
+    """Test A/B testing statistics, metrics and variable selection."""
+
+    def test_calculate_statistical_significance_is_continuous(self):
+        """Test confidence follows the two-sided normal CDF instead of fixed steps."""
+        import math
+
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
+            agent = ABTestingAgent()
+
+            # 100/1000 vs 130/1000 gives z ~= 2.10
+            confidence = agent._calculate_statistical_significance(
+                control_successes=100, control_total=1000, variant_successes=130, variant_total=1000
+            )
+            p_pool = 230 / 2000
+            z = 0.03 / math.sqrt(p_pool * (1 - p_pool) * (2 / 1000))
+            assert confidence == pytest.approx(math.erf(z / math.sqrt(2)))
+            assert 0.95 < confidence < 0.99
+
+    def test_update_variant_metrics_bulk(self):
+        """Test variant metrics are aggregated per variant in one query."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from src.database.models import (
+            ABTest,
+            ABTestVariant,
+            Base,
+            ContentFormat,
+            ContentPlan,
+            Insight,
+            InsightType,
+            PublishedContent,
+        )
+
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        insight = Insight(type=InsightType.BREAKOUT, asset="BTC", confidence=0.9, details={})
+        db.add(insight)
+        db.flush()
+        plan = ContentPlan(
+            insight_id=insight.id, platform="twitter", format=ContentFormat.SINGLE_TWEET
+        )
+        test = ABTest(test_name="test", variable_being_tested="headline")
+        db.add_all([plan, test])
+        db.flush()
+        control = ABTestVariant(test_id=test.id, variant_name="control", variant_config={})
+        variant = ABTestVariant(test_id=test.id, variant_name="variant_a", variant_config={})
+        db.add_all([control, variant])
+        db.flush()
+        for likes in (4, 6):
+            db.add(
+                PublishedContent(
+                    content_plan_id=plan.id,
+                    platform="twitter",
+                    content_text="post",
+                    views=100,
+                    likes=likes,
+                    comments=None,
+                    shares=0,
+                    ab_test_variant_id=control.id,
+                )
+            )
+        db.commit()
+
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
+            agent = ABTestingAgent()
+            agent._update_variant_metrics_bulk([test.id], db)
+
+        db.refresh(control)
+        db.refresh(variant)
+        assert control.sample_size == 2
+        assert control.impressions == 200
+        assert control.engagement_count == 10
+        assert control.engagement_rate == pytest.approx(0.05)
+        # Variants without published content are left untouched
+        assert variant.sample_size == 0
+        db.close()
+
+    def test_pick_variable_prefers_variables_with_past_wins(self):
+        """Test Thompson sampling favours variables that produced big improvements."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from src.database.models import ABTest, Base
+
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
+            agent = ABTestingAgent()
+
+            # No history falls back to a uniform choice
+            assert agent._variable_history(db) == {}
+            assert agent._pick_variable({}) in agent.testable_variables
+
+            for i in range(30):
+                db.add(
+                    ABTest(
+                        test_name=f"headline_{i}",
+                        variable_being_tested="headline",
+                        winning_variant_id=i + 1,
+                        improvement_percentage=20.0,
+                    )
+                )
+                db.add(
+                    ABTest(
+                        test_name=f"emoji_{i}",
+                        variable_being_tested="emoji_usage",
+                        winning_variant_id=i + 1,
+                        improvement_percentage=1.0,
+                    )
+                )
+            db.commit()
+
+            history = agent._variable_history(db)
+            assert history == {"headline": (30, 0), "emoji_usage": (0, 30)}
+            picks = [agent._pick_variable(history) for _ in range(50)]
+            assert max(set(picks), key=picks.count) == "headline"
+            assert "emoji_usage" not in picks
+        db.close()
+
+    @pytest.mark.asyncio()
+    async def test_llm_completions_are_cached(self):
+        """Test repeated prompts are served from the LLM cache unless bypassed."""
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic") as mock_anthropic:
+            create = AsyncMock(return_value=Mock(content=[Mock(text=" insight ")]))
+            mock_anthropic.return_value.messages.create = create
+            agent = ABTestingAgent()
+
+            assert await agent._complete("insight", "system", "prompt", max_tokens=200) == "insight"
+            assert await agent._complete("insight", "system", "prompt", max_tokens=200) == "insight"
+            assert create.call_count == 1
+            assert agent.llm_cache.hits == 1
+
+            await agent._complete("variants", "system", "prompt", max_tokens=500, use_cache=False)
+            await agent._complete("variants", "system", "prompt", max_tokens=500, use_cache=False)
+            assert create.call_count == 3
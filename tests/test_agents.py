@@ -50,7 +50,7 @@ class TestABTestingAgent:
 
     def test_ab_testing_agent_initialization(self):
         """Test A/B testing agent initializes with correct settings."""
-        with patch("src.agents.ab_testing_agent.Anthropic"):
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
             agent = ABTestingAgent()
             assert agent.min_sample_size == 100
             assert agent.confidence_threshold == 0.95
@@ -59,7 +59,7 @@ class TestABTestingAgent:
 
     def test_calculate_statistical_significance(self):
         """Test statistical significance calculation."""
-        with patch("src.agents.ab_testing_agent.Anthropic"):
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
             agent = ABTestingAgent()
 
             # Test with clear winner (high significance)
@@ -76,7 +76,7 @@ class TestABTestingAgent:
 
     def test_calculate_statistical_significance_edge_cases(self):
         """Test edge cases in statistical calculation."""
-        with patch("src.agents.ab_testing_agent.Anthropic"):
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
             agent = ABTestingAgent()
 
             # Zero total should return 0
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime, timedelta
@@ -11,8 +12,9 @@ except ImportError:
 
 # We still need these for type hinting if pandas is available
 if not pandas_not_installed:
-    from src.agents.analysis_agent import AnalysisAgent, Insight, InsightType
-    from src.database.models import Base, MarketData, NewsArticle, SentimentData
+    import numpy as np
+    from src.agents.analysis_agent import AnalysisAgent, Insight, InsightType, MARKET_DTYPE
+    from src.database.models import Base, MarketData, NewsArticle, NewsAssetMention, SentimentData
 
 skip_if_no_pandas = pytest.mark.skipif(pandas_not_installed, reason="pandas is not installed")
 
@@ -28,9 +30,15 @@ def mock_db_session():
     """Fixture for an in-memory SQLite database session."""
     from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
     from src.database.models import Base # This is safe to import
 
-    engine = create_engine("sqlite:///:memory:")
+    # One shared connection so queries run via asyncio.to_thread see the same database
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Base.metadata.create_all(engine)
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = TestingSessionLocal()
@@ -59,10 +67,11 @@ def mock_db_session():
                     timestamp=base_time - timedelta(hours=20-i)
                 ))
 
-            # Add enough NewsArticle for news impact analysis (needs >= 3 articles)
-            db.add(NewsArticle(title="Big news for BTC 1", url="http://test.com/1", summary="Positive summary for BTC", published_at=base_time))
-            db.add(NewsArticle(title="Big news for BTC 2", url="http://test.com/2", summary="Positive summary for BTC", published_at=base_time))
-            db.add(NewsArticle(title="Big news for BTC 3", url="http://test.com/3", summary="Positive summary for BTC", published_at=base_time))
+            # Add enough NewsArticle for news impact analysis (needs >= 3 articles),
+            # with the asset mentions the market scanner resolves at ingest
+            db.add(NewsArticle(title="Big news for BTC 1", url="http://test.com/1", summary="Positive summary for BTC", published_at=base_time, mentions=[NewsAssetMention(asset="BTC", published_at=base_time)]))
+            db.add(NewsArticle(title="Big news for BTC 2", url="http://test.com/2", summary="Positive summary for BTC", published_at=base_time, mentions=[NewsAssetMention(asset="BTC", published_at=base_time)]))
+            db.add(NewsArticle(title="Big news for BTC 3", url="http://test.com/3", summary="Positive summary for BTC", published_at=base_time, mentions=[NewsAssetMention(asset="BTC", published_at=base_time)]))
 
             # Add enough SentimentData for sentiment analysis (needs >= 2 points)
             db.add(SentimentData(asset="BTC", volume=100, platform="twitter", timestamp=base_time - timedelta(hours=2)))
@@ -78,7 +87,8 @@ def mock_db_session():
 def patch_get_db(mock_db_session):
     """Patch get_db to use the mock session."""
     if not pandas_not_installed:
-        with patch('src.agents.analysis_agent.get_db') as mock_get_db:
+        with patch('src.agents.analysis_agent.get_db') as mock_get_db, \
+             patch('src.agents.analysis_agent.async_pool', MagicMock(available=False)):
             mock_get_db.return_value.__enter__.return_value = mock_db_session
             yield
     else:
@@ -112,19 +122,32 @@ class TestAnalysisAgent:
         assets = await agent._get_active_assets()
         assert "BTC" in assets
 
+    @pytest.mark.asyncio
+    async def test_get_active_assets_is_cached(self, agent, mock_db_session):
+        """Test the active asset list is reused until its TTL expires."""
+        assert await agent._get_active_assets() == ["BTC"]
+
+        mock_db_session.add(MarketData(asset="ETH", price=3000, timestamp=datetime.utcnow()))
+        mock_db_session.commit()
+        assert await agent._get_active_assets() == ["BTC"]
+
+        agent._active_assets = (0.0, agent._active_assets[1])
+        assert sorted(await agent._get_active_assets()) == ["BTC", "ETH"]
+
     @pytest.mark.asyncio
     async def test_technical_analysis_breakout(self, agent):
         """Test technical analysis for a breakout scenario."""
-        # Create a sample DataFrame for a breakout
+        # Create a sample market data array for a breakout
         timestamps = [datetime.utcnow() - timedelta(minutes=i) for i in range(20)]
-        market_data = pd.DataFrame({
-            "timestamp": timestamps[::-1],
-            "price": [50000 + i*100 for i in range(20)],
-            "volume": [1000 + i*50 for i in range(20)],
-            "change": [0.1 + i*0.2 for i in range(20)]
-        })
-        market_data.iloc[-1, market_data.columns.get_loc('change')] = 6.0 # breakout change
-        market_data.iloc[-1, market_data.columns.get_loc('volume')] = 3000 # high volume
+        market_data = np.array(
+            [
+                (ts, 50000 + i*100, 1000 + i*50, 0.1 + i*0.2)
+                for i, ts in enumerate(timestamps[::-1])
+            ],
+            dtype=MARKET_DTYPE,
+        )
+        market_data["change"][-1] = 6.0 # breakout change
+        market_data["volume"][-1] = 3000 # high volume
 
         insights = await agent._technical_analysis("BTC", market_data)
 
@@ -163,4 +186,104 @@ class TestAnalysisAgent:
         
         # Check if insights were actually added to the DB
         insight_count = mock_db_session.query(Insight).count()
-        assert insight_count > 0
\ No newline at end of file
+        assert insight_count > 0
+
+    @pytest.mark.asyncio
+    async def test_llm_prompts_are_batched(self, agent):
+        """Test concurrent LLM prompts are dispatched together and resolved individually."""
+        agent.llm_client.generate = AsyncMock(side_effect=lambda prompt, **kwargs: prompt.upper())
+
+        results = await asyncio.gather(
+            *(agent.llm_batcher.submit(p) for p in ["a", "b", "c"])
+        )
+
+        assert results == ["A", "B", "C"]
+        assert agent.llm_client.generate.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_llm_analysis_is_cached(self, agent):
+        """Test exact and near-identical analyses are served from the cache."""
+        data = {"price": 50000, "change_24h": 6.01, "volume_ratio": 2.0}
+
+        first = await agent._get_llm_analysis("BTC", "breakout", data)
+        again = await agent._get_llm_analysis("BTC", "breakout", data)
+        similar = await agent._get_llm_analysis(
+            "BTC", "breakout", {**data, "price": 50100, "change_24h": 6.05}
+        )
+
+        assert first == again == similar == "LLM analysis text"
+        assert agent.llm_client.generate.call_count == 1
+
+        await agent._get_llm_analysis("ETH", "breakout", data)
+        assert agent.llm_client.generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_llm_analysis_with_nan_signal_still_calls_llm(self, agent):
+        """Test a non-finite signal is left out of the cache key instead of failing the analysis."""
+        data = {"price": 50000, "change_24h": float("nan"), "volume_ratio": 3.2}
+
+        assert agent._semantic_cache_key("BTC", "volume_spike", data) is not None
+        assert await agent._get_llm_analysis("BTC", "volume_spike", data) == "LLM analysis text"
+        assert agent.llm_client.generate.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_prefetch_all_groups_by_asset(self, agent):
+        """Test market, news and sentiment data are loaded once and grouped per asset."""
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+
+        market_data, news_data, sentiment_data = await agent._prefetch_all(["BTC", "ETH"], cutoff)
+
+        assert len(market_data["BTC"]) == 20
+        assert market_data["BTC"].dtype == MARKET_DTYPE
+        assert len(news_data["BTC"]) == 3
+        assert sentiment_data["BTC"].avg_volume == 150
+        assert sentiment_data["BTC"].points == 2
+        assert sentiment_data["BTC"].volume == 200
+        assert sentiment_data["BTC"].platform == "twitter"
+        assert "ETH" not in market_data and "ETH" not in news_data and "ETH" not in sentiment_data
+
+    def test_summarize_market(self, agent):
+        """Test market data is reduced to a fixed-size summary for the LLM prompt."""
+        timestamps = [datetime.utcnow() - timedelta(minutes=i) for i in range(20)][::-1]
+        market_data = np.array(
+            [(ts, 100 + i, 1000, 0.5) for i, ts in enumerate(timestamps)], dtype=MARKET_DTYPE
+        )
+        market_data["volume"][-1] = 3000
+
+        summary = agent._summarize_market(market_data)
+
+        assert summary["price_range"] == [100.0, 119.0]
+        assert summary["mean_price"] == 109.5
+        assert summary["recent_5"] == [115.0, 116.0, 117.0, 118.0, 119.0]
+        assert summary["volume_z"] > 4
+        assert summary["n"] == 20
+
+    @pytest.mark.asyncio
+    async def test_sentiment_analysis_detects_volume_jump(self, agent):
+        """Test a sentiment shift is reported when the latest volume jumps above the average."""
+        cutoff = datetime.utcnow() - timedelta(hours=24)
+        _, _, sentiment_data = await agent._prefetch_all(["BTC"], cutoff)
+
+        # Average 150, latest 200: below the 1.5x threshold
+        assert await agent._sentiment_analysis("BTC", sentiment_data["BTC"]) == []
+        assert await agent._sentiment_analysis("ETH", None) == []
+
+        jump = MagicMock(avg_volume=100.0, points=5, volume=300, platform="twitter")
+        insights = await agent._sentiment_analysis("BTC", jump)
+
+        assert len(insights) == 1
+        assert insights[0].type == InsightType.SENTIMENT_SHIFT
+        assert insights[0].details["volume_increase"] == pytest.approx(200.0)
+
+    @pytest.mark.asyncio
+    async def test_llm_prompt_is_specialized_per_insight_type(self, agent):
+        """Test prompts are rendered from per-insight-type formatters."""
+        await agent._get_llm_analysis("BTC", "breakout", {"price": 1})
+        await agent._get_llm_analysis("BTC", "volume_spike", {"price": 1})
+
+        prompts = [call.kwargs["prompt"] for call in agent.llm_client.generate.call_args_list]
+        assert prompts[0].startswith("You are a crypto market analyst. Analyze the following breakout for BTC.")
+        assert '"price": 1' in prompts[0]
+        assert "following volume_spike for BTC" in prompts[1]
+        with pytest.raises(TypeError):
+            agent._PROMPT_FORMATTERS["custom_signal"] = str.format
@@ -0,0 +1,83 @@
+"""Unit tests for the AnalyticsAgent."""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.agents.analytics_agent import AnalyticsAgent
+from src.database.models import (
+    Base,
+    ContentFormat,
+    ContentPlan,
+    Insight,
+    InsightType,
+    PublishedContent,
+)
+
+
+@pytest.fixture()
+def db_session():
+    """Provide a session on an in-memory SQLite database shared with the agent."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    @contextmanager
+    def _get_db():
+        yield session
+
+    with patch("src.agents.analytics_agent.get_db", _get_db):
+        yield session
+    session.close()
+
+
+class TestAnalyticsAgent:
+    """Test analytics aggregation."""
+
+    @pytest.mark.asyncio()
+    async def test_kpi_dashboard_aggregates_in_sql(self, db_session):
+        """Test that KPI dashboard sums engagement server-side in one query."""
+        insight = Insight(type=InsightType.BREAKOUT, asset="BTC", confidence=0.9, details={})
+        db_session.add(insight)
+        db_session.flush()
+
+        plan = ContentPlan(
+            insight_id=insight.id,
+            platform="twitter",
+            format=ContentFormat.SINGLE_TWEET,
+            status="ready"
+        )
+        db_session.add(plan)
+        db_session.flush()
+
+        for hours_ago, likes, rate in [(1, 5, 0.1), (30, 7, None), (240, 100, 0.5)]:
+            db_session.add(PublishedContent(
+                content_plan_id=plan.id,
+                platform="twitter",
+                content_text="post",
+                published_at=datetime.utcnow() - timedelta(hours=hours_ago),
+                likes=likes,
+                comments=None,
+                shares=1,
+                engagement_rate=rate
+            ))
+        db_session.commit()
+
+        kpis = await AnalyticsAgent().get_kpi_dashboard()
+
+        assert kpis['insights_generated_24h'] == 1
+        assert kpis['content_published_24h'] == 1
+        assert kpis['content_published_7d'] == 2
+        # Content older than 7 days is excluded, missing counters count as zero
+        assert kpis['total_engagement_7d'] == 14
+        assert kpis['avg_engagement_rate_7d'] == pytest.approx(0.05)
+        assert kpis['content_in_pipeline'] == 1
@@ -0,0 +1,45 @@
+"""Unit tests for API key hashing and lookup."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import APIKey, Base
+from src.utils.api_keys import find_api_key, hash_api_key, legacy_hash_api_key
+
+
+@pytest.fixture()
+def db_session():
+    """Create an in-memory SQLite database for testing."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_find_api_key_matches_current_digest(db_session):
+    """Test that keys stored as BLAKE2b digests are found unchanged."""
+    db_session.add(APIKey(key_hash=hash_api_key("pk_current"), owner_name="owner"))
+    db_session.commit()
+
+    key_record = find_api_key(db_session, "pk_current")
+
+    assert key_record is not None
+    assert key_record.key_hash == hash_api_key("pk_current")
+    assert find_api_key(db_session, "pk_unknown") is None
+
+
+def test_find_api_key_upgrades_legacy_digest(db_session):
+    """Test that a key stored as SHA-256 is found and rehashed to BLAKE2b."""
+    db_session.add(APIKey(key_hash=legacy_hash_api_key("pk_legacy"), owner_name="owner"))
+    db_session.commit()
+
+    key_record = find_api_key(db_session, "pk_legacy")
+    db_session.commit()
+
+    assert key_record is not None
+    assert key_record.key_hash == hash_api_key("pk_legacy")
+    legacy_hash = legacy_hash_api_key("pk_legacy")
+    assert db_session.query(APIKey).filter_by(key_hash=legacy_hash).count() == 0
+    assert find_api_key(db_session, "pk_legacy").id == key_record.id
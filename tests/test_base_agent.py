@@ -0,0 +1,120 @@
+"""Unit tests for the BaseAgent run wrapper, result cache and activity logging."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.agents.base_agent import BaseAgent
+
+
+class TestBaseAgent:
+    """Test base agent caching and logging."""
+
+    @pytest.mark.asyncio()
+    async def test_cacheable_agent_reuses_identical_runs(self):
+        """Test that CACHEABLE agents execute identical calls once."""
+
+        class CachedAgent(BaseAgent):
+            CACHEABLE = True
+
+            def __init__(self, name):
+                super().__init__(name)
+                self.calls = 0
+
+            async def execute(self, content=None, **kwargs):
+                self.calls += 1
+                return {"echo": content}
+
+        agent = CachedAgent("TestAgent")
+        assert await agent.run(content="a", context={"x": 1}) == {"echo": "a"}
+        assert await agent.run(context={"x": 1}, content="a") == {"echo": "a"}
+        assert agent.calls == 1
+
+        await agent.run(content="b")
+        assert agent.calls == 2
+
+    @pytest.mark.asyncio()
+    async def test_cached_results_are_isolated_from_caller_mutation(self):
+        """Test that mutating a returned result does not change later cache hits."""
+
+        class CachedAgent(BaseAgent):
+            CACHEABLE = True
+
+            async def execute(self, content=None, **kwargs):
+                return {"echo": content, "tags": ["x"]}
+
+        agent = CachedAgent("TestAgent")
+        first = await agent.run(content="a")
+        first["echo"] = "mutated"
+        first["tags"].append("y")
+
+        second = await agent.run(content="a")
+        assert second == {"echo": "a", "tags": ["x"]}
+
+        second["tags"].clear()
+        assert await agent.run(content="a") == {"echo": "a", "tags": ["x"]}
+
+    @pytest.mark.asyncio()
+    async def test_activity_logs_are_written_in_batches(self):
+        """Test that run() queues activity logs and the writer commits them together."""
+        from src.agents.base_agent import flush_agent_logs
+
+        class ConcreteAgent(BaseAgent):
+            async def execute(self):
+                return {"status": "success"}
+
+        agent = ConcreteAgent("TestAgent")
+        with patch("src.agents.base_agent._write_logs") as write_logs:
+            for _ in range(5):
+                await agent.run()
+            write_logs.assert_not_called()
+
+            await flush_agent_logs()
+
+        assert write_logs.call_count == 1
+        assert len(write_logs.call_args.args[0]) == 5
+
+    @pytest.mark.asyncio()
+    async def test_cancelled_log_writer_drains_off_the_event_loop(self):
+        """Test that logs still queued at shutdown are written on the log thread."""
+        import threading
+
+        from src.agents import base_agent
+
+        class ConcreteAgent(BaseAgent):
+            async def execute(self):
+                return {"status": "success"}
+
+        write_threads = []
+        agent = ConcreteAgent("TestAgent")
+        with patch(
+            "src.agents.base_agent._write_logs",
+            side_effect=lambda batch, db=None: write_threads.append(
+                (len(batch), threading.current_thread())
+            ),
+        ):
+            for _ in range(3):
+                await agent.run()
+            await asyncio.sleep(0)  # Let the writer pick up the first entry
+            base_agent._writer.task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await base_agent._writer.task
+
+        assert write_threads == [(3, write_threads[0][1])]
+        assert write_threads[0][1] is not threading.main_thread()
+
+    def test_write_logs_only_swallows_database_errors(self):
+        """Test log writes ignore database errors but surface programming errors."""
+        from sqlalchemy.exc import OperationalError
+
+        from src.agents.base_agent import _write_logs
+
+        db = Mock()
+        db.commit.side_effect = OperationalError("INSERT", {}, Exception("database is locked"))
+        _write_logs([Mock()], db)
+        db.rollback.assert_called_once()
+
+        db.commit.side_effect = TypeError("bad value")
+        with pytest.raises(TypeError):
+            _write_logs([Mock()], db)
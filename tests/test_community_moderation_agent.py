@@ -0,0 +1,225 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.agents.community_moderation_agent import CommunityModerationAgent
+
+
+@pytest.fixture
+def agent():
+    """Fixture for a CommunityModerationAgent with a mocked LLM client."""
+    mock_llm_client = MagicMock()
+    mock_llm_client.generate = AsyncMock(return_value=json.dumps(
+        {"action": "REMOVE", "confidence": 0.9, "reason": "Spam link"}
+    ))
+
+    async def stream(*args, **kwargs):
+        # Stream the mocked generate() reply in small chunks
+        text = await mock_llm_client.generate(*args, **kwargs)
+        for i in range(0, len(text), 7):
+            yield text[i:i + 7]
+
+    mock_llm_client.stream = stream
+
+    with patch('src.agents.community_moderation_agent.llm_client', mock_llm_client):
+        return CommunityModerationAgent()
+
+
+class TestCommunityModerationAgent:
+
+    @pytest.mark.asyncio
+    async def test_repeated_content_is_served_from_cache(self, agent):
+        """Test repeats differing only in case, spacing or punctuation runs reuse the decision."""
+        first = await agent.execute(content="Buy cheap followers at spam.com now!!!")
+        again = await agent.execute(content="buy cheap followers at  spam.com now!")
+
+        assert first == again == {"action": "REMOVE", "confidence": 0.9, "reason": "Spam link"}
+        assert agent.llm.generate.call_count == 1
+        assert agent.cache.hits == 1
+
+        await agent.execute(content="BTC looks strong today, nice breakout")
+        assert agent.llm.generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_responses_are_not_cached(self, agent):
+        """Test fallback decisions are retried instead of cached."""
+        agent.llm.generate.return_value = "not json"
+
+        result = await agent.execute(content="Some message")
+        await agent.execute(content="Some message")
+
+        assert result["action"] == "FLAG"
+        assert agent.llm.generate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_run_reuses_decisions_but_not_flags(self, agent):
+        """Test identical run() calls reuse definitive decisions and re-evaluate flags."""
+        await agent.run(content="Hello", user_id="u1")
+        await agent.run(content="Hello", user_id="u1")
+        assert len(agent._l1) == 1
+
+        agent.llm.generate.return_value = json.dumps(
+            {"action": "FLAG", "confidence": 0.6, "reason": "Unclear"}
+        )
+        await agent.run(content="Borderline", user_id="u1")
+        assert len(agent._l1) == 1
+
+    @pytest.mark.asyncio
+    async def test_rule_matches_skip_the_llm(self, agent):
+        """Test blacklisted terms and scam signatures are removed without an LLM call."""
+        result = await agent.execute(content="DM me and SEND ME YOUR SEED PHRASE to unlock")
+        assert result == {
+            "action": "REMOVE",
+            "confidence": 0.99,
+            "reason": "rule:blacklist:send me your seed phrase",
+        }
+
+        result = await agent.execute(content="Airdrop live: http://192.168.4.20/claim")
+        assert result["reason"] == "rule:ip_url"
+        assert agent.llm.generate.call_count == 0
+
+    def test_blacklist_terms_only_match_whole_words(self):
+        """Test blacklisted terms inside longer words are left to the LLM."""
+        from src.utils.moderation_rules import ModerationRules
+
+        rules = ModerationRules(terms=["scam"])
+        assert rules.match("this is a SCAM!") == "blacklist:scam"
+        assert rules.match("scammer alert") is None
+        assert rules.match("Never share your keys with anyone") is None
+
+    @pytest.mark.asyncio
+    async def test_system_prompt_is_sent_separately(self, agent):
+        """Test the static system prompt is passed apart from the per-message instruction."""
+        await agent.execute(content="Hello everyone")
+
+        call = agent.llm.generate.call_args
+        assert call.kwargs["system"] == CommunityModerationAgent.SYSTEM_PROMPT
+        assert call.kwargs["system_id"] == agent._system_prompt_id
+        assert CommunityModerationAgent.SYSTEM_PROMPT not in call.args[0]
+
+    @pytest.mark.asyncio
+    async def test_fenced_json_response_is_parsed(self, agent):
+        """Test decisions wrapped in a markdown code fence are extracted."""
+        agent.llm.generate.return_value = (
+            'Here is my assessment:\n```json\n'
+            '{"action": "WARN", "confidence": 0.7, "reason": "Mild insult"}\n```'
+        )
+
+        result = await agent.execute(content="You are kind of dumb")
+
+        assert result == {"action": "WARN", "confidence": 0.7, "reason": "Mild insult"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("response, confidence", [
+        ('{"action": "DELETE", "confidence": 0.9, "reason": "x"}', 0.4),
+        ('{"action": "WARN", "confidence": 1.5, "reason": "x"}', 0.4),
+        ('{"action": "WARN", "confidence": "0.9", "reason": "x"}', 0.4),
+        ('{"action": "WARN", "reason": "x"}', 0.4),
+        ('{"action": "WARN", "confidence": 0.9,', 0.3),
+    ])
+    async def test_invalid_decisions_fall_back_to_flag(self, agent, response, confidence):
+        """Test malformed or out-of-schema decisions are flagged for human review."""
+        agent.llm.generate.return_value = response
+
+        result = await agent.execute(content="Some message")
+
+        assert result["action"] == "FLAG"
+        assert result["confidence"] == confidence
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_llm_call(self, agent):
+        """Test messages arriving together are moderated with a single batched call."""
+        agent.llm.generate.return_value = json.dumps([
+            {"action": "IGNORE", "confidence": 0.9, "reason": "Fine"},
+            {"action": "WARN", "confidence": 0.8, "reason": "Rude"},
+            {"action": "REMOVE", "confidence": 0.95, "reason": "Spam"},
+        ])
+
+        results = await asyncio.gather(
+            agent.execute(content="Good morning"),
+            agent.execute(content="You are an idiot"),
+            agent.execute(content="Cheap followers here"),
+        )
+
+        assert [r["action"] for r in results] == ["IGNORE", "WARN", "REMOVE"]
+        assert agent.llm.generate.call_count == 1
+        assert "BATCH OF 3" in agent.llm.generate.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_mismatched_batch_reply_falls_back_to_single_calls(self, agent):
+        """Test a batched reply of the wrong length is retried one message at a time."""
+        agent.llm.generate.side_effect = [
+            json.dumps([{"action": "IGNORE", "confidence": 0.9, "reason": "Fine"}]),
+            json.dumps({"action": "IGNORE", "confidence": 0.9, "reason": "Fine"}),
+            json.dumps({"action": "WARN", "confidence": 0.8, "reason": "Rude"}),
+        ]
+
+        results = await asyncio.gather(
+            agent.execute(content="Good morning"),
+            agent.execute(content="You are an idiot"),
+        )
+
+        assert [r["action"] for r in results] == ["IGNORE", "WARN"]
+        assert agent.llm.generate.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_streamed_reply_stops_after_decision_object(self, agent):
+        """Test the single-message stream is closed once the decision object is complete."""
+        received = []
+
+        async def stream(*args, **kwargs):
+            for chunk in ['{"action": "IGNORE", "confidence": 0.8, ', '"reason": "ok"}', " and more"]:
+                received.append(chunk)
+                yield chunk
+
+        agent.llm.stream = stream
+
+        result = await agent.execute(content="Nice chart")
+
+        assert result == {"action": "IGNORE", "confidence": 0.8, "reason": "ok"}
+        assert received[-1] == '"reason": "ok"}'
+
+    @pytest.mark.asyncio
+    async def test_moderate_accepts_validated_request(self, agent):
+        """Test validated requests go straight to moderation with extra fields as additional info."""
+        from pydantic import ValidationError
+
+        from src.agents.community_moderation_agent import ModerationRequest
+
+        with pytest.raises(ValidationError):
+            ModerationRequest.model_validate_json('{"content": ""}')
+
+        request = ModerationRequest.model_validate_json('{"content": "Hello", "channel": "general"}')
+        result = await agent.moderate(request)
+
+        assert result["action"] == "REMOVE"
+        prompt = agent.llm.generate.call_args.args[0]
+        assert '"user_id":"anonymous"' in prompt
+        assert '"additional_info":{"channel":"general"}' in prompt
+
+    def test_semantic_cache_does_not_match_negated_messages(self):
+        """Test a message never gets the cached verdict of one saying the opposite."""
+        from src.utils.semantic_cache import SemanticCache
+
+        cache = SemanticCache()
+        cache.put("Please do not send your seed phrase to anyone", {"action": "APPROVE"})
+        cache.put("I think this project is a scam, stay away", {"action": "APPROVE"})
+
+        assert cache.get("Please send your seed phrase to anyone") is None
+        assert cache.get("I do not think this project is a scam, stay away") is None
+        assert cache.get("please do not send your  SEED phrase to anyone") == {"action": "APPROVE"}
+
+    def test_semantic_cache_memoizes_embeddings(self):
+        """Test identical messages are embedded once and reused by get() and put()."""
+        import numpy as np
+
+        from src.utils.semantic_cache import SemanticCache
+
+        embed = MagicMock(side_effect=lambda text: np.ones(8))
+        cache = SemanticCache(embed=embed, dim=8)
+
+        assert cache.get("Free  followers!") is None
+        cache.put("free followers!", {"action": "REMOVE"})
+        assert cache.embed("FREE followers!") is cache.embed("free followers!")
+        assert embed.call_count == 1
@@ -0,0 +1,329 @@
+"""Tests for the CommunityModeratorAgent."""
+
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.agents.community_moderator_agent import CommunityModeratorAgent
+from src.database.models import CommunityUser, ModerationAction
+
+
+@pytest.fixture()
+def agent():
+    """CommunityModeratorAgent with platform and LLM clients mocked out."""
+    with patch("src.agents.community_moderator_agent.DiscordAPI"), patch(
+        "src.agents.community_moderator_agent.TelegramAPI"
+    ), patch("src.agents.community_moderator_agent.AsyncAnthropic"):
+        agent = CommunityModeratorAgent()
+
+    agent._ai_comprehensive_check = AsyncMock(return_value=None)
+    return agent
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    "content",
+    [
+        "CLICK the link here",
+        "join t.me/pumpgroup",
+        "Join DISCORD.GG/abc",
+        "earn $500 a day",
+        "just DM me",
+    ],
+)
+async def test_spam_patterns_match_case_insensitively(agent, content):
+    """Test every spam pattern is still matched by the combined expression."""
+    violation = await agent._check_message_for_violations(content, "1", "user")
+
+    assert violation["type"] == "spam"
+    agent._ai_comprehensive_check.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_clean_message_falls_through_to_ai_check(agent):
+    """Test messages without rule matches are left to the AI check."""
+    content = "BTC looks strong above the weekly resistance level"
+    assert await agent._check_message_for_violations(content, "1", "user") is None
+    agent._ai_comprehensive_check.assert_awaited_once()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("content", "checked"),
+    [
+        ("gm everyone", False),
+        ("BTC looks strong", False),
+        ("you are an idiot", True),
+        ("what about $PEPE?", True),
+        ("see https://example.com", True),
+    ],
+)
+async def test_short_messages_only_reach_ai_when_suspicious(agent, content, checked):
+    """Test short benign messages skip the AI check."""
+    assert await agent._check_message_for_violations(content, "1", "user") is None
+    assert agent._ai_comprehensive_check.await_count == int(checked)
+
+
+@pytest.mark.asyncio()
+async def test_scam_keywords_take_priority_over_offensive(agent):
+    """Test scam keywords win even when an offensive keyword appears first."""
+    violation = await agent._check_message_for_violations(
+        "This fake project has an AIRDROP", "1", "user"
+    )
+
+    assert violation["type"] == "scam"
+    assert violation["reason"] == "Contains scam keyword: airdrop"
+    agent._ai_comprehensive_check.assert_not_called()
+
+
+@pytest.mark.asyncio()
+async def test_offensive_keyword_is_judged_by_single_ai_check(agent):
+    """Test offensive keywords take one AI round-trip whose verdict is final."""
+    agent._ai_comprehensive_check.return_value = {
+        "type": "offensive",
+        "confidence": 0.9,
+        "reason": "insult",
+    }
+    violation = await agent._check_message_for_violations("total Ponzi", "1", "user")
+    assert violation["type"] == "offensive"
+    agent._ai_comprehensive_check.assert_awaited_once_with("total Ponzi")
+
+    agent._ai_comprehensive_check.return_value = None
+    assert await agent._check_message_for_violations("total Ponzi", "1", "user") is None
+
+
+def test_keyword_matching_without_ahocorasick(agent):
+    """Test the substring fallback agrees with the automaton."""
+    assert agent._match_scam_keyword("send your seed phrase to claim") == "seed phrase"
+    # Offensive keywords are left to the AI check
+    assert agent._match_scam_keyword("total ponzi") is None
+    for text in ["send your seed phrase to claim", "total ponzi", "nothing here"]:
+        expected = agent._match_scam_keyword(text)
+        agent._keyword_ac, automaton = None, agent._keyword_ac
+        assert agent._match_scam_keyword(text) == expected
+        agent._keyword_ac = automaton
+
+
+def _llm_reply(text: str) -> MagicMock:
+    """Anthropic message whose first content block holds ``text``."""
+    message = MagicMock()
+    message.content = [MagicMock(text=text)]
+    return message
+
+
+@pytest.mark.asyncio()
+async def test_ai_check_reuses_verdicts_for_repeated_messages():
+    """Test repeated messages are answered from the cache without an LLM call."""
+    with patch("src.agents.community_moderator_agent.DiscordAPI"), patch(
+        "src.agents.community_moderator_agent.TelegramAPI"
+    ), patch("src.agents.community_moderator_agent.AsyncAnthropic"):
+        agent = CommunityModeratorAgent()
+    create = agent.llm_client.messages.create = AsyncMock()
+
+    create.return_value = _llm_reply('{"violation": false}')
+    assert await agent._ai_comprehensive_check("Anyone watching the BTC breakout today?") is None
+    assert await agent._ai_comprehensive_check("anyone watching the BTC breakout today??") is None
+    assert create.await_count == 1
+
+    # A negated message says the opposite and must not reuse the "no violation" verdict
+    assert await agent._ai_comprehensive_check("Please do not send your seed phrase to me") is None
+    create.return_value = _llm_reply(
+        '{"violation": true, "type": "scam", "confidence": 0.95, "reason": "seed phrase"}'
+    )
+    violation = await agent._ai_comprehensive_check("Please send your seed phrase to me")
+    assert violation["type"] == "scam"
+    assert create.await_count == 3
+
+    # Failed calls are not cached
+    create.side_effect = RuntimeError("overloaded")
+    assert await agent._ai_comprehensive_check("fresh message") is None
+    create.side_effect = None
+    create.return_value = _llm_reply(
+        '{"violation": true, "type": "spam", "confidence": 0.95, "reason": "promo"}'
+    )
+    assert (await agent._ai_comprehensive_check("fresh message"))["type"] == "spam"
+    assert create.await_count == 5
+
+
+@pytest.mark.asyncio()
+async def test_comprehensive_check_sends_checklist_as_cached_system_prompt():
+    """Test the checklist goes in a cached system block and only the message in the user turn."""
+    with patch("src.agents.community_moderator_agent.DiscordAPI"), patch(
+        "src.agents.community_moderator_agent.TelegramAPI"
+    ), patch("src.agents.community_moderator_agent.AsyncAnthropic"):
+        agent = CommunityModeratorAgent()
+    create = agent.llm_client.messages.create = AsyncMock(
+        return_value=_llm_reply(
+            '{"violation": true, "type": "scam", "confidence": 0.95, "reason": "drainer"}'
+        )
+    )
+
+    violation = await agent._ai_comprehensive_check("connect your wallet at my site")
+    assert violation == {"type": "scam", "confidence": 0.95, "reason": "drainer"}
+
+    kwargs = create.await_args.kwargs
+    assert kwargs["system"] == [
+        {
+            "type": "text",
+            "text": CommunityModeratorAgent.COMPREHENSIVE_CHECK_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+    assert kwargs["messages"] == [
+        {"role": "user", "content": 'Message: "connect your wallet at my site"'}
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_batch_check_judges_messages_in_one_call():
+    """Test pending messages share one AI call and missing verdicts fall back to single checks."""
+    with patch("src.agents.community_moderator_agent.DiscordAPI"), patch(
+        "src.agents.community_moderator_agent.TelegramAPI"
+    ), patch("src.agents.community_moderator_agent.AsyncAnthropic"):
+        agent = CommunityModeratorAgent()
+    create = agent.llm_client.messages.create = AsyncMock(
+        side_effect=[
+            _llm_reply(
+                '[{"idx": 0, "violation": false},'
+                ' {"idx": 1, "violation": true, "type": "harassment",'
+                ' "confidence": 0.95, "reason": "insult"}]'
+            ),
+            _llm_reply('{"violation": false}'),
+        ]
+    )
+
+    contents = ["gm everyone", "you are an idiot", "what about ETH?"]
+    results = await agent._ai_batch_check(contents)
+
+    assert results == [
+        None,
+        {"type": "harassment", "confidence": 0.95, "reason": "insult"},
+        None,
+    ]
+    assert create.await_count == 2
+    assert "gm everyone" in create.await_args_list[0].kwargs["messages"][0]["content"]
+    fallback = create.await_args_list[1].kwargs["messages"][0]["content"]
+    assert fallback == 'Message: "what about ETH?"'
+
+    # Every verdict is cached now
+    assert await agent._ai_batch_check(contents) == results
+    assert create.await_count == 2
+
+
+@pytest.mark.asyncio()
+async def test_discord_channels_are_moderated_concurrently(agent):
+    """Test channel results are merged and a failing channel doesn't stop the others."""
+    messages = [
+        {"id": "1", "author_id": "a", "author_name": "alice", "content": "gm"},
+        {"id": "2", "author_id": "b", "author_name": "bob", "content": "join t.me/pumpgroup"},
+    ]
+
+    async def get_channel_messages(channel_id, limit):
+        if channel_id != "general_chat_channel_id":
+            raise RuntimeError("channel unavailable")
+        return messages
+
+    agent.discord_api.get_channel_messages = AsyncMock(side_effect=get_channel_messages)
+    agent._take_moderation_action = AsyncMock(return_value="deleted")
+
+    results = await agent._moderate_discord_channels()
+
+    assert results == {"messages_checked": 2, "violations": 1, "deleted": 1, "warned": 0}
+    assert agent.discord_api.get_channel_messages.await_count == 2
+
+
+@pytest.mark.asyncio()
+async def test_moderation_actions_are_written_in_one_transaction(agent):
+    """Test a run's moderation actions are saved together at the end of execute()."""
+    messages = [
+        {"id": str(i), "author_id": "b", "author_name": "bob", "content": f"t.me/spam{i}"}
+        for i in range(3)
+    ]
+    agent.discord_api.get_channel_messages = AsyncMock(return_value=messages)
+    agent.discord_api.delete_message = AsyncMock()
+
+    with patch("src.agents.community_moderator_agent.get_db") as get_db:
+        db = get_db.return_value.__enter__.return_value
+        results = await agent.execute()
+
+    assert results["violations_detected"] == 6
+    get_db.assert_called_once()
+    (saved,) = db.bulk_save_objects.call_args.args
+    assert [action.action_type for action in saved] == ["deleted"] * 6
+    assert agent._pending_mod_actions == []
+
+
+@pytest.mark.asyncio()
+async def test_moderation_stats_are_aggregated_in_the_database(agent):
+    """Test the grouped stats query matches per-action counting."""
+    engine = create_engine("sqlite://")
+    CommunityUser.__table__.create(engine)
+    ModerationAction.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def get_db():
+        with Session() as db:
+            yield db
+            db.commit()
+
+    with get_db() as db:
+        for action_type, platform, automated in [
+            ("deleted", "discord", True),
+            ("deleted", "discord", True),
+            ("warned", "discord", False),
+            ("deleted", "telegram", True),
+        ]:
+            db.add(
+                ModerationAction(
+                    platform_user_id="u",
+                    action_type=action_type,
+                    reason="test",
+                    platform=platform,
+                    automated=automated,
+                )
+            )
+
+    with patch("src.agents.community_moderator_agent.get_db", get_db):
+        stats = await agent.get_moderation_stats(days=7)
+
+    assert stats == {
+        "period_days": 7,
+        "total_actions": 4,
+        "automated_actions": 3,
+        "manual_actions": 1,
+        "by_type": {"deleted": 3, "warned": 1},
+        "by_platform": {"discord": 3, "telegram": 1},
+    }
+
+
+@pytest.mark.asyncio()
+async def test_uncertain_fast_verdicts_are_escalated():
+    """Test the fast model decides clear cases and the strong model borderline ones."""
+    with patch("src.agents.community_moderator_agent.DiscordAPI"), patch(
+        "src.agents.community_moderator_agent.TelegramAPI"
+    ), patch("src.agents.community_moderator_agent.AsyncAnthropic"):
+        agent = CommunityModeratorAgent()
+    create = agent.llm_client.messages.create = AsyncMock(
+        side_effect=[
+            _llm_reply('{"violation": true, "type": "spam", "confidence": 0.7, "reason": "ad"}'),
+            _llm_reply('{"violation": false}'),
+            _llm_reply('{"violation": true, "type": "scam", "confidence": 0.97, "reason": "x"}'),
+        ]
+    )
+
+    assert await agent._ai_comprehensive_check("check out my new trading course") is None
+    assert await agent._ai_comprehensive_check("send your keys to recover funds") == {
+        "type": "scam",
+        "confidence": 0.97,
+        "reason": "x",
+    }
+
+    models = [call.kwargs["model"] for call in create.await_args_list]
+    assert models == [agent.FAST_MODEL, agent.STRONG_MODEL, agent.FAST_MODEL]
+    assert agent.ai_escalations == 1
+    assert agent.ai_usage[agent.FAST_MODEL]["calls"] == 2
+    assert agent.ai_usage[agent.STRONG_MODEL]["calls"] == 1
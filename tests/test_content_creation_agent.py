@@ -95,3 +95,70 @@ class TestContentCreationAgent:
         
         # Results should show no content created
         assert results["content_created"] == 0
+
+    @pytest.mark.asyncio
+    async def test_one_failing_plan_does_not_stop_the_others(self, mock_llm_client, mock_settings):
+        """Test concurrent generation keeps successful plans when another raises."""
+        agent = ContentCreationAgent()
+        agent._generate_telegram_message = AsyncMock(side_effect=RuntimeError("telegram down"))
+
+        results = await agent.execute(
+            content_plan=[
+                {"item_id": 1, "format": "tweet", "keywords": ["BTC"]},
+                {"item_id": 2, "format": "telegram", "keywords": ["ETH"]},
+                {"item_id": 3, "format": "tweet", "keywords": ["SOL"]},
+            ]
+        )
+
+        assert results["content_created"] == 2
+        assert results["tweets"] == 2
+        assert len(results["errors"]) == 1
+        assert "telegram down" in results["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_hits_the_cache(self, mock_llm_client, mock_settings):
+        """Test an identical request is answered from the completion cache."""
+        agent = ContentCreationAgent()
+
+        first = await agent._complete("_generate_tweet", "system", "prompt", max_tokens=150)
+        second = await agent._complete("_generate_tweet", "system", "prompt", max_tokens=150)
+
+        assert first == second == "Generated test content for a tweet about $BTC."
+        mock_llm_client.generate.assert_awaited_once()
+        assert agent.llm_cache.hits == 1
+
+        # A different token budget is a different request
+        await agent._complete("_generate_tweet", "system", "prompt", max_tokens=200)
+        assert mock_llm_client.generate.await_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "response",
+        [
+            'Here is your thread: ["1/3 first tweet", "2/3 second tweet", "3/3 third tweet"] Enjoy!',
+            '```json\n["1/3 first tweet", "2/3 second tweet", "3/3 third tweet"]\n```',
+        ],
+    )
+    async def test_thread_is_parsed_from_wrapped_response(
+        self, mock_llm_client, mock_settings, response
+    ):
+        """Test the JSON array is found inside prose or a code fence."""
+        mock_llm_client.generate.return_value = response
+        agent = ContentCreationAgent()
+        insight = MagicMock(asset="BTC", confidence=0.7, details={"price": 52000})
+
+        content = await agent._generate_thread(insight, MagicMock(id=7))
+
+        assert content["tweets"] == ["1/3 first tweet", "2/3 second tweet", "3/3 third tweet"]
+
+    @pytest.mark.asyncio
+    async def test_long_tweet_is_clamped(self, mock_llm_client, mock_settings):
+        """Test generated tweets are cut to 280 characters with an ellipsis."""
+        mock_llm_client.generate.return_value = "x" * 400
+        agent = ContentCreationAgent()
+        insight = MagicMock(asset="BTC", confidence=0.7, details={"price": 52000})
+
+        content = await agent._generate_tweet(insight, MagicMock(id=7))
+
+        assert len(content["text"]) == 280
+        assert content["text"].endswith("...")
@@ -253,6 +253,16 @@ class TestPhase3Models:
         assert user.converted_at is not None
 
 
+def test_hot_filter_columns_are_indexed():
+    """Test that A/B testing and publishing hot filter columns are indexed."""
+    assert ABTest.__table__.c.status.index
+    assert PublishedContent.__table__.c.ab_test_variant_id.index
+
+    # Partial composite index for unpublished insight candidates
+    index_names = {index.name for index in Insight.__table__.indexes}
+    assert "idx_insight_unpublished_timestamp_confidence" in index_names
+
+
 def test_all_models_have_required_fields():
     """Test that all models have basic required fields."""
     models = [
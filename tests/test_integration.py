@@ -151,6 +151,13 @@ class TestConfigurationManagement:
         assert settings.database_url is not None
         assert settings.anthropic_api_key is not None or settings.anthropic_api_key == "test-key"
 
+    def test_settings_singleton_is_lazy(self):
+        """Test settings are built once and shared across accessors."""
+        import config.config as config_module
+
+        assert "settings" not in vars(config_module)
+        assert config_module.settings is config_module.get_settings()
+
     def test_phase_specific_settings(self):
         """Test phase-specific settings exist."""
         from config.config import settings
@@ -193,7 +200,7 @@ class TestEndToEndScenarios:
         """Test complete A/B test lifecycle."""
         from src.agents.ab_testing_agent import ABTestingAgent
 
-        with patch("src.agents.ab_testing_agent.Anthropic"):
+        with patch("src.agents.ab_testing_agent.AsyncAnthropic"):
             agent = ABTestingAgent()
             assert agent is not None
             # Agent should be able to create and analyze tests
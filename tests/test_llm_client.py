@@ -0,0 +1,79 @@
+"""Tests for the LLM client's threading behaviour."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.llm_client import LLMClientWithFailover
+
+
+@pytest.mark.asyncio
+async def test_claude_stream_opens_off_the_event_loop():
+    """Test waiting for the first Claude response bytes doesn't block other coroutines."""
+    client = LLMClientWithFailover()
+    response = MagicMock(text_stream=["Hello", " world"])
+
+    def enter():
+        time.sleep(0.2)  # Blocking request until the response headers arrive
+        return response
+
+    manager = MagicMock()
+    manager.__enter__.side_effect = enter
+    client.anthropic_client = MagicMock()
+    client.anthropic_client.messages.stream.return_value = manager
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    chunks = [chunk async for chunk in client.stream("hi", model="claude")]
+    ticking.cancel()
+
+    assert chunks == ["Hello", " world"]
+    assert ticks >= 5
+    manager.__exit__.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rate_limits_fail_over_once():
+    """Test simultaneous Gemini rate-limit errors switch to the backup key exactly once."""
+    client = LLMClientWithFailover()
+    barrier = threading.Barrier(4)
+
+    def rate_limited(prompt, **kwargs):
+        barrier.wait(timeout=5)  # All calls fail at the same time
+        raise RuntimeError("429 quota exceeded")
+
+    client.gemini_client = MagicMock()
+    client.gemini_client.generate_content.side_effect = rate_limited
+    backup_model = MagicMock()
+    backup_model.generate_content.return_value = SimpleNamespace(text="from backup")
+
+    keys = SimpleNamespace(google_api_key="primary-key", google_api_key_backup="backup-key")
+    with patch("src.utils.llm_client.settings", keys), patch(
+        "src.utils.llm_client.genai"
+    ) as genai:
+        genai.GenerativeModel.return_value = backup_model
+        results = await asyncio.gather(*(client.generate("hi") for _ in range(4)))
+
+        assert results == ["from backup"] * 4
+        genai.configure.assert_called_once_with(api_key="backup-key")
+        assert client.get_active_gemini_key() == "backup"
+
+        # Later calls stay on the backup key until the cooldown expires
+        assert await client.generate("again") == "from backup"
+        assert genai.configure.call_count == 1
+        client.last_failover_time -= client.failover_cooldown + 1
+        client.gemini_client.generate_content.side_effect = None
+        client.gemini_client.generate_content.return_value = SimpleNamespace(text="primary")
+        assert await client.generate("later") == "primary"
+        genai.configure.assert_called_with(api_key="primary-key")
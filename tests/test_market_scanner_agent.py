@@ -56,7 +56,8 @@ def mock_api_clients():
 
         mock_news_api = MockNewsAPI.return_value
         mock_news_api.fetch_latest_news = AsyncMock(return_value=[
-            {"title": "Test News", "url": "http://test.com/news", "source": "Test Source", "published_at": datetime(2025, 1, 1), "content": "Test content", "summary": "Test summary"}
+            {"title": "Test News", "url": "http://test.com/news", "source": "Test Source", "published_at": datetime(2025, 1, 1), "content": "Test content", "summary": "Test summary"},
+            {"title": "BTC and ETH rally", "url": "http://test.com/rally", "source": "Test Source", "published_at": datetime(2025, 1, 2), "content": "Rally", "summary": "Majors move higher"}
         ])
 
         mock_twitter_api = MockTwitterAPI.return_value
@@ -109,6 +110,20 @@ class TestMarketScannerAgent:
         assert news_count > 0
         assert sentiment_count > 0
 
+    @pytest.mark.asyncio
+    async def test_scan_news_records_asset_mentions(self, mock_api_clients, mock_db_session):
+        """Test asset mentions are resolved once when news is ingested."""
+        from src.database.models import NewsArticle, NewsAssetMention
+
+        agent = MarketScannerAgent()
+        assert await agent._scan_news() == 2
+
+        rally = mock_db_session.query(NewsArticle).filter_by(url="http://test.com/rally").one()
+        assert rally.mentioned_assets == ["BTC", "ETH"]
+        mentions = mock_db_session.query(NewsAssetMention).order_by(NewsAssetMention.asset).all()
+        assert [(m.news_id, m.asset) for m in mentions] == [(rally.id, "BTC"), (rally.id, "ETH")]
+        assert mentions[0].published_at == datetime(2025, 1, 2)
+
     @pytest.mark.asyncio
     async def test_scan_market_data_error(self, mock_api_clients):
         """Test error handling in _scan_market_data."""